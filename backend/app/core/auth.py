@@ -1,12 +1,18 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional
+from uuid import UUID
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.model import models
-from app.model.database import get_db
+from app.model.database import get_async_db
 from app.schemas.auth import TokenData
 import os
 from dotenv import load_dotenv
@@ -17,18 +23,90 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Decoded tokens and active-user lookups are cached per process. A user
+# deactivated in another process is seen here within AUTH_USER_CACHE_TTL.
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_TOKEN_CACHE_TTL = int(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "30"))
+
+# New hashes use PASSWORD_HASH_SCHEME; hashes made with the other scheme or
+# with different cost settings are replaced on the user's next login.
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+# bcrypt and argon2 release the GIL, so a small thread pool hashes in
+# parallel while capping how many cores logins can take.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+pwd_context = CryptContext(
+    schemes=[PASSWORD_HASH_SCHEME] + [s for s in ("bcrypt", "argon2") if s != PASSWORD_HASH_SCHEME],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="passwords")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+_token_cache = TTLCache(maxsize=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_TOKEN_CACHE_TTL)
+_user_cache = TTLCache(maxsize=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_USER_CACHE_TTL)
+
+def decode_token(token: str) -> dict:
+    """Decode and verify a JWT, reusing earlier results for the same token.
+
+    Raises JWTError like ``jwt.decode``; only valid tokens are cached, and a
+    cached token stops being accepted once its ``exp`` has passed.
+    """
+    payload = _token_cache.get(token)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            return payload
+        _token_cache.pop(token, None)
+        raise JWTError("Signature has expired.")
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    _token_cache[token] = payload
+    return payload
+
+def invalidate_user(user_id):
+    """Forget the cached lookup so the next request re-reads the user row."""
+    _user_cache.pop(str(user_id), None)
+
+class AuthenticatedUser(NamedTuple):
+    """The fields of a user that authorization needs.
+
+    Cached lookups are shared between concurrent requests, so they hold
+    this immutable copy rather than an ORM instance.
+    """
+
+    id: UUID
+    email: str
+    is_active: bool
+    is_admin: bool
+
+async def load_user(db: AsyncSession, user_id) -> Optional[AuthenticatedUser]:
+    user = _user_cache.get(str(user_id))
+    if user is not None:
+        return user
+    row = await db.get(models.User, UUID(str(user_id)))
+    if row is None:
+        return None
+    user = AuthenticatedUser(row.id, row.email, bool(row.is_active), bool(row.is_admin))
+    _user_cache[str(user_id)] = user
+    return user
+
 def verify_token(token: str):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         user_id = payload.get("sub")
         if user_id is None:
             return False
     except JWTError:
         return False
-    return True
+    return payload
 
 
 def verify_password(plain_password: str, hashed_password: str):
@@ -37,12 +115,27 @@ def verify_password(plain_password: str, hashed_password: str):
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(models.User).filter(models.User.email == email).first()
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str):
+    """Return (matches, new_hash); new_hash is set when the stored hash is outdated."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await db.scalar(select(models.User).where(models.User.email == email))
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not verified:
         return False
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -55,27 +148,47 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+
+    # AuthMiddleware has normally decoded the token already.
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is None:
+        try:
+            payload = decode_token(token)
+            user_id = payload.get("sub")
+            if user_id is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
+    try:
         token_data = TokenData(id=user_id)
-    except JWTError:
+    except ValueError:
         raise credentials_exception
-    
-    user = db.query(models.User).filter(models.User.id == token_data.id).first()
+
+    user = await load_user(db, token_data.id)
     if user is None:
         raise credentials_exception
+    request.state.user = user
     return user
 
-async def get_current_active_user(current_user: models.User = Depends(get_current_user)):
+async def get_current_active_user(current_user: AuthenticatedUser = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_current_admin_user(current_user: AuthenticatedUser = Depends(get_current_active_user)):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return current_user
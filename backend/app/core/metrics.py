@@ -0,0 +1,271 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+A small registry of counters, gauges and histograms (thread-safe, since
+the parse worker records from executor threads), the ASGI middleware that
+times every request, and SQLAlchemy hooks that count queries per request.
+Served on ``GET /metrics`` (see routes/metrics.py).
+"""
+import contextvars
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import event
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SLOW_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, object] = {}
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines += self._samples()
+        return "\n".join(lines)
+
+    def _samples(self):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [per-bucket counts..., +Inf count, sum]
+                entry = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[index] += 1
+                    break
+            else:
+                entry[len(self.buckets)] += 1
+            entry[-1] += value
+
+    def _samples(self):
+        lines = []
+        for key, entry in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), entry[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(entry[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Time until the response body was sent.", ("method", "route")
+)
+HTTP_IN_PROGRESS = registry.gauge("http_requests_in_progress", "Requests being handled.")
+HTTP_REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "Database queries issued per request.", ("route",), buckets=COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_SECONDS = registry.histogram(
+    "http_request_db_seconds", "Database time spent per request.", ("route",)
+)
+DB_QUERY_SECONDS = registry.histogram(
+    "db_query_duration_seconds", "Duration of individual database statements.", ("engine",)
+)
+VLM_SUBMIT_SECONDS = registry.histogram(
+    "vlm_submit_duration_seconds", "Pre-processing and upload of a document to the VLM.", buckets=SLOW_BUCKETS
+)
+VLM_POLL_SECONDS = registry.histogram(
+    "vlm_poll_duration_seconds", "Time from submission until the VLM prediction finished.",
+    ("outcome",), buckets=SLOW_BUCKETS
+)
+VLM_STATUS_REQUESTS = registry.counter(
+    "vlm_status_requests_total", "Prediction status calls made to the VLM API.", ("kind",)
+)
+LLM_REQUEST_SECONDS = registry.histogram(
+    "llm_request_duration_seconds", "Chat completion latency, until the last token.",
+    ("operation", "outcome"), buckets=SLOW_BUCKETS
+)
+LLM_FIRST_TOKEN_SECONDS = registry.histogram(
+    "llm_time_to_first_token_seconds", "Streaming chat completion latency until the first token."
+)
+LLM_TOKENS = registry.counter("llm_tokens_total", "Tokens sent to and received from the LLM.", ("kind",))
+QUEUE_DEPTH = registry.gauge("queue_depth", "Work waiting or in flight, by queue.", ("queue",))
+PARSE_JOBS = registry.gauge("parse_jobs", "Parse jobs by status.", ("status",))
+
+
+class RequestStats:
+    __slots__ = ("db_queries", "db_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+# Set by MetricsMiddleware for the duration of a request; statements run
+# outside a request (the parse worker) are only counted globally.
+current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "current_request", default=None
+)
+
+
+def instrument_engine(engine, name: str):
+    """Time every statement on a sync engine (or an async engine's sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_QUERY_SECONDS.observe(elapsed, engine=name)
+        stats = current_request.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+def route_label(scope) -> str:
+    # The route template keeps label cardinality bounded; unmatched paths
+    # (404s, probes) share one label.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Records latency, status and database work per route.
+
+    Plain ASGI like AuthMiddleware, added last so it is outermost and also
+    times rejected requests. Slow requests can additionally be profiled
+    (see core/profiling.py).
+    """
+
+    def __init__(self, app, profiler=None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            if self.profiler is not None:
+                await self.profiler.run(self.app, scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_PROGRESS.dec()
+            current_request.reset(token)
+            route = route_label(scope)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status_code)
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=scope["method"], route=route)
+            HTTP_REQUEST_DB_QUERIES.observe(stats.db_queries, route=route)
+            HTTP_REQUEST_DB_SECONDS.observe(stats.db_seconds, route=route)
@@ -0,0 +1,18 @@
+import base64
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException
+
+
+def encode_cursor(created_at: datetime, row_id) -> str:
+    """Opaque keyset cursor for listings ordered by (created_at, id) descending."""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
@@ -0,0 +1,93 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import tempfile
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+try:
+    from pyinstrument import Profiler as _PyinstrumentProfiler
+except ImportError:
+    _PyinstrumentProfiler = None
+
+load_dotenv()
+
+# Opt-in: requests slower than this many milliseconds get a profile report
+# written to PROFILE_DIR. 0 disables profiling entirely.
+PROFILE_SLOW_REQUESTS_MS = float(os.getenv("PROFILE_SLOW_REQUESTS_MS", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "request-profiles"))
+# Long-lived responses (SSE) would always count as slow; never profile them.
+PROFILE_SKIP_PATHS = [part for part in os.getenv("PROFILE_SKIP_PATHS", "/stream,/metrics").split(",") if part]
+
+
+class SlowRequestProfiler:
+    """Profiles one request at a time and keeps the report if it was slow.
+
+    Uses pyinstrument when installed, which follows the request across
+    awaits. The cProfile fallback profiles the whole event loop thread, so
+    its report also contains whatever ran concurrently.
+    """
+
+    def __init__(self, threshold_ms: float = PROFILE_SLOW_REQUESTS_MS, directory: str = PROFILE_DIR):
+        self.threshold = threshold_ms / 1000
+        self.directory = directory
+        self.reports = 0
+        self._active = False
+
+    def _should_profile(self, scope) -> bool:
+        return not self._active and not any(part in scope["path"] for part in PROFILE_SKIP_PATHS)
+
+    async def run(self, app, scope, receive, send):
+        if not self._should_profile(scope):
+            await app(scope, receive, send)
+            return
+
+        self._active = True
+        if _PyinstrumentProfiler is not None:
+            profiler = _PyinstrumentProfiler(async_mode="enabled")
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        started = time.perf_counter()
+        try:
+            await app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - started
+            if isinstance(profiler, cProfile.Profile):
+                profiler.disable()
+            else:
+                profiler.stop()
+            self._active = False
+            if elapsed >= self.threshold:
+                self._write_report(scope, elapsed, self._report(profiler))
+
+    @staticmethod
+    def _report(profiler) -> str:
+        if isinstance(profiler, cProfile.Profile):
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(60)
+            return out.getvalue()
+        return profiler.output_text(unicode=True, color=False)
+
+    def _write_report(self, scope, elapsed: float, report: str):
+        name = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        path = os.path.join(
+            self.directory,
+            f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{scope['method']}-{name}-{elapsed * 1000:.0f}ms.txt",
+        )
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "w") as f:
+                f.write(f"{scope['method']} {scope['path']} took {elapsed * 1000:.1f} ms\n\n{report}")
+            self.reports += 1
+            print(f"Slow request profile written to {path}")
+        except OSError as e:
+            print(f"Could not write request profile {path}: {e}")
+
+
+def create_profiler():
+    return SlowRequestProfiler() if PROFILE_SLOW_REQUESTS_MS > 0 else None
@@ -0,0 +1,6 @@
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    # orjson is optional; the stdlib encoder produces the same JSON, slower.
+    from fastapi.responses import JSONResponse as FastJSONResponse
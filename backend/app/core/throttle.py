@@ -0,0 +1,79 @@
+import math
+import os
+import time
+from typing import Optional
+from cachetools import TTLCache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Failed logins allowed per window before further attempts are refused
+# without checking the password.
+LOGIN_THROTTLE_WINDOW = int(os.getenv("LOGIN_THROTTLE_WINDOW", "300"))
+LOGIN_MAX_FAILURES_PER_ACCOUNT = int(os.getenv("LOGIN_MAX_FAILURES_PER_ACCOUNT", "5"))
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "30"))
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+
+
+class LoginThrottle:
+    """Per-account and per-IP failure counters over a fixed window.
+
+    Every attempt is counted as a failure when it starts, in the same step
+    as the limit check, so parallel requests cannot all slip past the check
+    before the first failure is recorded; a successful login takes its
+    attempt back. Counters live in this process only; with several web
+    processes each one enforces the limits on its own share of the traffic.
+    """
+
+    def __init__(
+        self,
+        window: int = LOGIN_THROTTLE_WINDOW,
+        max_account_failures: int = LOGIN_MAX_FAILURES_PER_ACCOUNT,
+        max_ip_failures: int = LOGIN_MAX_FAILURES_PER_IP,
+        max_keys: int = LOGIN_THROTTLE_MAX_KEYS,
+    ):
+        self.window = window
+        self.limits = {"account": max_account_failures, "ip": max_ip_failures}
+        # key -> [failures, window_started_at]
+        self._failures = TTLCache(maxsize=max_keys, ttl=window)
+        self.rejected = 0
+
+    def _keys(self, email: str, ip: Optional[str]):
+        yield "account", f"account:{email.strip().lower()}"
+        if ip:
+            yield "ip", f"ip:{ip}"
+
+    def start_attempt(self, email: str, ip: Optional[str]) -> int:
+        """Count an attempt, or return the seconds until one is allowed.
+
+        Returns 0 when the attempt may go ahead; it then counts as a failure
+        until ``record_success`` says otherwise.
+        """
+        wait = 0.0
+        now = time.monotonic()
+        keys = list(self._keys(email, ip))
+        for kind, key in keys:
+            entry = self._failures.get(key)
+            if entry and entry[0] >= self.limits[kind]:
+                wait = max(wait, entry[1] + self.window - now)
+        if wait > 0:
+            self.rejected += 1
+            return math.ceil(wait)
+
+        for _, key in keys:
+            entry = self._failures.get(key)
+            if entry is None:
+                self._failures[key] = [1, now]
+            else:
+                entry[0] += 1
+        return 0
+
+    def record_success(self, email: str, ip: Optional[str]):
+        """Clear the account's failures and take back this attempt's IP count."""
+        self._failures.pop(f"account:{email.strip().lower()}", None)
+        entry = self._failures.get(f"ip:{ip}") if ip else None
+        if entry and entry[0] > 0:
+            entry[0] -= 1
+
+
+login_throttle = LoginThrottle()
@@ -1,28 +1,61 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi.responses import JSONResponse
-from app.routes import resume, chat, auth
-from app.model.database import engine, Base
-from jose import jwt, JWTError
+from app.routes import resume, chat, auth, admin, metrics
+from app.model.database import engine, async_engine
+from app.model.migrations import upgrade_schema
+from app.worker import run_worker
+from app.services.status_broker import STATUS_BROKER_BACKEND, listen_postgres
+from app.services import openai_chat, vlm
+from contextlib import asynccontextmanager, suppress
+from jose import JWTError
+from app.core.auth import decode_token
+from app.core.responses import FastJSONResponse
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import create_profiler
+import asyncio
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-Base.metadata.create_all(bind=engine)
+# Run the parse worker inside the web process. Set to "false" when parse jobs
+# are handled by dedicated `python -m app.worker` processes instead.
+EMBEDDED_WORKER = os.getenv("EMBEDDED_WORKER", "true").lower() == "true"
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The first connection is opened here rather than when the app is imported.
+    try:
+        await asyncio.to_thread(upgrade_schema, engine)
+        print("✅ Database connection successful.")
+    except Exception as e:
+        print("❌ Database connection failed:", e)
+        raise
+    tasks = []
+    if EMBEDDED_WORKER:
+        tasks.append(asyncio.create_task(run_worker()))
+    if STATUS_BROKER_BACKEND == "postgres":
+        tasks.append(asyncio.create_task(listen_postgres(os.getenv("DATABASE_URL"))))
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await openai_chat.chat_service.aclose()
+    await vlm.pipeline.scheduler.aclose()
+    await async_engine.dispose()
+    engine.dispose()
 
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = "HS256"
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 UNPROTECTED_PATHS = {
     "/auth/token",
     "/auth/register",
     "/docs",
     "/openapi.json",
-    "/redoc"
+    "/redoc",
+    "/metrics"
 }
 
 origins = [
@@ -30,42 +63,57 @@ origins = [
     "http://127.0.0.1:3000",
 ]
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-       
-        if request.method == "OPTIONS":
-            return await call_next(request)
-            
-        path = request.url.path
-        if path in UNPROTECTED_PATHS:
-            return await call_next(request)
+class AuthMiddleware:
+    """Rejects requests without a valid bearer token outside UNPROTECTED_PATHS.
+
+    Written as plain ASGI rather than BaseHTTPMiddleware so responses,
+    including SSE streams, pass straight through without an extra task and
+    body stream per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        if request.url.path in UNPROTECTED_PATHS:
+            await self.app(scope, receive, send)
+            return
 
         auth_header = request.headers.get("Authorization")
         if not auth_header:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": "Missing authorization token"},
                 headers={"Access-Control-Allow-Origin": "http://localhost:3000"}
             )
+            await response(scope, receive, send)
+            return
 
         try:
             scheme, token = auth_header.split()
             if scheme.lower() != "bearer":
                 raise JWTError("Invalid scheme")
-                
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+            payload = decode_token(token)
             request.state.user_id = payload.get("sub")
             if not request.state.user_id:
                 raise JWTError("Missing sub in payload")
 
         except (JWTError, ValueError) as e:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": f"Invalid token: {str(e)}"},
                 headers={"Access-Control-Allow-Origin": "http://localhost:3000"}
             )
+            await response(scope, receive, send)
+            return
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
 app.add_middleware(
     CORSMiddleware,
@@ -77,7 +125,11 @@ app.add_middleware(
 )
 
 app.add_middleware(AuthMiddleware)
+# Added last so it wraps everything else and times rejected requests too.
+app.add_middleware(MetricsMiddleware, profiler=create_profiler())
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(resume.router, prefix="/resume", tags=["resume"])
-app.include_router(chat.router, prefix="/v1/chat", tags=["chat"])
\ No newline at end of file
+app.include_router(chat.router, prefix="/v1/chat", tags=["chat"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
+app.include_router(metrics.router, tags=["metrics"])
\ No newline at end of file
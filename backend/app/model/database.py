@@ -1,22 +1,154 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 import os
 from dotenv import load_dotenv
+from app.core.metrics import instrument_engine
 
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
-print("Connecting to:", DATABASE_URL)
 
-try:
-    engine = create_engine(DATABASE_URL, echo=True)
-    conn = engine.connect()
-    print("✅ Connection successful.")
-except Exception as e:
-    print("❌ Connection failed:", e)
+# Each web or worker process holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW
+# connections per engine; keep the total across processes under the
+# server's max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+
+class PoolMetrics:
+    """How long callers waited for a pooled connection, and how often they gave up."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_avg": self.wait_seconds_total / attempts if attempts else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+class _TimedGetMixin:
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedGetMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedGetMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def to_async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching asyncio driver."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+def _engine_options(url: str, use_async: bool) -> dict:
+    backend = make_url(url).get_backend_name()
+    options = {"echo": DB_ECHO, "pool_pre_ping": DB_POOL_PRE_PING}
+    if backend == "sqlite":
+        # SQLite keeps SQLAlchemy's default per-file pooling.
+        return options
+
+    pool_class = InstrumentedAsyncQueuePool if use_async else InstrumentedQueuePool
+    options.update(
+        poolclass=type(pool_class.__name__, (pool_class,), {"metrics": PoolMetrics()}),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if backend == "postgresql" and DB_STATEMENT_TIMEOUT_MS:
+        if use_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def create_db_engine(url: str = DATABASE_URL, **overrides):
+    """Sync engine with the configured pool; connections are opened lazily."""
+    return create_engine(url, **{**_engine_options(url, use_async=False), **overrides})
+
+
+def create_async_db_engine(url: str = DATABASE_URL, **overrides):
+    url = to_async_url(url)
+    return create_async_engine(url, **{**_engine_options(url, use_async=True), **overrides})
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
+
+
+# The async engine serves the API routes; the sync engine remains for
+# create_all and the parse worker, which runs its DB work in threads.
+engine = create_db_engine()
+async_engine = create_async_db_engine()
+instrument_engine(engine, "worker")
+instrument_engine(async_engine.sync_engine, "api")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 def get_db():
@@ -25,3 +157,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
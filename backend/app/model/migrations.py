@@ -0,0 +1,80 @@
+"""Schema upgrades for databases created by an earlier version of the app.
+
+``Base.metadata.create_all`` creates missing tables but never alters the
+ones that exist, so columns and indexes added to existing tables since
+(``resumes.error_message``, ``users.is_admin`` and the rest) are applied
+here. Every step checks what is already there, so ``upgrade_schema`` is
+safe to run on every start and from several processes. Run it by hand
+before starting upgraded workers or the backfills:
+
+    python -m app.model.migrations
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from app.model import models
+from app.model.database import Base
+
+
+class MigrationError(Exception):
+    pass
+
+
+def _add_column_sql(conn, column) -> str:
+    dialect = conn.dialect
+    if not column.nullable and column.server_default is None:
+        raise MigrationError(
+            f"Cannot add NOT NULL column {column.table.name}.{column.name} to an existing table"
+        )
+    sql = str(CreateColumn(column).compile(dialect=dialect))
+    for foreign_key in column.foreign_keys:
+        target = foreign_key.column
+        sql += f" REFERENCES {dialect.identifier_preparer.format_table(target.table)} ({target.name})"
+    # PostgreSQL can guard against a concurrent upgrade; SQLite has no IF NOT EXISTS here.
+    if dialect.name == "postgresql":
+        return f"ALTER TABLE {column.table.name} ADD COLUMN IF NOT EXISTS {sql}"
+    return f"ALTER TABLE {column.table.name} ADD COLUMN {sql}"
+
+
+def missing_columns(conn):
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing += [column for column in table.columns if column.name not in existing]
+    return missing
+
+
+def upgrade_schema(bind) -> list:
+    """Create missing tables, then add missing columns and indexes.
+
+    Returns the ``table.column`` names that were added.
+    """
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        added = []
+        for column in missing_columns(conn):
+            conn.execute(text(_add_column_sql(conn, column)))
+            added.append(f"{column.table.name}.{column.name}")
+
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                # Honours Index.ddl_if, so PostgreSQL-only indexes are skipped on SQLite.
+                CreateIndex(index, if_not_exists=True)._invoke_with(conn)
+
+        if conn.dialect.name == "sqlite":
+            # The FTS table and its triggers are only created with the resumes table.
+            for statement in models.SQLITE_FTS_DDL:
+                conn.execute(text(statement))
+    for name in added:
+        print(f"Added column {name}")
+    return added
+
+
+if __name__ == "__main__":
+    from app.model.database import engine
+
+    added = upgrade_schema(engine)
+    print(f"✅ Schema up to date ({len(added)} columns added)")
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, JSON, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, JSON, ForeignKey, DateTime, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy import Column, String, JSON, ForeignKey, DateTime, Boolean, Index, Text, Float, DDL, event, text
+from sqlalchemy import Uuid as UUID
 from datetime import datetime
 from .database import Base
 import uuid
@@ -13,6 +13,7 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
+    is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 class Resume(Base):
@@ -21,12 +22,55 @@ class Resume(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     filename = Column(String)
+    content_hash = Column(String(64), index=True, nullable=True)
     status = Column(String, default="processing")  # or "done"
-    parsed_data = Column(JSON, nullable=True)
+    # Deferred: status checks and listings never need the parsed document.
+    parsed_data = deferred(Column(JSON, nullable=True))
+    summary = Column(Text, nullable=True)  # compact prompt view of parsed_data
+    error_message = Column(String, nullable=True)
+    batch_id = Column(UUID(as_uuid=True), ForeignKey("resume_batches.id"), index=True, nullable=True)
+    # Search fields derived from parsed_data when parsing completes.
+    years_experience = Column(Float, nullable=True)
+    search_text = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="resumes")
     chats = relationship("ChatHistory", back_populates="resume")
+    batch = relationship("ResumeBatch", back_populates="resumes")
+
+    __table_args__ = (
+        Index("ix_resumes_user_created", "user_id", "created_at"),
+        Index("ix_resumes_user_years", "user_id", "years_experience"),
+        Index(
+            "ix_resumes_search_text_fts",
+            text("to_tsvector('english', coalesce(search_text, ''))"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+class ResumeTerm(Base):
+    """One normalized skill, position or employer of a parsed resume."""
+
+    __tablename__ = "resume_terms"
+
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String(16), primary_key=True)  # skill, position or employer
+    value = Column(String(200), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+
+    __table_args__ = (
+        Index("ix_resume_terms_lookup", "user_id", "kind", "value", "resume_id"),
+    )
+
+class ResumeBatch(Base):
+    __tablename__ = "resume_batches"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True)
+    total = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    resumes = relationship("Resume", back_populates="batch")
 
 class ChatHistory(Base):
     __tablename__ = "chats"
@@ -41,4 +85,80 @@ class ChatHistory(Base):
     resume = relationship("Resume", back_populates="chats")
     user = relationship("User")
 
-User.resumes = relationship("Resume", back_populates="user")
\ No newline at end of file
+    __table_args__ = (
+        Index("ix_chats_resume_user_created", "resume_id", "user_id", "created_at"),
+    )
+
+class ChatConversation(Base):
+    """Per-resume chat summary, updated in the same transaction as each message."""
+
+    __tablename__ = "chat_conversations"
+
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    last_message_id = Column(UUID(as_uuid=True), nullable=False)
+    last_message_type = Column(String(16), nullable=False)
+    last_message_preview = Column(String, nullable=False)
+    last_message_at = Column(DateTime, nullable=False)
+    message_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_chat_conversations_user_last", "user_id", "last_message_at", "resume_id"),
+    )
+
+class ParseJob(Base):
+    __tablename__ = "parse_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id"), index=True)
+    status = Column(String, default="queued")  # queued, running, done or error
+    file_path = Column(String)
+    filename = Column(String)
+    content_hash = Column(String(64), nullable=True)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    last_error = Column(String, nullable=True)
+    run_after = Column(DateTime, default=datetime.utcnow)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    resume = relationship("Resume")
+
+    __table_args__ = (
+        Index("ix_parse_jobs_status_run_after", "status", "run_after"),
+        # At most one in-flight job per document, so identical uploads share it.
+        Index(
+            "uq_parse_jobs_inflight_hash",
+            "content_hash",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+class LLMResponseCache(Base):
+    __tablename__ = "llm_response_cache"
+
+    key = Column(String(64), primary_key=True)
+    response = Column(Text)
+    expires_at = Column(DateTime, index=True)
+
+User.resumes = relationship("Resume", back_populates="user")
+
+# SQLite has no GIN/tsvector; full-text search there goes through an FTS5
+# table kept in sync with resumes.search_text by triggers.
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(resume_id UNINDEXED, body)",
+    "CREATE TRIGGER IF NOT EXISTS resumes_fts_insert AFTER INSERT ON resumes "
+    "WHEN new.search_text IS NOT NULL BEGIN "
+    "INSERT INTO resume_fts (resume_id, body) VALUES (new.id, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS resumes_fts_update AFTER UPDATE OF search_text ON resumes BEGIN "
+    "DELETE FROM resume_fts WHERE resume_id = old.id; "
+    "INSERT INTO resume_fts (resume_id, body) SELECT new.id, new.search_text WHERE new.search_text IS NOT NULL; END",
+    "CREATE TRIGGER IF NOT EXISTS resumes_fts_delete AFTER DELETE ON resumes BEGIN "
+    "DELETE FROM resume_fts WHERE resume_id = old.id; END",
+)
+for statement in SQLITE_FTS_DDL:
+    event.listen(Resume.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
\ No newline at end of file
@@ -0,0 +1,48 @@
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.auth import AuthenticatedUser, get_current_admin_user, invalidate_user
+from app.model.models import User
+from app.model.database import engine, async_engine, pool_stats, get_async_db
+from app.schemas.auth import User as UserSchema
+from app.routes.metrics import parser_stats, vlm_stats
+from app.services import jobs
+from app.services.response_cache import response_cache
+
+router = APIRouter()
+
+@router.get("/stats/dedup")
+def get_dedup_stats(current_user: AuthenticatedUser = Depends(get_current_admin_user)):
+    return jobs.dedup_stats.snapshot()
+
+@router.get("/stats/llm-cache")
+def get_llm_cache_stats(current_user: AuthenticatedUser = Depends(get_current_admin_user)):
+    return response_cache.snapshot()
+
+# VLM and parser figures belong to the process that parses. With
+# EMBEDDED_WORKER=false they are served by each worker's /stats instead.
+@router.get("/stats/vlm")
+def get_vlm_stats(current_user: AuthenticatedUser = Depends(get_current_admin_user)):
+    return vlm_stats()
+
+@router.get("/stats/parsers")
+def get_parser_stats(current_user: AuthenticatedUser = Depends(get_current_admin_user)):
+    return parser_stats()
+
+@router.get("/stats/db-pool")
+def get_db_pool_stats(current_user: AuthenticatedUser = Depends(get_current_admin_user)):
+    return {"api": pool_stats(async_engine), "worker": pool_stats(engine)}
+
+@router.post("/users/{user_id}/deactivate", response_model=UserSchema)
+async def deactivate_user(
+    user_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_admin_user)
+):
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user.is_active = False
+    await db.commit()
+    invalidate_user(user_id)
+    return user
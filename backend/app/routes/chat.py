@@ -1,64 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
+from fastapi.responses import StreamingResponse
 from app.model import models
-from app.model.database import get_db
+from app.model.database import get_async_db, AsyncSessionLocal
 from app.schemas.chat import ChatRequest, ChatResponse, ChatMessage, ResumeChatSummary,ChatHistoryResponse
-from app.services.openai_chat import generate_chat_response
-from sqlalchemy.orm import Session
+from app.services.openai_chat import generate_chat_response, stream_chat_response, chat_cache_key, CHAT_HISTORY_WINDOW
+from app.services.response_cache import response_cache
+from app.services.conversations import add_chat_message
+from app.services.prompt import build_resume_summary
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 from uuid import UUID
-from app.core.auth import get_current_active_user
-from app.model.models import User
-from typing import List
-from datetime import datetime
+from app.core.auth import AuthenticatedUser, get_current_active_user
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.responses import FastJSONResponse
+from typing import List, Optional
+import asyncio
+import hashlib
+import json
 
 router = APIRouter()
 
-@router.post("/completions", response_model=ChatResponse)
-def chat_with_resume(
-    data: ChatRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    resume = db.query(models.Resume).filter(
+async def start_chat_turn(db: AsyncSession, data: ChatRequest, current_user: AuthenticatedUser):
+    resume = await db.scalar(select(models.Resume).where(
         models.Resume.id == data.resume_id,
         models.Resume.user_id == current_user.id
-    ).first()
+    ))
     
     if not resume or resume.status != "done":
         raise HTTPException(status_code=404, detail="Resume not ready or not found.")
 
-    user_msg = models.ChatHistory(
-        resume_id=data.resume_id,
-        user_id=current_user.id,
-        message_type="user",
-        content=data.user_message,
-        created_at=datetime.utcnow()
-    )
-    db.add(user_msg)
-    db.commit()
-
-    history = (
-        db.query(models.ChatHistory)
-        .filter(
+    # History is read before the new message is stored, so the current
+    # question is only sent once (as the final prompt message).
+    history = (await db.execute(
+        select(models.ChatHistory.message_type, models.ChatHistory.content)
+        .where(
             models.ChatHistory.resume_id == data.resume_id,
             models.ChatHistory.user_id == current_user.id
         )
-        .order_by(models.ChatHistory.created_at)
-        .all()
-    )
+        .order_by(models.ChatHistory.created_at.desc(), models.ChatHistory.id.desc())
+        .limit(CHAT_HISTORY_WINDOW)
+    )).all()
 
-    history_list = [{"message_type": c.message_type, "content": c.content} for c in history]
+    history_list = [{"message_type": c.message_type, "content": c.content} for c in reversed(history)]
+    summary = resume.summary
+    if not summary:
+        # Resumes parsed before summaries were stored.
+        summary = build_resume_summary(await db.scalar(
+            select(models.Resume.parsed_data).where(models.Resume.id == resume.id)
+        ))
 
-    reply = generate_chat_response(resume.parsed_data, history_list, data.user_message)
+    await add_chat_message(db, data.resume_id, current_user.id, "user", data.user_message)
+    await db.commit()
 
-    assistant_msg = models.ChatHistory(
-        resume_id=data.resume_id,
-        user_id=current_user.id,
-        message_type="assistant",
-        content=reply,
-        created_at=datetime.utcnow()
-    )
-    db.add(assistant_msg)
-    db.commit()
+    return resume, summary, history_list
+
+def resume_content_key(resume: models.Resume, summary: str) -> str:
+    return resume.content_hash or hashlib.sha256(summary.encode()).hexdigest()
+
+def turn_cache_key(resume: models.Resume, summary: str, history_list: list, user_message: str) -> Optional[str]:
+    """Cache key for a chat turn, or None if its reply must not be shared.
+
+    Only opening questions are cached: their prompt is just the resume and
+    the question, so everyone who uploaded the same document may share the
+    reply. Later turns carry that user's conversation in the prompt.
+    """
+    if history_list:
+        return None
+    return chat_cache_key(resume_content_key(resume, summary), user_message)
+
+async def save_assistant_message(db: AsyncSession, resume_id: UUID, user_id: UUID, content: str):
+    await add_chat_message(db, resume_id, user_id, "assistant", content)
+    await db.commit()
+
+async def _save_assistant_message_in_new_session(resume_id: UUID, user_id: UUID, content: str):
+    async with AsyncSessionLocal() as db:
+        await save_assistant_message(db, resume_id, user_id, content)
+
+@router.post("/completions", response_model=ChatResponse)
+async def chat_with_resume(
+    data: ChatRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    resume, summary, history_list = await start_chat_turn(db, data, current_user)
+
+    cache_key = turn_cache_key(resume, summary, history_list, data.user_message)
+    reply = await response_cache.get(cache_key)
+    if reply is None:
+        reply = await generate_chat_response(summary, history_list, data.user_message)
+        await response_cache.set(cache_key, reply)
+
+    await save_assistant_message(db, data.resume_id, current_user.id, reply)
 
     return ChatResponse(
         messages=[
@@ -69,82 +102,171 @@ def chat_with_resume(
         resume_name=resume.filename
     )
 
-@router.get("/resume-chats", response_model=List[ResumeChatSummary])
-def get_user_resume_chats(
-
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+@router.post("/completions/stream")
+async def stream_chat_with_resume(
+    data: ChatRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
-    subquery = (
-        db.query(
-            models.ChatHistory.resume_id,
-            models.ChatHistory.created_at
-        )
-        .filter(models.ChatHistory.user_id == current_user.id)
-        .order_by(models.ChatHistory.resume_id, models.ChatHistory.created_at.desc())
-        .distinct(models.ChatHistory.resume_id)
-        .subquery()
+    resume, summary, history_list = await start_chat_turn(db, data, current_user)
+    resume_id, resume_name, user_id = resume.id, resume.filename, current_user.id
+    cache_key = turn_cache_key(resume, summary, history_list, data.user_message)
+
+    async def event_generator():
+        parts = []
+        try:
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                parts.append(cached)
+                yield f"data: {json.dumps({'delta': cached})}\n\n"
+            else:
+                async for delta in stream_chat_response(summary, history_list, data.user_message):
+                    if await request.is_disconnected():
+                        break
+                    parts.append(delta)
+                    yield f"data: {json.dumps({'delta': delta})}\n\n"
+                else:
+                    await response_cache.set(cache_key, "".join(parts))
+
+            yield "data: " + json.dumps({
+                "done": True,
+                "resume_id": str(resume_id),
+                "resume_name": resume_name,
+            }) + "\n\n"
+        except Exception as e:
+            print(f"Chat stream error: {e}")
+            yield f"event: error\ndata: {json.dumps({'error': 'Chat completion failed'})}\n\n"
+        finally:
+            # Keep whatever was generated, even if the client went away. The
+            # shield lets the insert finish when the stream is being cancelled.
+            if parts:
+                await asyncio.shield(_save_assistant_message_in_new_session(
+                    resume_id, user_id, "".join(parts)
+                ))
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
     )
 
-    resume_chats = (
-        db.query(
-            models.Resume.id,
+@router.get("/resume-chats", response_model=List[ResumeChatSummary])
+async def get_user_resume_chats(
+    response: Response,
+    before: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    query = (
+        select(
+            models.ChatConversation.resume_id,
             models.Resume.filename,
-            models.ChatHistory.content.label("last_message"),
-            models.ChatHistory.created_at.label("last_message_at")
+            models.ChatConversation.last_message_preview,
+            models.ChatConversation.last_message_type,
+            models.ChatConversation.last_message_at,
+            models.ChatConversation.message_count
         )
-        .join(models.ChatHistory, models.Resume.id == models.ChatHistory.resume_id)
-        .join(subquery, 
-            (models.ChatHistory.resume_id == subquery.c.resume_id) &
-            (models.ChatHistory.created_at == subquery.c.created_at))
-        .filter(models.Resume.user_id == current_user.id)
-        .all()
+        .join(models.Resume, models.Resume.id == models.ChatConversation.resume_id)
+        .where(models.ChatConversation.user_id == current_user.id)
     )
+    if before:
+        last_message_at, resume_id = decode_cursor(before)
+        query = query.where(
+            or_(
+                models.ChatConversation.last_message_at < last_message_at,
+                and_(
+                    models.ChatConversation.last_message_at == last_message_at,
+                    models.ChatConversation.resume_id < resume_id
+                )
+            )
+        )
+
+    rows = (await db.execute(
+        query
+        .order_by(models.ChatConversation.last_message_at.desc(), models.ChatConversation.resume_id.desc())
+        .limit(limit + 1)
+    )).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        # The body stays a plain list for existing clients.
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].last_message_at, rows[-1].resume_id)
 
     return [
         ResumeChatSummary(
-            resume_id=str(r.id),
+            resume_id=r.resume_id,
             resume_name=r.filename,
-            last_message=r.last_message,
-            last_message_at=r.last_message_at
+            last_message=r.last_message_preview,
+            last_message_type=r.last_message_type,
+            last_message_at=r.last_message_at,
+            message_count=r.message_count
         )
-        for r in resume_chats
+        for r in rows
     ]
 
 
 @router.get("/history/{resume_id}", response_model=ChatHistoryResponse)
-def get_chat_history(
+async def get_chat_history(
     resume_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    before: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    limit: int = Query(50, ge=1, le=200),
+    include_parsed_data: bool = Query(False, description="Also return parsed_data; prefer GET /resume/parsed/{resume_id}"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
-    resume = db.query(models.Resume).filter(
+    query = select(models.Resume).where(
         models.Resume.id == resume_id,
         models.Resume.user_id == current_user.id
-    ).first()
-    
+    )
+    if include_parsed_data:
+        query = query.options(undefer(models.Resume.parsed_data))
+    resume = await db.scalar(query)
+
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found.")
 
-    messages = (
-        db.query(models.ChatHistory)
-        .filter(
-            models.ChatHistory.resume_id == resume_id,
-            models.ChatHistory.user_id == current_user.id
-        )
-        .order_by(models.ChatHistory.created_at)
-        .all()
+    query = select(models.ChatHistory).where(
+        models.ChatHistory.resume_id == resume_id,
+        models.ChatHistory.user_id == current_user.id
     )
+    if before:
+        created_at, message_id = decode_cursor(before)
+        query = query.where(
+            or_(
+                models.ChatHistory.created_at < created_at,
+                and_(
+                    models.ChatHistory.created_at == created_at,
+                    models.ChatHistory.id < message_id
+                )
+            )
+        )
 
-    return ChatHistoryResponse(
+    # Newest page first, one extra row to tell whether an older page exists.
+    page = (await db.scalars(
+        query
+        .order_by(models.ChatHistory.created_at.desc(), models.ChatHistory.id.desc())
+        .limit(limit + 1)
+    )).all()
+    has_more = len(page) > limit
+    messages = list(reversed(page[:limit]))
+
+    history = ChatHistoryResponse(
         resume_id=resume.id,
         resume_name=resume.filename,
-        parsed_data=resume.parsed_data,
         messages=[
             ChatMessage(
                 message_type=m.message_type,
                 content=m.content
             )
             for m in messages
-        ]
-    )
\ No newline at end of file
+        ],
+        next_cursor=encode_cursor(messages[0].created_at, messages[0].id) if has_more else None
+    ).model_dump(mode="json")
+    # parsed_data was validated when it was stored, so it is sent as is
+    # rather than validated again through the response model.
+    history["parsed_data"] = resume.parsed_data if include_parsed_data else None
+    return FastJSONResponse(content=history)
@@ -0,0 +1,75 @@
+import hmac
+import os
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import metrics
+from app.model import models
+from app.model.database import engine, async_engine, pool_stats, get_async_db
+from app.services import openai_chat, parsers, vlm
+from app.services.status_broker import status_broker
+
+router = APIRouter()
+
+# /metrics is outside the JWT auth so Prometheus can scrape it; scrapers send
+# this value as a bearer token instead. Without a token the endpoint is off,
+# unless METRICS_PUBLIC opts in to serving it unauthenticated (only sensible
+# when the port is not reachable from outside).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() == "true"
+
+
+def require_scrape_access(request: Request):
+    if METRICS_TOKEN:
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}"):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    elif not METRICS_PUBLIC:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+def vlm_stats() -> dict:
+    return {**vlm.pipeline.stats.snapshot(), "polling": vlm.pipeline.scheduler.snapshot()}
+
+
+def parser_stats() -> dict:
+    stats = getattr(parsers.resume_parser, "stats", None)
+    return {"parser": parsers.resume_parser.name, **(stats.snapshot() if stats else {})}
+
+
+def refresh_process_gauges():
+    """Gauges of work in flight in this process."""
+    pipeline = vlm.pipeline
+    metrics.QUEUE_DEPTH.set(pipeline.in_flight, queue="vlm_in_flight")
+    metrics.QUEUE_DEPTH.set(pipeline.scheduler.outstanding, queue="vlm_polling")
+    metrics.QUEUE_DEPTH.set(getattr(openai_chat.chat_service, "in_flight", 0), queue="llm_in_flight")
+    metrics.QUEUE_DEPTH.set(status_broker.subscriber_count(), queue="sse_subscribers")
+    for name, db_engine in (("api", async_engine), ("worker", engine)):
+        checked_out = pool_stats(db_engine).get("checked_out")
+        if checked_out is not None:
+            metrics.QUEUE_DEPTH.set(checked_out, queue=f"db_pool_{name}_checked_out")
+
+
+async def refresh_queue_depths(db: AsyncSession):
+    rows = (await db.execute(
+        select(models.ParseJob.status, func.count())
+        .where(models.ParseJob.status.in_(("queued", "running")))
+        .group_by(models.ParseJob.status)
+    )).all()
+    counts = dict(rows)
+    for job_status in ("queued", "running"):
+        metrics.PARSE_JOBS.set(counts.get(job_status, 0), status=job_status)
+    refresh_process_gauges()
+
+
+def render_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics(request: Request, db: AsyncSession = Depends(get_async_db)):
+    require_scrape_access(request)
+    await refresh_queue_depths(db)
+    return render_metrics()
@@ -1,26 +1,68 @@
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, Depends, Request, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, File, Depends, Request, HTTPException, status, Query
+from sqlalchemy import and_, exists, func, literal_column, or_, select, text, true
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.model import models
-from app.model.database import get_db, SessionLocal
-from app.services import vlm
+from app.model.database import get_async_db, AsyncSessionLocal
+from app.services import jobs
+from app.services.search_index import normalize_term
+from app.core.pagination import encode_cursor, decode_cursor
+from app.services.status_broker import status_broker
 from app.schemas import resume as schemas
-from fastapi.responses import StreamingResponse
+from app.schemas.parsed_resume import ParsedResume
+from fastapi.responses import Response, StreamingResponse
+from app.core.responses import FastJSONResponse
 import json
 import asyncio
+from collections import Counter
 from uuid import UUID
+from typing import List, Optional
 from app.core.auth import verify_token
 import datetime 
+import os
 from jose import JWTError
 
 
 router = APIRouter()
 
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_MAX_STREAM_SECONDS = float(os.getenv("SSE_MAX_STREAM_SECONDS", "300"))
+BATCH_SSE_MAX_STREAM_SECONDS = float(os.getenv("BATCH_SSE_MAX_STREAM_SECONDS", "1800"))
+
+
+async def load_resume_status(resume_id: UUID) -> dict:
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(models.Resume.status, models.Resume.error_message).where(
+                models.Resume.id == resume_id
+            )
+        )).first()
+    if not row:
+        return {"status": "not_found"}
+    return {"status": row.status, "error": row.error_message}
+
+def batch_progress(counts: dict) -> dict:
+    counts = {"processing": 0, "done": 0, "error": 0, **counts}
+    total = sum(counts.values())
+    return {
+        "total": total,
+        **counts,
+        "progress": (counts["done"] + counts["error"]) / total if total else 1.0,
+    }
+
+async def load_batch_progress(batch_id: UUID) -> dict:
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(models.Resume.status, func.count())
+            .where(models.Resume.batch_id == batch_id)
+            .group_by(models.Resume.status)
+        )).all()
+    return batch_progress(dict(rows))
+
 @router.post("/upload", response_model=schemas.ResumeUploadResponse)
 async def upload_resume(
     request: Request,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if not hasattr(request.state, 'user_id'):
         raise HTTPException(
@@ -30,43 +72,26 @@ async def upload_resume(
     
     try:
         user_id = UUID(request.state.user_id)
-        
-        db_resume = models.Resume(
-            filename=file.filename,
-            status="processing",
-            user_id=user_id
-        )
-        db.add(db_resume)
-        db.commit()
-        db.refresh(db_resume)
 
-        contents = await file.read()
-
-        def parse_and_store(resume_id: UUID, contents: bytes, filename: str):
-            try:
-                task_id = vlm.upload_resume_to_vlm(contents, filename)
-                parsed = vlm.poll_parsing_result(task_id)
-
-                if parsed:
-                    db_session = SessionLocal()
-                    try:
-                        resume = db_session.query(models.Resume).get(resume_id)
-                        if resume:
-                            resume.status = "done"
-                            resume.parsed_data = parsed
-                            db_session.commit()
-                    finally:
-                        db_session.close()
-            except Exception as e:
-                print(f"Error processing resume: {e}")
-
-        background_tasks.add_task(parse_and_store, db_resume.id, contents, file.filename)
+        file_path, content_hash = await jobs.spool_upload(file)
+        try:
+            db_resume = await jobs.create_resume_for_upload(
+                db, user_id, file.filename, file_path, content_hash
+            )
+        except Exception:
+            jobs.remove_upload(file_path)
+            raise
 
         return schemas.ResumeUploadResponse(
             resume_id=str(db_resume.id),
-            status="processing"
+            status=db_resume.status
         )
 
+    except jobs.UploadTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -74,10 +99,10 @@ async def upload_resume(
         )
 
 @router.get("/status/{resume_id}", response_model=schemas.ResumeStatus)
-def get_resume_status(
+async def get_resume_status(
     request: Request,
     resume_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if not hasattr(request.state, 'user_id'):
         raise HTTPException(
@@ -87,18 +112,17 @@ def get_resume_status(
     
     try:
         user_id = UUID(request.state.user_id)
-        resume = db.query(models.Resume).filter(
-            models.Resume.id == resume_id,
-            models.Resume.user_id == user_id
-        ).first()
-        
-        if not resume:
+        row = (await db.execute(
+            select(models.Resume.status, models.Resume.error_message).where(
+                models.Resume.id == resume_id,
+                models.Resume.user_id == user_id
+            )
+        )).first()
+
+        if not row:
             return schemas.ResumeStatus(status="not_found")
 
-        return schemas.ResumeStatus(
-            status=resume.status,
-            parsed_data=resume.parsed_data if resume.status == "done" else None
-        )
+        return schemas.ResumeStatus(status=row.status, error=row.error_message)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -109,21 +133,71 @@ def get_resume_status(
 
 
 
+def parsed_data_etag(resume_id: UUID, content_hash) -> str:
+    # parsed_data is written once, when the resume becomes done, so the
+    # resume and the document it was parsed from identify its content.
+    return f'"{resume_id}:{content_hash or "-"}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+@router.get("/parsed/{resume_id}", response_model=ParsedResume)
+async def get_parsed_resume(
+    request: Request,
+    resume_id: UUID,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Parsed resume JSON with an ETag; If-None-Match revalidations get a 304."""
+    if not hasattr(request.state, 'user_id'):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated - Missing token"
+        )
+
+    row = (await db.execute(
+        select(models.Resume.status, models.Resume.content_hash).where(
+            models.Resume.id == resume_id,
+            models.Resume.user_id == UUID(request.state.user_id)
+        )
+    )).first()
+    if not row or row.status != "done":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not ready or not found"
+        )
+
+    etag = parsed_data_etag(resume_id, row.content_hash)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    parsed_data = await db.scalar(
+        select(models.Resume.parsed_data).where(models.Resume.id == resume_id)
+    )
+    return FastJSONResponse(content=parsed_data, headers=headers)
+
 @router.get("/stream/{resume_id}")
 async def stream_resume_status(
     request: Request,
     resume_id: UUID,
-    token: str = Query(..., description="JWT token for authentication"),
-    db: Session = Depends(get_db)
+    token: str = Query(..., description="JWT token for authentication")
 ):
     try:
         payload = verify_token(token)
+        if not payload:
+            raise JWTError("Invalid or expired token")
         user_id = UUID(payload["sub"])
         
-        resume = db.query(models.Resume).filter(
-            models.Resume.id == resume_id,
-            models.Resume.user_id == user_id
-        ).first()
+        # A short-lived session rather than a dependency, so no connection is
+        # held for the lifetime of the stream.
+        async with AsyncSessionLocal() as db:
+            resume = await db.scalar(select(models.Resume.id).where(
+                models.Resume.id == resume_id,
+                models.Resume.user_id == user_id
+            ))
         
         if not resume:
             raise HTTPException(
@@ -132,35 +206,51 @@ async def stream_resume_status(
             )
 
         async def event_generator():
-            last_status = None
+            queue = status_broker.subscribe(resume_id)
             try:
+                # Read the current state only after subscribing, so a transition
+                # that lands in between is still delivered through the queue.
+                current = await load_resume_status(resume_id)
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + SSE_MAX_STREAM_SECONDS
+                last_status = None
+
                 while True:
-                    db.refresh(resume)
-                    
-                    if resume.status != last_status:
+                    if current["status"] != last_status:
                         event_data = {
-                            "status": resume.status,
-                            "timestamp": datetime.utcnow().isoformat()
+                            "status": current["status"],
+                            "timestamp": datetime.datetime.utcnow().isoformat()
                         }
-                        
-                        if resume.status == "done":
-                            event_data["resume_id"] = str(resume.id)
+
+                        if current["status"] == "done":
+                            event_data["resume_id"] = str(resume_id)
                             yield f"data: {json.dumps(event_data)}\n\n"
                             break
-                        elif resume.status == "error":
-                            event_data["error"] = resume.error_message or "Processing error"
+                        elif current["status"] == "error":
+                            event_data["error"] = current.get("error") or "Processing error"
                             yield f"data: {json.dumps(event_data)}\n\n"
                             break
-                        
+
                         yield f"data: {json.dumps(event_data)}\n\n"
-                        last_status = resume.status
-                    
-                    await asyncio.sleep(1)
-                    
-            except GeneratorExit:
-                pass
+                        last_status = current["status"]
+
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        yield "event: timeout\ndata: {}\n\n"
+                        break
+                    try:
+                        current = await asyncio.wait_for(
+                            queue.get(), timeout=min(SSE_HEARTBEAT_SECONDS, remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        yield ": heartbeat\n\n"
+
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 print(f"SSE generator error: {e}")
+            finally:
+                status_broker.unsubscribe(resume_id, queue)
 
         return StreamingResponse(
             event_generator(),
@@ -183,4 +273,299 @@ async def stream_resume_status(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/batch", response_model=schemas.BatchUploadResponse)
+async def upload_resume_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Upload many PDFs, or zip archives of PDFs, as one batch."""
+    if not hasattr(request.state, 'user_id'):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated - Missing token"
+        )
+
+    try:
+        user_id = UUID(request.state.user_id)
+
+        uploads = []
+        total_bytes = 0
+        try:
+            for file in files:
+                if (file.filename or "").lower().endswith(".zip"):
+                    zip_path, _ = await jobs.spool_upload(file, jobs.BATCH_MAX_ZIP_BYTES)
+                    try:
+                        added = await asyncio.to_thread(
+                            jobs.extract_zip_uploads, zip_path, jobs.MAX_UPLOAD_BYTES,
+                            jobs.BATCH_MAX_TOTAL_BYTES - total_bytes
+                        )
+                    finally:
+                        jobs.remove_upload(zip_path)
+                else:
+                    file_path, content_hash = await jobs.spool_upload(file)
+                    added = [(file.filename, file_path, content_hash)]
+                uploads.extend(added)
+                total_bytes += sum(os.path.getsize(file_path) for _, file_path, _ in added)
+                if total_bytes > jobs.BATCH_MAX_TOTAL_BYTES:
+                    raise jobs.UploadTooLarge(f"Batch exceeds the {jobs.BATCH_MAX_TOTAL_BYTES} byte limit")
+                if len(uploads) > jobs.BATCH_MAX_FILES:
+                    raise jobs.InvalidBatch(f"Batches are limited to {jobs.BATCH_MAX_FILES} files")
+            if not uploads:
+                raise jobs.InvalidBatch("No PDF files in the upload")
+
+            batch, resumes = await jobs.create_batch_for_uploads(db, user_id, uploads)
+        except BaseException:
+            for _, file_path, _ in uploads:
+                jobs.remove_upload(file_path)
+            raise
+
+        return schemas.BatchUploadResponse(
+            batch_id=batch.id,
+            total=batch.total,
+            resumes=[
+                schemas.BatchResumeUpload(resume_id=resume.id, filename=resume.filename, status=resume.status)
+                for resume in resumes
+            ]
+        )
+
+    except jobs.UploadTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error processing request: {str(e)}"
+        )
+
+@router.get("/batch/{batch_id}", response_model=schemas.BatchStatus)
+async def get_batch_status(
+    request: Request,
+    batch_id: UUID,
+    db: AsyncSession = Depends(get_async_db)
+):
+    if not hasattr(request.state, 'user_id'):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated - Missing token"
+        )
+
+    batch = await db.scalar(select(models.ResumeBatch.id).where(
+        models.ResumeBatch.id == batch_id,
+        models.ResumeBatch.user_id == UUID(request.state.user_id)
+    ))
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found or access denied"
+        )
+
+    rows = (await db.execute(
+        select(
+            models.Resume.id,
+            models.Resume.filename,
+            models.Resume.status,
+            models.Resume.error_message
+        )
+        .where(models.Resume.batch_id == batch_id)
+        .order_by(models.Resume.filename)
+    )).all()
+
+    return schemas.BatchStatus(
+        batch_id=batch_id,
+        **batch_progress(Counter(row.status for row in rows)),
+        resumes=[
+            schemas.BatchResumeStatus(
+                resume_id=row.id, filename=row.filename, status=row.status, error=row.error_message
+            )
+            for row in rows
+        ]
+    )
+
+@router.get("/batch/{batch_id}/stream")
+async def stream_batch_status(
+    request: Request,
+    batch_id: UUID,
+    token: str = Query(..., description="JWT token for authentication")
+):
+    """Stream per-resume transitions of a batch, each with the batch's running totals.
+
+    The stream ends once no resume in the batch is still processing.
+    """
+    payload = verify_token(token)
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: Invalid or expired token"
+        )
+
+    async with AsyncSessionLocal() as db:
+        batch = await db.scalar(select(models.ResumeBatch.id).where(
+            models.ResumeBatch.id == batch_id,
+            models.ResumeBatch.user_id == UUID(payload["sub"])
+        ))
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found or access denied"
+        )
+
+    async def event_generator():
+        key = jobs.batch_status_key(batch_id)
+        queue = status_broker.subscribe(key)
+        try:
+            progress = await load_batch_progress(batch_id)
+            yield f"data: {json.dumps({'progress': progress})}\n\n"
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + BATCH_SSE_MAX_STREAM_SECONDS
+
+            while progress["processing"]:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    yield "event: timeout\ndata: {}\n\n"
+                    break
+                try:
+                    events = [await asyncio.wait_for(
+                        queue.get(), timeout=min(SSE_HEARTBEAT_SECONDS, remaining)
+                    )]
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+
+                # Coalesce a burst of completions into one progress query, and
+                # pick up any that landed while it ran.
+                while not queue.empty():
+                    events.append(queue.get_nowait())
+                progress = await load_batch_progress(batch_id)
+                while not queue.empty():
+                    events.append(queue.get_nowait())
+                for event in events:
+                    yield f"data: {json.dumps({**event, 'progress': progress})}\n\n"
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Batch SSE generator error: {e}")
+        finally:
+            status_broker.unsubscribe(key, queue)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+def full_text_filter(dialect: str, q: str):
+    """Dialect-specific full-text condition on the resume search body.
+
+    The PostgreSQL expression matches ix_resumes_search_text_fts exactly so
+    the planner can use the GIN index.
+    """
+    if dialect == "postgresql":
+        return func.to_tsvector(
+            literal_column("'english'"), func.coalesce(models.Resume.search_text, literal_column("''"))
+        ).op("@@")(func.plainto_tsquery(literal_column("'english'"), q))
+    if dialect == "sqlite":
+        # Quoted tokens keep FTS5 query syntax in user input from being interpreted.
+        tokens = [token.replace('"', "") for token in q.split()]
+        match = " ".join(f'"{token}"' for token in tokens if token)
+        if not match:
+            return true()
+        return models.Resume.id.in_(
+            select(literal_column("resume_id")).select_from(text("resume_fts"))
+            .where(text("resume_fts MATCH :match").bindparams(match=match))
+        )
+    return and_(*(models.Resume.search_text.ilike(f"%{token}%") for token in q.split()))
+
+@router.get("/search", response_model=schemas.ResumeSearchResponse)
+async def search_resumes(
+    request: Request,
+    skill: List[str] = Query([], description="Required skills; all must match"),
+    position: Optional[str] = Query(None, description="Job title or title word"),
+    employer: Optional[str] = Query(None),
+    min_years: Optional[float] = Query(None, ge=0),
+    max_years: Optional[float] = Query(None, ge=0),
+    q: Optional[str] = Query(None, description="Full-text query"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if not hasattr(request.state, 'user_id'):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated - Missing token"
+        )
+    user_id = UUID(request.state.user_id)
+
+    query = select(
+        models.Resume.id, models.Resume.filename, models.Resume.years_experience, models.Resume.created_at
+    ).where(models.Resume.user_id == user_id, models.Resume.status == "done")
+
+    terms = [("skill", value) for value in skill]
+    terms += [("position", position), ("employer", employer)]
+    for kind, value in terms:
+        value = normalize_term(value)
+        if value is None:
+            continue
+        query = query.where(exists().where(
+            models.ResumeTerm.resume_id == models.Resume.id,
+            models.ResumeTerm.user_id == user_id,
+            models.ResumeTerm.kind == kind,
+            models.ResumeTerm.value == value
+        ))
+    if min_years is not None:
+        query = query.where(models.Resume.years_experience >= min_years)
+    if max_years is not None:
+        query = query.where(models.Resume.years_experience <= max_years)
+    if q and q.strip():
+        query = query.where(full_text_filter(db.bind.dialect.name, q.strip()))
+    if cursor:
+        created_at, resume_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                models.Resume.created_at < created_at,
+                and_(models.Resume.created_at == created_at, models.Resume.id < resume_id)
+            )
+        )
+
+    rows = (await db.execute(
+        query
+        .order_by(models.Resume.created_at.desc(), models.Resume.id.desc())
+        .limit(limit + 1)
+    )).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    skills = {}
+    if rows:
+        for resume_id, value in (await db.execute(
+            select(models.ResumeTerm.resume_id, models.ResumeTerm.value)
+            .where(
+                models.ResumeTerm.resume_id.in_([row.id for row in rows]),
+                models.ResumeTerm.kind == "skill"
+            )
+            .order_by(models.ResumeTerm.value)
+        )).all():
+            skills.setdefault(resume_id, []).append(value)
+
+    return schemas.ResumeSearchResponse(
+        results=[
+            schemas.ResumeSearchResult(
+                resume_id=row.id,
+                filename=row.filename,
+                years_experience=row.years_experience,
+                skills=skills.get(row.id, []),
+                created_at=row.created_at
+            )
+            for row in rows
+        ],
+        next_cursor=encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    )
@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
+from app.schemas.parsed_resume import ParsedResume
 
 class ChatRequest(BaseModel):
     resume_id: UUID
@@ -20,10 +21,13 @@ class ResumeChatSummary(BaseModel):
     resume_id: UUID
     resume_name: str
     last_message: str
+    last_message_type: Optional[str] = None
     last_message_at: datetime
+    message_count: int = 0
 
 class ChatHistoryResponse(BaseModel):
     resume_id: UUID
     resume_name: str
-    parsed_data: dict
-    messages: List[ChatMessage]
\ No newline at end of file
+    parsed_data: Optional[ParsedResume] = None
+    messages: List[ChatMessage]
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""Typed ``document.resume`` structure, validated once when parsing completes.
+
+Mirrors vlmrun's ``document.resume`` hub schema, but every field is
+optional and dates, URLs and scores stay strings: the VLM and the local
+parser both return partial data (``"2019-01"``, ``"3.8/4.0"``), and a
+resume should not fail to parse over a missing GPA. Unknown keys are kept.
+"""
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import Dict, List, Optional, Union
+
+
+class _Section(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+class ContactInfo(_Section):
+    full_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    linkedin: Optional[str] = None
+    github: Optional[str] = None
+    portfolio: Optional[str] = None
+    google_scholar: Optional[str] = None
+
+
+class Education(_Section):
+    institution: Optional[str] = None
+    degree: Optional[str] = None
+    field_of_study: Optional[str] = None
+    graduation_date: Optional[str] = None
+    gpa: Optional[Union[float, str]] = None
+    honors: Optional[List[str]] = None
+    relevant_courses: Optional[List[str]] = None
+
+
+class WorkExperience(_Section):
+    company: Optional[str] = None
+    position: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    is_current: Optional[bool] = None
+    responsibilities: Optional[List[str]] = None
+    technologies: Optional[List[str]] = None
+
+
+class Skill(_Section):
+    name: str
+    level: Optional[str] = None
+    years_of_experience: Optional[float] = None
+
+
+def _skills(value):
+    # Bare strings are accepted as skill names.
+    if isinstance(value, list):
+        return [{"name": item} if isinstance(item, str) else item for item in value]
+    return value
+
+
+class TechnicalSkills(_Section):
+    programming_languages: Optional[List[Skill]] = None
+    frameworks_libraries: Optional[List[Skill]] = None
+    databases: Optional[List[Skill]] = None
+    tools: Optional[List[Skill]] = None
+    cloud_platforms: Optional[List[Skill]] = None
+    other: Optional[List[Skill]] = None
+
+    _coerce_skills = field_validator("*", mode="before")(_skills)
+
+
+class Project(_Section):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    technologies: Optional[List[str]] = None
+    url: Optional[str] = None
+    github_url: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    role: Optional[str] = None
+    key_achievements: Optional[List[str]] = None
+
+
+class Certification(_Section):
+    name: Optional[str] = None
+    issuer: Optional[str] = None
+    date_obtained: Optional[str] = None
+    expiration_date: Optional[str] = None
+    credential_id: Optional[str] = None
+
+
+class OpenSourceContribution(_Section):
+    project_name: Optional[str] = None
+    contribution_type: Optional[str] = None
+    description: Optional[str] = None
+    url: Optional[str] = None
+
+
+class ParsedResume(_Section):
+    contact_info: Optional[ContactInfo] = None
+    summary: Optional[str] = None
+    education: Optional[List[Education]] = None
+    work_experience: Optional[List[WorkExperience]] = None
+    technical_skills: Optional[TechnicalSkills] = None
+    projects: Optional[List[Project]] = None
+    open_source_contributions: Optional[List[OpenSourceContribution]] = None
+    certifications: Optional[List[Certification]] = None
+    publications: Optional[List[str]] = None
+    conferences: Optional[List[str]] = None
+    languages: Optional[List[Skill]] = None
+    volunteer_work: Optional[List[str]] = None
+    interests: Optional[List[str]] = None
+    references: Optional[str] = None
+    additional_sections: Optional[Dict[str, List[str]]] = None
+
+    _coerce_languages = field_validator("languages", mode="before")(_skills)
+
+
+def validate_parsed_resume(parsed) -> dict:
+    """Validate parser output and return it as plain JSON-ready data.
+
+    Raises pydantic.ValidationError for data that does not fit the schema.
+    Stored resumes have passed through here, so responses can serialize
+    ``parsed_data`` as is instead of validating it again.
+    """
+    return ParsedResume.model_validate(parsed).model_dump(mode="json", exclude_unset=True)
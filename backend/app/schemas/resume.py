@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional, Any
+from datetime import datetime
+from typing import Optional, List
 from uuid import UUID
 
 class ResumeUploadResponse(BaseModel):
@@ -8,5 +9,42 @@ class ResumeUploadResponse(BaseModel):
 
 class ResumeStatus(BaseModel):
     status: str
-    parsed_data: Optional[Any] = None
+    error: Optional[str] = None
 
+
+class BatchResumeUpload(BaseModel):
+    resume_id: UUID
+    filename: str
+    status: str
+
+class BatchUploadResponse(BaseModel):
+    batch_id: UUID
+    total: int
+    resumes: List[BatchResumeUpload]
+
+class BatchResumeStatus(BaseModel):
+    resume_id: UUID
+    filename: str
+    status: str
+    error: Optional[str] = None
+
+class BatchStatus(BaseModel):
+    batch_id: UUID
+    total: int
+    processing: int
+    done: int
+    error: int
+    progress: float
+    resumes: List[BatchResumeStatus] = []
+
+
+class ResumeSearchResult(BaseModel):
+    resume_id: UUID
+    filename: str
+    years_experience: Optional[float] = None
+    skills: List[str] = []
+    created_at: datetime
+
+class ResumeSearchResponse(BaseModel):
+    results: List[ResumeSearchResult]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,110 @@
+"""Chat messages and the per-resume conversation summary kept beside them.
+
+Every message goes through add_chat_message, which stages the message and
+upserts its ``chat_conversations`` row in the caller's transaction, so the
+sidebar listing reads one indexed row per resume instead of scanning chats.
+
+Conversations that predate the summary table can be filled in with:
+
+    python -m app.services.conversations
+"""
+from datetime import datetime
+from uuid import UUID, uuid4
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.model import models
+
+CONVERSATION_PREVIEW_CHARS = 200
+
+_LAST_MESSAGE_COLUMNS = ("last_message_id", "last_message_type", "last_message_preview", "last_message_at")
+
+
+def preview(content: str) -> str:
+    content = " ".join((content or "").split())
+    if len(content) <= CONVERSATION_PREVIEW_CHARS:
+        return content
+    return content[:CONVERSATION_PREVIEW_CHARS - 1].rstrip() + "…"
+
+
+def upsert_conversation(dialect: str, message: models.ChatHistory):
+    """Count the message and move the last-message pointer if it is the newest.
+
+    The timestamp comparison keeps an assistant reply that commits late (a
+    long stream) from replacing a newer question as the last message.
+    """
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    conversation = models.ChatConversation
+    statement = insert(conversation).values(
+        resume_id=message.resume_id,
+        user_id=message.user_id,
+        last_message_id=message.id,
+        last_message_type=message.message_type,
+        last_message_preview=preview(message.content),
+        last_message_at=message.created_at,
+        message_count=1,
+    )
+    newer = statement.excluded.last_message_at >= conversation.last_message_at
+    return statement.on_conflict_do_update(
+        index_elements=[conversation.resume_id],
+        set_={
+            "message_count": conversation.message_count + 1,
+            **{
+                column: case((newer, statement.excluded[column]), else_=getattr(conversation, column))
+                for column in _LAST_MESSAGE_COLUMNS
+            },
+        },
+    )
+
+
+async def add_chat_message(
+    db: AsyncSession, resume_id: UUID, user_id: UUID, message_type: str, content: str
+) -> models.ChatHistory:
+    """Stage a chat message and its conversation update; the caller commits."""
+    message = models.ChatHistory(
+        id=uuid4(),
+        resume_id=resume_id,
+        user_id=user_id,
+        message_type=message_type,
+        content=content,
+        created_at=datetime.utcnow(),
+    )
+    db.add(message)
+    await db.execute(upsert_conversation(db.bind.dialect.name, message))
+    return message
+
+
+def backfill(db) -> int:
+    """Create summary rows for resumes that have chats but no conversation yet."""
+    missing = db.execute(
+        select(models.ChatHistory.resume_id, models.ChatHistory.user_id, func.count())
+        .where(~models.ChatHistory.resume_id.in_(select(models.ChatConversation.resume_id)))
+        .group_by(models.ChatHistory.resume_id, models.ChatHistory.user_id)
+    ).all()
+    for resume_id, user_id, count in missing:
+        last = db.scalars(
+            select(models.ChatHistory)
+            .where(models.ChatHistory.resume_id == resume_id)
+            .order_by(models.ChatHistory.created_at.desc(), models.ChatHistory.id.desc())
+            .limit(1)
+        ).first()
+        db.add(models.ChatConversation(
+            resume_id=resume_id,
+            user_id=user_id,
+            last_message_id=last.id,
+            last_message_type=last.message_type,
+            last_message_preview=preview(last.content),
+            last_message_at=last.created_at,
+            message_count=count,
+        ))
+    db.commit()
+    return len(missing)
+
+
+if __name__ == "__main__":
+    from app.model.database import SessionLocal, engine
+    from app.model.migrations import upgrade_schema
+
+    upgrade_schema(engine)
+    with SessionLocal() as session:
+        print(f"✅ Conversation summaries created for {backfill(session)} resumes")
@@ -0,0 +1,537 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, event, or_, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer
+from app.model import models
+from app.services.prompt import build_resume_summary
+from app.services.search_index import index_resume
+from app.services.status_broker import STATUS_BROKER_BACKEND, notify_status_sql, status_broker
+from dotenv import load_dotenv
+from uuid import UUID, uuid4
+from typing import List, Optional, Tuple, Union
+import aiofiles
+import asyncio
+import hashlib
+import os
+import zipfile
+
+load_dotenv()
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/tmp/resume_uploads")
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+# A running job whose lock is older than this is assumed to belong to a dead
+# worker and becomes claimable again.
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_MAX_ZIP_BYTES = int(os.getenv("BATCH_MAX_ZIP_BYTES", str(200 * 1024 * 1024)))
+# Everything one batch may spool to disk, PDFs extracted from zips included.
+BATCH_MAX_TOTAL_BYTES = int(os.getenv("BATCH_MAX_TOTAL_BYTES", str(500 * 1024 * 1024)))
+# Stored and announced error messages are cut to this many characters; a
+# pydantic ValidationError on a malformed document can run to tens of KB.
+ERROR_MESSAGE_MAX_LENGTH = int(os.getenv("ERROR_MESSAGE_MAX_LENGTH", "1000"))
+# NOTIFY channel that wakes parse workers in other processes (PostgreSQL only).
+PARSE_JOB_CHANNEL = "parse_jobs"
+
+
+INFLIGHT_STATUSES = ("queued", "running")
+
+
+class DedupStats:
+    """Per-process counters for the content-hash upload cache."""
+
+    def __init__(self):
+        self.cache_hits = 0
+        self.inflight_hits = 0
+        self.misses = 0
+
+    def snapshot(self) -> dict:
+        total = self.cache_hits + self.inflight_hits + self.misses
+        hits = self.cache_hits + self.inflight_hits
+        return {
+            "cache_hits": self.cache_hits,
+            "inflight_hits": self.inflight_hits,
+            "misses": self.misses,
+            "total": total,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+
+dedup_stats = DedupStats()
+
+
+class JobWakeup:
+    """Wakes the parse worker of this process as soon as a job is committed.
+
+    ``notify`` may be called from any thread; the worker's event is always
+    set on the worker's own loop.
+    """
+
+    def __init__(self):
+        self._event = None
+        self._loop = None
+
+    def event(self) -> asyncio.Event:
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        return self._event
+
+    def notify(self):
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._event.set()
+        else:
+            self._loop.call_soon_threadsafe(self._event.set)
+
+
+job_wakeup = JobWakeup()
+
+
+def _wake_workers_on_commit(session: Session):
+    if session.info.get("wake_workers"):
+        return
+    session.info["wake_workers"] = True
+
+    @event.listens_for(session, "before_commit", once=True)
+    def _notify_other_processes(session):
+        # Sent with the transaction, so listeners never see the job too early.
+        if session.get_bind().dialect.name == "postgresql":
+            session.execute(text("SELECT pg_notify(:channel, '')"), {"channel": PARSE_JOB_CHANNEL})
+
+    @event.listens_for(session, "after_commit", once=True)
+    def _notify_this_process(session):
+        session.info.pop("wake_workers", None)
+        job_wakeup.notify()
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class InvalidBatch(Exception):
+    pass
+
+
+async def spool_upload(file, max_bytes: int = MAX_UPLOAD_BYTES):
+    """Stream an UploadFile into UPLOAD_DIR chunk by chunk.
+
+    Returns ``(path, sha256_hex)``. Nothing is left on disk if the upload
+    exceeds ``max_bytes`` or fails part way through.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(UPLOAD_DIR, f"{uuid4()}.pdf")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds the {max_bytes} byte limit")
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        remove_upload(path)
+        raise
+    return path, digest.hexdigest()
+
+
+def remove_upload(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def extract_zip_uploads(
+    zip_path: str, max_bytes: int = MAX_UPLOAD_BYTES, max_total_bytes: int = BATCH_MAX_TOTAL_BYTES,
+) -> List[Tuple[str, str, str]]:
+    """Spool every PDF in a zip archive into UPLOAD_DIR.
+
+    Returns ``(filename, path, sha256_hex)`` per PDF. Blocking; run it in a
+    thread. Sizes are checked while copying, not just from the zip headers,
+    against ``max_bytes`` per PDF and ``max_total_bytes`` for the archive.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    extracted = []
+    total = 0
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            for info in archive.infolist():
+                filename = os.path.basename(info.filename)
+                if (
+                    info.is_dir()
+                    or info.filename.startswith("__MACOSX/")
+                    or not filename.lower().endswith(".pdf")
+                ):
+                    continue
+                if len(extracted) >= BATCH_MAX_FILES:
+                    raise InvalidBatch(f"Batches are limited to {BATCH_MAX_FILES} files")
+                if info.file_size > max_bytes:
+                    raise UploadTooLarge(f"{filename} exceeds the {max_bytes} byte limit")
+
+                path = os.path.join(UPLOAD_DIR, f"{uuid4()}.pdf")
+                digest = hashlib.sha256()
+                size = 0
+                with archive.open(info) as src, open(path, "wb") as out:
+                    extracted.append((filename, path, None))
+                    while chunk := src.read(UPLOAD_CHUNK_BYTES):
+                        size += len(chunk)
+                        total += len(chunk)
+                        if size > max_bytes:
+                            raise UploadTooLarge(f"{filename} exceeds the {max_bytes} byte limit")
+                        if total > max_total_bytes:
+                            raise UploadTooLarge(f"Batch exceeds the {BATCH_MAX_TOTAL_BYTES} byte limit")
+                        digest.update(chunk)
+                        out.write(chunk)
+                extracted[-1] = (filename, path, digest.hexdigest())
+    except zipfile.BadZipFile as e:
+        raise InvalidBatch(f"Invalid zip archive: {e}")
+    except BaseException:
+        for _, path, _ in extracted:
+            remove_upload(path)
+        raise
+    return extracted
+
+
+def enqueue_parse_job(
+    db: Union[Session, AsyncSession], resume_id: UUID, file_path: str, filename: str, content_hash: str = None
+) -> models.ParseJob:
+    job = models.ParseJob(
+        resume_id=resume_id,
+        file_path=file_path,
+        filename=filename,
+        content_hash=content_hash,
+        status="queued",
+        max_attempts=JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow(),
+    )
+    db.add(job)
+    _wake_workers_on_commit(db.sync_session if isinstance(db, AsyncSession) else db)
+    return job
+
+
+async def find_parsed_resume(db: AsyncSession, content_hash: str) -> Optional[models.Resume]:
+    return await db.scalar(
+        select(models.Resume)
+        .options(undefer(models.Resume.parsed_data))
+        .where(models.Resume.content_hash == content_hash, models.Resume.status == "done")
+        .limit(1)
+    )
+
+
+async def find_inflight_job(db: AsyncSession, content_hash: str) -> Optional[models.ParseJob]:
+    return await db.scalar(
+        select(models.ParseJob)
+        .where(
+            models.ParseJob.content_hash == content_hash,
+            models.ParseJob.status.in_(INFLIGHT_STATUSES),
+        )
+        .limit(1)
+    )
+
+
+async def create_resume_for_upload(
+    db: AsyncSession, user_id: UUID, filename: str, file_path: str, content_hash: str,
+    _retry: bool = True,
+) -> models.Resume:
+    """Create the Resume for a spooled upload, reusing earlier parses of the same bytes.
+
+    A document that was already parsed is copied over and returned as done, one
+    that is being parsed right now is attached to the in-flight job, and only
+    genuinely new documents are queued for the VLM. The spooled file is handed
+    to the queued job, or removed when it is not needed.
+    """
+    cached = await find_parsed_resume(db, content_hash)
+    if cached is not None:
+        resume = models.Resume(
+            filename=filename,
+            user_id=user_id,
+            content_hash=content_hash,
+            status="done",
+            parsed_data=cached.parsed_data,
+            summary=cached.summary,
+        )
+        db.add(resume)
+        await db.run_sync(index_resume, resume)
+        await db.commit()
+        remove_upload(file_path)
+        dedup_stats.cache_hits += 1
+        return resume
+
+    resume = models.Resume(
+        filename=filename,
+        user_id=user_id,
+        content_hash=content_hash,
+        status="processing",
+    )
+    db.add(resume)
+    await db.flush()
+
+    inflight = await find_inflight_job(db, content_hash)
+    if inflight is not None:
+        await db.commit()
+        remove_upload(file_path)
+        await _sync_with_finished_job(db, inflight, resume)
+        dedup_stats.inflight_hits += 1
+        return resume
+
+    enqueue_parse_job(db, resume.id, file_path, filename, content_hash)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another upload of the same document enqueued its job first.
+        await db.rollback()
+        if not _retry:
+            raise
+        return await create_resume_for_upload(
+            db, user_id, filename, file_path, content_hash, _retry=False
+        )
+
+    dedup_stats.misses += 1
+    return resume
+
+
+async def _sync_with_finished_job(db: AsyncSession, job: models.ParseJob, resume: models.Resume):
+    await _apply_finished_job(db, job, [resume])
+    await db.commit()
+
+
+async def _apply_finished_job(db: AsyncSession, job: models.ParseJob, resumes: List[models.Resume]):
+    # The job may have finished between our lookup and our commit, in which
+    # case its completion did not see these resumes.
+    await db.refresh(job)
+    if job.status == "done":
+        cached = await find_parsed_resume(db, job.content_hash)
+        if cached is not None:
+            for resume in resumes:
+                resume.status = "done"
+                resume.parsed_data = cached.parsed_data
+                resume.summary = cached.summary
+                await db.run_sync(index_resume, resume)
+    elif job.status == "error":
+        for resume in resumes:
+            resume.status = "error"
+            resume.error_message = job.last_error
+
+
+async def create_batch_for_uploads(
+    db: AsyncSession, user_id: UUID, uploads: List[Tuple[str, str, str]], _retry: bool = True,
+) -> Tuple[models.ResumeBatch, List[models.Resume]]:
+    """Create a batch and a Resume per spooled ``(filename, path, hash)`` in one transaction.
+
+    Deduplicates like create_resume_for_upload, including between files of
+    the same batch, and queues one parse job per new document. Parsing then
+    proceeds at the pace of the parse workers, however many files arrive.
+    """
+    hashes = {content_hash for _, _, content_hash in uploads}
+    parsed = {
+        resume.content_hash: resume
+        for resume in (await db.scalars(
+            select(models.Resume)
+            .options(undefer(models.Resume.parsed_data))
+            .where(models.Resume.content_hash.in_(hashes), models.Resume.status == "done")
+        )).all()
+    }
+    inflight = {
+        job.content_hash: job
+        for job in (await db.scalars(
+            select(models.ParseJob).where(
+                models.ParseJob.content_hash.in_(hashes),
+                models.ParseJob.status.in_(INFLIGHT_STATUSES),
+            )
+        )).all()
+    }
+    existing_jobs = dict(inflight)
+
+    batch = models.ResumeBatch(id=uuid4(), user_id=user_id, total=len(uploads))
+    db.add(batch)
+    resumes = []
+    unused_files = []
+    attached = {}
+    counts = {"cache_hits": 0, "inflight_hits": 0, "misses": 0}
+    for filename, file_path, content_hash in uploads:
+        resume = models.Resume(
+            id=uuid4(),
+            filename=filename,
+            user_id=user_id,
+            content_hash=content_hash,
+            batch_id=batch.id,
+            status="processing",
+        )
+        db.add(resume)
+        resumes.append(resume)
+        if content_hash in parsed:
+            resume.status = "done"
+            resume.parsed_data = parsed[content_hash].parsed_data
+            resume.summary = parsed[content_hash].summary
+            await db.run_sync(index_resume, resume)
+            unused_files.append(file_path)
+            counts["cache_hits"] += 1
+        elif content_hash in inflight:
+            if content_hash in existing_jobs:
+                attached.setdefault(content_hash, []).append(resume)
+            unused_files.append(file_path)
+            counts["inflight_hits"] += 1
+        else:
+            inflight[content_hash] = enqueue_parse_job(db, resume.id, file_path, filename, content_hash)
+            counts["misses"] += 1
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent upload enqueued a job for one of these documents first.
+        await db.rollback()
+        if not _retry:
+            raise
+        return await create_batch_for_uploads(db, user_id, uploads, _retry=False)
+
+    for file_path in unused_files:
+        remove_upload(file_path)
+    if attached:
+        for content_hash, waiting in attached.items():
+            await _apply_finished_job(db, existing_jobs[content_hash], waiting)
+        await db.commit()
+
+    dedup_stats.cache_hits += counts["cache_hits"]
+    dedup_stats.inflight_hits += counts["inflight_hits"]
+    dedup_stats.misses += counts["misses"]
+    return batch, resumes
+
+
+def _waiting_resumes(db: Session, job: models.ParseJob) -> List[models.Resume]:
+    """Resumes still waiting on ``job``; ones that already finished are left alone."""
+    query = db.query(models.Resume).filter(models.Resume.status == "processing")
+    if job.content_hash:
+        query = query.filter(
+            or_(models.Resume.id == job.resume_id, models.Resume.content_hash == job.content_hash)
+        )
+    else:
+        query = query.filter(models.Resume.id == job.resume_id)
+    return query.all()
+
+
+def batch_status_key(batch_id) -> str:
+    return f"batch:{batch_id}"
+
+
+def _announce_status(db: Session, resumes: List[models.Resume], event: dict):
+    """Commit the session and tell SSE subscribers about the new status.
+
+    Resumes uploaded in a batch are also announced on the batch's key, with
+    the resume id added to the event.
+    """
+    notifications = []
+    for resume in resumes:
+        notifications.append((resume.id, event))
+        if resume.batch_id:
+            notifications.append((batch_status_key(resume.batch_id), {**event, "resume_id": str(resume.id)}))
+    if STATUS_BROKER_BACKEND == "postgres":
+        for key, payload in notifications:
+            notify_status_sql(db, key, payload)
+    db.commit()
+    if STATUS_BROKER_BACKEND != "postgres":
+        for key, payload in notifications:
+            status_broker.publish(key, payload)
+
+
+def claim_jobs(db: Session, worker_id: str, limit: int) -> List[models.ParseJob]:
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=JOB_LEASE_SECONDS)
+    jobs = (
+        db.query(models.ParseJob)
+        .filter(
+            or_(
+                and_(models.ParseJob.status == "queued", models.ParseJob.run_after <= now),
+                and_(models.ParseJob.status == "running", models.ParseJob.locked_at < stale_before),
+            )
+        )
+        .order_by(models.ParseJob.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for job in jobs:
+        job.status = "running"
+        job.locked_by = worker_id
+        job.locked_at = now
+        job.attempts = (job.attempts or 0) + 1
+    db.commit()
+    for job in jobs:
+        db.refresh(job)
+    db.expunge_all()
+    return jobs
+
+
+def complete_job(db: Session, job_id: UUID, parsed):
+    job = db.get(models.ParseJob, job_id)
+    if not job or job.status != "running":
+        return
+    job.status = "done"
+    job.last_error = None
+    summary = build_resume_summary(parsed)
+    resumes = _waiting_resumes(db, job)
+    for resume in resumes:
+        resume.status = "done"
+        resume.parsed_data = parsed
+        resume.summary = summary
+        resume.error_message = None
+        index_resume(db, resume)
+    _announce_status(db, resumes, {"status": "done"})
+
+
+def truncate_error(error: str, limit: int = ERROR_MESSAGE_MAX_LENGTH) -> str:
+    return error if len(error) <= limit else error[:limit - 1] + "…"
+
+
+def release_job(db: Session, job_id: UUID):
+    """Hand a claimed job back to the queue without counting the attempt."""
+    job = db.get(models.ParseJob, job_id)
+    if not job or job.status != "running":
+        return
+    job.status = "queued"
+    job.attempts = max((job.attempts or 1) - 1, 0)
+    job.locked_by = None
+    job.locked_at = None
+    db.commit()
+
+
+def fail_job(db: Session, job_id: UUID, error: str, permanent: bool = False) -> bool:
+    """Record a failed attempt. Returns True if the job will be retried.
+
+    ``permanent`` errors would fail the same way on every attempt, so the
+    job and its resumes are marked as errored straight away.
+    """
+    job = db.get(models.ParseJob, job_id)
+    if not job:
+        return False
+    if job.status != "running":
+        # Released or already finished elsewhere; this attempt no longer counts.
+        return job.status == "queued"
+    error = truncate_error(error)
+    job.last_error = error
+    job.locked_by = None
+    job.locked_at = None
+    if not permanent and job.attempts < job.max_attempts:
+        job.status = "queued"
+        job.run_after = datetime.utcnow() + timedelta(
+            seconds=JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+        )
+        db.commit()
+        return True
+
+    job.status = "error"
+    resumes = _waiting_resumes(db, job)
+    for resume in resumes:
+        resume.status = "error"
+        resume.error_message = error
+    _announce_status(db, resumes, {"status": "error", "error": error})
+    return False
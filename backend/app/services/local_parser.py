@@ -0,0 +1,320 @@
+"""Rule-based resume extraction from a PDF text layer.
+
+Produces the same shape as the VLM's ``document.resume`` domain so the rest
+of the app cannot tell the two apart. Pure functions over text; no I/O.
+"""
+import re
+from typing import Dict, List, Optional
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "objective", "about", "about me"),
+    "experience": (
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history",
+    ),
+    "education": ("education", "academic background", "education and training"),
+    "skills": ("skills", "technical skills", "core skills", "technologies", "tech stack", "competencies"),
+    "projects": ("projects", "personal projects", "selected projects", "key projects"),
+    "certifications": ("certifications", "certificates", "licenses and certifications"),
+    "languages": ("languages",),
+    "interests": ("interests", "hobbies", "hobbies and interests"),
+    "publications": ("publications",),
+    "volunteer": ("volunteer", "volunteering", "volunteer work", "volunteer experience"),
+}
+_HEADING_LOOKUP = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+SKILL_CATEGORIES = {
+    "programming_languages": {
+        "python", "java", "javascript", "typescript", "go", "golang", "rust", "c", "c++", "c#", "ruby",
+        "php", "kotlin", "swift", "scala", "r", "matlab", "perl", "bash", "shell", "sql", "dart",
+        "elixir", "haskell", "lua", "objective-c",
+    },
+    "frameworks_libraries": {
+        "django", "flask", "fastapi", "react", "angular", "vue", "next.js", "node.js", "express",
+        "spring", "spring boot", "rails", "laravel", ".net", "pandas", "numpy", "pytorch",
+        "tensorflow", "scikit-learn", "keras", "sqlalchemy", "celery", "jquery", "svelte", "graphql",
+    },
+    "databases": {
+        "postgresql", "postgres", "mysql", "sqlite", "mongodb", "redis", "cassandra", "dynamodb",
+        "elasticsearch", "oracle", "sql server", "mariadb", "neo4j", "snowflake", "bigquery",
+    },
+    "cloud_platforms": {"aws", "gcp", "google cloud", "azure", "heroku", "digitalocean", "vercel", "cloudflare"},
+    "tools": {
+        "git", "docker", "kubernetes", "terraform", "ansible", "jenkins", "github actions", "gitlab ci",
+        "jira", "linux", "kafka", "rabbitmq", "nginx", "grafana", "prometheus", "airflow", "spark",
+    },
+}
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+_PRESENT = r"(?:present|current|now|today)"
+DATE_RANGE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to|until)\s*(?P<end>{_DATE}|{_PRESENT})", re.IGNORECASE
+)
+YEAR = re.compile(r"\b(19|20)\d{2}\b")
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+URL = re.compile(r"(?:https?://)?(?:www\.)?[\w-]+\.(?:com|io|dev|org|net|me)(?:/[\w./-]*)?", re.IGNORECASE)
+BULLET = re.compile(r"^\s*(?:[-•*▪●◦·–]|\d+\.)\s+")
+DEGREE = re.compile(
+    r"\b(?:b\.?sc|m\.?sc|b\.?a|m\.?a|b\.?s|m\.?s|b\.?eng|m\.?eng|ph\.?d|mba|bachelor|master|doctor|"
+    r"diploma|associate|high school)\b",
+    re.IGNORECASE,
+)
+INSTITUTION = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic)\b", re.IGNORECASE)
+FIELD_SPLIT = re.compile(r"\s*(?:\||,|;|\s+at\s+|\s+-\s+|\s+–\s+|\s+—\s+)\s*")
+LIST_SPLIT = re.compile(r"\s*(?:,|;|\||•|·)\s*")
+CONTACT_SPLIT = re.compile(r"\s*(?:\||•|·)\s*")
+
+
+def _heading(line: str) -> Optional[str]:
+    key = line.strip().strip(":").strip().lower()
+    if len(key.split()) > 4:
+        return None
+    return _HEADING_LOOKUP.get(key)
+
+
+def split_sections(text: str) -> Dict[str, List[str]]:
+    """Group non-empty lines under the section heading they follow; the rest is ``header``."""
+    sections = {"header": []}
+    current = "header"
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        section = _heading(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def parse_date(value: str) -> Optional[str]:
+    value = value.strip().lower().rstrip(".")
+    if re.fullmatch(_PRESENT, value):
+        return None
+    match = re.fullmatch(rf"({_MONTH})\s+(\d{{4}})", value)
+    if match:
+        return f"{match.group(2)}-{MONTHS[match.group(1)[:3]]:02d}-01"
+    match = re.fullmatch(r"(\d{1,2})/(\d{4})", value)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return f"{match.group(2)}-{int(match.group(1)):02d}-01"
+    match = re.fullmatch(r"\d{4}", value)
+    if match:
+        return f"{value}-01-01"
+    return None
+
+
+def _strip_bullet(line: str) -> str:
+    return BULLET.sub("", line).strip()
+
+
+def parse_contact(lines: List[str]) -> dict:
+    contact = {"full_name": None, "email": None, "phone": None, "address": None}
+    for line in lines:
+        for part in CONTACT_SPLIT.split(line):
+            part = part.strip()
+            if not part:
+                continue
+            if EMAIL.search(part):
+                contact["email"] = contact["email"] or EMAIL.search(part).group(0)
+            elif "linkedin" in part.lower():
+                contact["linkedin"] = _as_url(part)
+            elif "github" in part.lower():
+                contact["github"] = _as_url(part)
+            elif PHONE.fullmatch(part):
+                contact["phone"] = contact["phone"] or part
+            elif URL.fullmatch(part):
+                contact["portfolio"] = _as_url(part)
+            elif contact["full_name"] is None:
+                contact["full_name"] = part
+            elif contact["address"] is None:
+                contact["address"] = part
+    return contact
+
+
+def _as_url(value: str) -> str:
+    value = value.strip()
+    return value if value.startswith("http") else f"https://{value}"
+
+
+def parse_experience(lines: List[str]) -> List[dict]:
+    entries = []
+    pending_title = None
+    for line in lines:
+        match = DATE_RANGE.search(line)
+        if match:
+            title = (line[:match.start()] + line[match.end():]).strip(" |,–—-()")
+            if not title and pending_title:
+                title = pending_title
+                if entries and entries[-1]["responsibilities"] and entries[-1]["responsibilities"][-1] == pending_title:
+                    entries[-1]["responsibilities"].pop()
+            position, company = _split_title(title)
+            end = match.group("end")
+            entries.append({
+                "company": company,
+                "position": position,
+                "start_date": parse_date(match.group("start")),
+                "end_date": parse_date(end),
+                "is_current": bool(re.fullmatch(_PRESENT, end.strip(), re.IGNORECASE)),
+                "responsibilities": [],
+                "technologies": None,
+            })
+            pending_title = None
+        elif entries:
+            entries[-1]["responsibilities"].append(_strip_bullet(line))
+            pending_title = None if BULLET.match(line) else _strip_bullet(line)
+        else:
+            pending_title = line
+    return entries
+
+
+def _split_title(title: str):
+    parts = [part for part in FIELD_SPLIT.split(title) if part]
+    if not parts:
+        return None, None
+    if len(parts) == 1:
+        return parts[0], None
+    return parts[0], parts[1]
+
+
+def parse_education(lines: List[str]) -> List[dict]:
+    entries = []
+    for line in lines:
+        text = _strip_bullet(line)
+        if not (DEGREE.search(text) or INSTITUTION.search(text)):
+            if entries and not BULLET.match(line):
+                entries[-1].setdefault("honors", []).append(text)
+            continue
+        parts = [part for part in FIELD_SPLIT.split(DATE_RANGE.sub("", text)) if part and not YEAR.fullmatch(part)]
+        degree = next((part for part in parts if DEGREE.search(part)), None)
+        institution = next((part for part in parts if INSTITUTION.search(part)), None)
+        if entries and degree and not institution and entries[-1]["degree"] is None:
+            entries[-1]["degree"] = degree
+            continue
+        if entries and institution and not degree and entries[-1]["institution"] is None:
+            entries[-1]["institution"] = institution
+            continue
+        years = [m.group(0) for m in YEAR.finditer(text)]
+        field = None
+        if degree and " in " in degree.lower():
+            degree, field = re.split(r"\s+in\s+", degree, maxsplit=1, flags=re.IGNORECASE)
+        entries.append({
+            "institution": institution,
+            "degree": degree,
+            "field_of_study": field,
+            "graduation_date": f"{years[-1]}-01-01" if years else None,
+            "gpa": None,
+            "honors": None,
+            "relevant_courses": None,
+        })
+    return entries
+
+
+def parse_skills(lines: List[str]) -> dict:
+    skills = {
+        "programming_languages": [],
+        "frameworks_libraries": [],
+        "databases": [],
+        "tools": [],
+        "cloud_platforms": [],
+        "other": [],
+    }
+    seen = set()
+    for line in lines:
+        text = _strip_bullet(line)
+        if ":" in text:
+            text = text.split(":", 1)[1]
+        for name in LIST_SPLIT.split(text):
+            name = name.strip(" .")
+            if not name or len(name) > 40 or name.lower() in seen:
+                continue
+            seen.add(name.lower())
+            category = next(
+                (category for category, known in SKILL_CATEGORIES.items() if name.lower() in known), "other"
+            )
+            skills[category].append({"name": name, "level": None, "years_of_experience": None})
+    return skills
+
+
+def parse_projects(lines: List[str]) -> List[dict]:
+    projects = []
+    for line in lines:
+        if BULLET.match(line) and projects:
+            projects[-1]["key_achievements"].append(_strip_bullet(line))
+            continue
+        name, _, description = _strip_bullet(line).partition(":")
+        if not description and " - " in name:
+            name, _, description = name.partition(" - ")
+        projects.append({
+            "name": name.strip(),
+            "description": description.strip() or None,
+            "technologies": None,
+            "key_achievements": [],
+        })
+    for project in projects:
+        project["key_achievements"] = project["key_achievements"] or None
+    return projects
+
+
+def parse_certifications(lines: List[str]) -> List[dict]:
+    certifications = []
+    for line in lines:
+        parts = [part for part in FIELD_SPLIT.split(_strip_bullet(line)) if part]
+        years = [part for part in parts if YEAR.fullmatch(part)]
+        parts = [part for part in parts if not YEAR.fullmatch(part)]
+        if not parts:
+            continue
+        certifications.append({
+            "name": parts[0],
+            "issuer": parts[1] if len(parts) > 1 else "",
+            "date_obtained": f"{years[0]}-01-01" if years else None,
+        })
+    return certifications
+
+
+def _split_list(lines: List[str]) -> List[str]:
+    return [item for line in lines for item in LIST_SPLIT.split(_strip_bullet(line)) if item]
+
+
+def parse_resume_text(text: str) -> dict:
+    """Extract a ``document.resume`` shaped dict from plain resume text."""
+    sections = split_sections(text)
+    header = sections.get("header", [])
+    summary_lines = sections.get("summary") or []
+    return {
+        "contact_info": parse_contact(header[:6]),
+        "summary": " ".join(_strip_bullet(line) for line in summary_lines) or None,
+        "education": parse_education(sections.get("education", [])),
+        "work_experience": parse_experience(sections.get("experience", [])),
+        "technical_skills": parse_skills(sections.get("skills", [])),
+        "projects": parse_projects(sections.get("projects", [])) or None,
+        "certifications": parse_certifications(sections.get("certifications", [])) or None,
+        "publications": [_strip_bullet(line) for line in sections.get("publications", [])] or None,
+        "languages": [
+            {"name": name, "level": None, "years_of_experience": None}
+            for name in _split_list(sections.get("languages", []))
+        ] or None,
+        "volunteer_work": [_strip_bullet(line) for line in sections.get("volunteer", [])] or None,
+        "interests": _split_list(sections.get("interests", [])) or None,
+    }
+
+
+def is_confident(parsed: dict) -> bool:
+    """Whether the rules found enough structure to skip the VLM."""
+    if not (parsed.get("contact_info") or {}).get("full_name"):
+        return False
+    skills = parsed.get("technical_skills") or {}
+    found = [
+        bool(parsed.get("summary")),
+        bool(parsed.get("work_experience")),
+        bool(parsed.get("education")),
+        any(skills.get(category) for category in skills),
+    ]
+    return bool(parsed.get("work_experience") or parsed.get("education")) and sum(found) >= 2
@@ -1,42 +1,223 @@
 import os
-from openai import OpenAI
+import asyncio
+import random
+import time
+import httpx
+from contextlib import asynccontextmanager
+from openai import AsyncOpenAI, APIConnectionError, APITimeoutError, APIStatusError
+from app.core import metrics
+from app.services.prompt import prompt_builder
+from app.services.response_cache import make_cache_key
 from dotenv import load_dotenv
 
 load_dotenv()
 
 openApiKey=os.getenv("OPENAI_API_KEY")
 
-client = OpenAI(api_key=openApiKey)
-
-def generate_chat_response(parsed_resume, history, user_message):
-    system_prompt = (
-        "You are a helpful resume assistant. Analyze the resume structure and suggest improvements "
-        "based on job-fit, skill gaps, and clarity. Your output should be UI-friendly."
-    )
-
-    summary = f"""
-Name: {parsed_resume.get('contact_info', {}).get('full_name')}
-Summary: {parsed_resume.get('summary')}
-Experience: {[exp.get('position') for exp in parsed_resume.get('work_experience', [])]}
-Skills: {[skill.get('name') for skill in parsed_resume.get('technical_skills', {}).get('programming_languages', [])]}
-"""
-
-    messages = [{"role": "system", "content": system_prompt}]
-    
-    for msg in history[-8:]:
-        role = "user" if msg["message_type"] == "user" else "assistant"
-        messages.append({"role": role, "content": msg["content"]})
-
-    messages.append({
-        "role": "user",
-        "content": f"{user_message}\n\nResume Summary:\n{summary}"
+CHAT_MODEL = "gpt-4"
+CHAT_MAX_TOKENS = 600
+CHAT_TEMPERATURE = 0.7
+# Most recent messages loaded per turn; the prompt builder's token budget
+# decides how many of them are actually sent.
+CHAT_HISTORY_WINDOW = int(os.getenv("CHAT_HISTORY_WINDOW", "40"))
+
+# "openai" talks to the API (or whatever OPENAI_BASE_URL points at); "stub"
+# answers locally so load tests can exercise the chat endpoints offline.
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "16"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+LLM_STUB_LATENCY = float(os.getenv("LLM_STUB_LATENCY", "0"))
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+class OpenAIChatService:
+    """Async chat completions over a shared, pooled HTTP client.
+
+    At most ``max_in_flight`` requests run at once. Connection errors,
+    timeouts and 408/409/429/5xx responses are retried with full-jitter
+    exponential backoff, honouring ``Retry-After`` when the API sends it.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = LLM_MAX_IN_FLIGHT,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        max_retries: int = LLM_MAX_RETRIES,
+        timeout: float = LLM_REQUEST_TIMEOUT,
+        backoff_base: float = LLM_BACKOFF_BASE,
+        backoff_max: float = LLM_BACKOFF_MAX,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self._http_client = None
+        self._client = None
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=self.timeout,
+            )
+            # Retries are handled here, so the SDK's own retry loop is disabled.
+            self._client = AsyncOpenAI(
+                api_key=openApiKey, http_client=self._http_client, max_retries=0
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._client = None
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, (APIConnectionError, APITimeoutError)):
+            return True
+        return isinstance(error, APIStatusError) and error.status_code in RETRYABLE_STATUS_CODES
+
+    async def _create(self, messages, **params):
+        attempt = 0
+        while True:
+            try:
+                return await self.client.chat.completions.create(
+                    model=CHAT_MODEL,
+                    messages=messages,
+                    max_tokens=CHAT_MAX_TOKENS,
+                    temperature=CHAT_TEMPERATURE,
+                    timeout=self.timeout,
+                    **params,
+                )
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+                attempt += 1
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Hold one of the ``max_in_flight`` request slots."""
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    @staticmethod
+    def _record_usage(usage):
+        if usage is not None:
+            metrics.LLM_TOKENS.inc(usage.prompt_tokens or 0, kind="prompt")
+            metrics.LLM_TOKENS.inc(usage.completion_tokens or 0, kind="completion")
+
+    async def complete(self, messages) -> str:
+        async with self._slot():
+            response = await self._create(messages)
+        self._record_usage(response.usage)
+        return response.choices[0].message.content
+
+    async def stream(self, messages):
+        # Only opening the stream is retried; once tokens have been sent to
+        # the caller a failure is surfaced as is.
+        async with self._slot():
+            stream = await self._create(messages, stream=True, stream_options={"include_usage": True})
+            async with stream:
+                async for chunk in stream:
+                    # With include_usage the final chunk has usage and no choices.
+                    self._record_usage(getattr(chunk, "usage", None))
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+
+
+class StubChatService:
+    """Network-free stand-in with the same interface as OpenAIChatService."""
+
+    def __init__(self, latency: float = LLM_STUB_LATENCY, reply: str = None):
+        self.latency = latency
+        self.reply = reply or (
+            "Your resume is clear overall. Lead each role with a measurable outcome, "
+            "group skills by domain, and tighten the summary to two sentences."
+        )
+
+    async def aclose(self):
+        pass
+
+    async def complete(self, messages) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.reply
+
+    async def stream(self, messages):
+        words = self.reply.split(" ")
+        for i, word in enumerate(words):
+            if self.latency:
+                await asyncio.sleep(self.latency / len(words))
+            yield word if i == 0 else " " + word
+
+
+def create_chat_service(backend: str = LLM_BACKEND):
+    if backend == "stub":
+        return StubChatService()
+    return OpenAIChatService()
+
+
+chat_service = create_chat_service()
+
+def chat_cache_key(resume_key, user_message):
+    return make_cache_key(user_message, resume_key, {
+        "model": CHAT_MODEL,
+        "max_tokens": CHAT_MAX_TOKENS,
+        "temperature": CHAT_TEMPERATURE,
     })
 
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=messages,
-        max_tokens=600,
-        temperature=0.7,
-    )
+async def generate_chat_response(resume_summary, history, user_message):
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        reply = await chat_service.complete(prompt_builder.build(resume_summary, history, user_message))
+        outcome = "ok"
+        return reply
+    finally:
+        metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, operation="complete", outcome=outcome)
 
-    return response.choices[0].message.content
+async def stream_chat_response(resume_summary, history, user_message):
+    """Yield the assistant reply piece by piece as the model produces it."""
+    started = time.perf_counter()
+    first_token = True
+    outcome = "error"
+    try:
+        async for delta in chat_service.stream(prompt_builder.build(resume_summary, history, user_message)):
+            if first_token:
+                metrics.LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+                first_token = False
+            yield delta
+        outcome = "ok"
+    except GeneratorExit:
+        # The client went away and the stream was closed early.
+        outcome = "abandoned"
+        raise
+    finally:
+        metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, operation="stream", outcome=outcome)
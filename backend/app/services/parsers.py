@@ -0,0 +1,128 @@
+import asyncio
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dotenv import load_dotenv
+from app.services import vlm
+from app.services.local_parser import is_confident, parse_resume_text
+
+load_dotenv()
+
+# "auto" parses text-layer PDFs locally and sends scans (and anything the
+# local rules cannot make sense of) to the VLM. "local" never uses the
+# network; "vlm" always does.
+RESUME_PARSER = os.getenv("RESUME_PARSER", "auto")
+LOCAL_PARSER_MAX_PAGES = int(os.getenv("LOCAL_PARSER_MAX_PAGES", "10"))
+
+
+class ResumeParser(ABC):
+    """Turns an uploaded PDF into a ``document.resume`` shaped dict."""
+
+    name = "base"
+
+    @abstractmethod
+    async def parse(self, file_path: str, filename: str) -> dict:
+        ...
+
+
+class VLMResumeParser(ResumeParser):
+    name = "vlm"
+
+    def __init__(self, pipeline: vlm.ResumeParsingPipeline = None):
+        self._pipeline = pipeline
+
+    @property
+    def pipeline(self) -> vlm.ResumeParsingPipeline:
+        # Resolved on use so tests can swap vlm.pipeline after import.
+        return self._pipeline or vlm.pipeline
+
+    async def parse(self, file_path: str, filename: str) -> dict:
+        return await self.pipeline.parse(file_path, filename)
+
+
+class LocalParseError(Exception):
+    pass
+
+
+class LocalResumeParser(ResumeParser):
+    """CPU-only parser: PDF text layer plus rule-based field extraction."""
+
+    name = "local"
+
+    def __init__(self, max_pages: int = LOCAL_PARSER_MAX_PAGES, require_confident: bool = False):
+        self.max_pages = max_pages
+        self.require_confident = require_confident
+
+    def parse_file(self, file_path: str) -> dict:
+        pages, text = vlm.extract_text_layer(file_path, self.max_pages)
+        if not vlm.has_text_layer(text, pages):
+            raise LocalParseError("PDF has no usable text layer")
+        parsed = parse_resume_text(text)
+        if self.require_confident and not is_confident(parsed):
+            raise LocalParseError("Too little resume structure found in the text layer")
+        return parsed
+
+    async def parse(self, file_path: str, filename: str) -> dict:
+        return await asyncio.to_thread(self.parse_file, file_path)
+
+
+class ParserStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.parsed = {}
+        self.seconds = {}
+        self.fallbacks = 0
+
+    def record(self, backend: str, seconds: float):
+        with self._lock:
+            self.parsed[backend] = self.parsed.get(backend, 0) + 1
+            self.seconds[backend] = self.seconds.get(backend, 0.0) + seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "parsed": dict(self.parsed),
+                "avg_ms": {
+                    backend: round(self.seconds[backend] / count * 1000, 1)
+                    for backend, count in self.parsed.items()
+                },
+                "fallbacks": self.fallbacks,
+            }
+
+
+class RoutingResumeParser(ResumeParser):
+    """Tries the local parser first and falls back to the VLM when it declines."""
+
+    name = "auto"
+
+    def __init__(self, local: LocalResumeParser = None, remote: ResumeParser = None):
+        self.local = local or LocalResumeParser(require_confident=True)
+        self.remote = remote or VLMResumeParser()
+        self.stats = ParserStats()
+
+    async def parse(self, file_path: str, filename: str) -> dict:
+        started = time.perf_counter()
+        try:
+            parsed = await self.local.parse(file_path, filename)
+            self.stats.record(self.local.name, time.perf_counter() - started)
+            return parsed
+        except LocalParseError as e:
+            print(f"Local parse of {filename} declined ({e}); using {self.remote.name}")
+            self.stats.fallbacks += 1
+
+        started = time.perf_counter()
+        parsed = await self.remote.parse(file_path, filename)
+        self.stats.record(self.remote.name, time.perf_counter() - started)
+        return parsed
+
+
+def create_parser(kind: str = RESUME_PARSER) -> ResumeParser:
+    if kind == "local":
+        return LocalResumeParser()
+    if kind == "vlm":
+        return VLMResumeParser()
+    return RoutingResumeParser()
+
+
+resume_parser = create_parser()
@@ -0,0 +1,90 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+# Context budget for everything we send; the reply budget is kept free on top.
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "7000"))
+# Per-message framing overhead in the chat format.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SYSTEM_PROMPT = (
+    "You are a helpful resume assistant. Analyze the resume structure and suggest improvements "
+    "based on job-fit, skill gaps, and clarity. Your output should be UI-friendly."
+)
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    # Without tiktoken, ~4 characters per token is close enough for budgeting.
+    return len(text) // 4 + 1
+
+
+def build_resume_summary(parsed_resume) -> str:
+    """Compact text view of a parsed resume, computed once when parsing completes."""
+    parsed_resume = parsed_resume or {}
+    contact = parsed_resume.get("contact_info") or {}
+    positions = [
+        exp.get("position") for exp in parsed_resume.get("work_experience") or [] if exp.get("position")
+    ]
+    skills = [
+        skill.get("name")
+        for skill in (parsed_resume.get("technical_skills") or {}).get("programming_languages") or []
+        if skill.get("name")
+    ]
+    return (
+        f"Name: {contact.get('full_name')}\n"
+        f"Summary: {parsed_resume.get('summary')}\n"
+        f"Experience: {', '.join(positions)}\n"
+        f"Skills: {', '.join(skills)}"
+    )
+
+
+class PromptBuilder:
+    """Assembles chat prompts within a token budget.
+
+    The system prompt and the current question (with the resume summary) are
+    always included; the remaining budget is filled with history, newest
+    message first, so long messages push older turns out instead of
+    overflowing the context.
+    """
+
+    def __init__(self, token_budget: int = PROMPT_TOKEN_BUDGET, system_prompt: str = SYSTEM_PROMPT):
+        self.token_budget = token_budget
+        self.system_prompt = system_prompt
+        self._system_tokens = count_tokens(system_prompt) + MESSAGE_OVERHEAD_TOKENS
+
+    def build(self, resume_summary: str, history, user_message: str):
+        final = {
+            "role": "user",
+            "content": f"{user_message}\n\nResume Summary:\n{resume_summary}",
+        }
+        remaining = (
+            self.token_budget
+            - self._system_tokens
+            - count_tokens(final["content"])
+            - MESSAGE_OVERHEAD_TOKENS
+        )
+
+        selected = []
+        for msg in reversed(history):
+            cost = count_tokens(msg["content"]) + MESSAGE_OVERHEAD_TOKENS
+            if cost > remaining:
+                break
+            remaining -= cost
+            role = "user" if msg["message_type"] == "user" else "assistant"
+            selected.append({"role": role, "content": msg["content"]})
+
+        return [{"role": "system", "content": self.system_prompt}, *reversed(selected), final]
+
+
+prompt_builder = PromptBuilder()
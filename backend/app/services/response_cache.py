@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+from cachetools import TTLCache
+from dotenv import load_dotenv
+from sqlalchemy import delete, select
+from app.model import models
+from app.model.database import AsyncSessionLocal
+
+load_dotenv()
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+# "memory" keeps entries per process; "database" shares them across processes.
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    message = _PUNCTUATION.sub(" ", message.lower())
+    return _WHITESPACE.sub(" ", message).strip()
+
+
+def make_cache_key(message: str, resume_key: str, params: dict) -> str:
+    raw = json.dumps(
+        {"message": normalize_message(message), "resume": resume_key, "params": params},
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class MemoryCacheBackend:
+    """Per-process LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl: int = LLM_CACHE_TTL_SECONDS):
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: str):
+        self._cache[key] = value
+
+
+class DatabaseCacheBackend:
+    """Cache shared by every web process through the llm_response_cache table.
+
+    Each write also deletes expired rows and the oldest rows beyond
+    ``max_entries``, so the table stays bounded like the memory backend.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl: int = LLM_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[str]:
+        async with AsyncSessionLocal() as db:
+            entry = await db.get(models.LLMResponseCache, key)
+            if entry is None or entry.expires_at < datetime.utcnow():
+                return None
+            return entry.response
+
+    async def set(self, key: str, value: str):
+        now = datetime.utcnow()
+        table = models.LLMResponseCache
+        async with AsyncSessionLocal() as db:
+            await db.merge(table(key=key, response=value, expires_at=now + timedelta(seconds=self.ttl)))
+            await db.flush()
+            await db.execute(delete(table).where(table.expires_at < now))
+            # Entries share one TTL, so the latest expiry is the newest entry.
+            overflow = select(table.key).order_by(table.expires_at.desc()).offset(self.max_entries)
+            await db.execute(delete(table).where(table.key.in_(overflow)))
+            await db.commit()
+
+
+class ResponseCache:
+    def __init__(self, backend=None, enabled: bool = LLM_CACHE_ENABLED):
+        self.enabled = enabled
+        self.backend = backend or self._default_backend()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def _default_backend():
+        if LLM_CACHE_BACKEND == "database":
+            return DatabaseCacheBackend()
+        return MemoryCacheBackend()
+
+    async def get(self, key: Optional[str]) -> Optional[str]:
+        # A None key marks a request that is never cached.
+        if not self.enabled or key is None:
+            return None
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            # A broken cache should cost a model call, not fail the request.
+            print(f"LLM cache read failed: {e}")
+            self.errors += 1
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: Optional[str], value: str):
+        if not self.enabled or key is None or not value:
+            return
+        try:
+            await self.backend.set(key, value)
+        except Exception as e:
+            print(f"LLM cache write failed: {e}")
+            self.errors += 1
+
+    def snapshot(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+response_cache = ResponseCache()
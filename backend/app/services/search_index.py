@@ -0,0 +1,180 @@
+"""Search fields derived from parsed resumes.
+
+Skills, positions and employers go into the ``resume_terms`` side table so
+filters are plain indexed equality lookups on any database. Years of
+experience and a full-text body are stored on the resume itself; the body
+is indexed by a GIN expression index on PostgreSQL and an FTS5 table on
+SQLite (see models).
+
+Existing resumes can be indexed after an upgrade with:
+
+    python -m app.services.search_index
+"""
+import re
+from datetime import date
+from typing import Iterable, List, Optional, Set, Tuple
+from uuid import uuid4
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.model import models
+from app.services.local_parser import parse_date
+
+TERM_MAX_LENGTH = 200
+_SPACES = re.compile(r"\s+")
+_WORD = re.compile(r"[a-z0-9+#.]{3,}")
+
+
+def normalize_term(value) -> Optional[str]:
+    """Lower-case and collapse whitespace so "Python " and "python" match."""
+    if not isinstance(value, str):
+        return None
+    value = _SPACES.sub(" ", value).strip().lower()
+    return value[:TERM_MAX_LENGTH] or None
+
+
+def _to_date(value) -> Optional[date]:
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    match = re.match(r"(\d{4})(?:-(\d{1,2}))?", value)
+    if match:
+        month = int(match.group(2) or 1)
+        return date(int(match.group(1)), month if 1 <= month <= 12 else 1, 1)
+    parsed = parse_date(value)
+    return date.fromisoformat(parsed) if parsed else None
+
+
+def years_of_experience(work_experience: Iterable[dict], today: date = None) -> Optional[float]:
+    """Total years covered by the work history, counting overlapping roles once."""
+    today = today or date.today()
+    intervals: List[Tuple[date, date]] = []
+    for experience in work_experience or []:
+        start = _to_date(experience.get("start_date"))
+        if start is None:
+            continue
+        end = None if experience.get("is_current") else _to_date(experience.get("end_date"))
+        end = min(end or today, today)
+        if end > start:
+            intervals.append((start, end))
+    if not intervals:
+        return None
+
+    intervals.sort()
+    days = 0
+    current_start, current_end = intervals[0]
+    for start, end in intervals[1:]:
+        if start > current_end:
+            days += (current_end - current_start).days
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    days += (current_end - current_start).days
+    return round(days / 365.25, 1)
+
+
+def _skill_names(parsed: dict) -> Set[str]:
+    skills = set()
+    for entries in (parsed.get("technical_skills") or {}).values():
+        for skill in entries or []:
+            name = normalize_term(skill.get("name") if isinstance(skill, dict) else skill)
+            if name:
+                skills.add(name)
+    return skills
+
+
+def search_fields(parsed: dict) -> dict:
+    """Extract the indexed fields from a ``document.resume`` dict."""
+    parsed = parsed or {}
+    work = [entry for entry in parsed.get("work_experience") or [] if isinstance(entry, dict)]
+
+    skills = _skill_names(parsed)
+    positions = set()
+    employers = set()
+    for entry in work:
+        position = normalize_term(entry.get("position"))
+        if position:
+            # The full title for exact filters, and its words so that
+            # "engineer" matches "Senior Backend Engineer".
+            positions.add(position)
+            positions.update(_WORD.findall(position))
+        employer = normalize_term(entry.get("company"))
+        if employer:
+            employers.add(employer)
+
+    contact = parsed.get("contact_info") or {}
+    text_parts = [contact.get("full_name"), parsed.get("summary")]
+    for entry in work:
+        text_parts += [entry.get("position"), entry.get("company")]
+        text_parts += entry.get("responsibilities") or []
+        text_parts += entry.get("technologies") or []
+    for entry in parsed.get("education") or []:
+        if isinstance(entry, dict):
+            text_parts += [entry.get("institution"), entry.get("degree"), entry.get("field_of_study")]
+    for entry in parsed.get("projects") or []:
+        if isinstance(entry, dict):
+            text_parts += [entry.get("name"), entry.get("description")]
+    for entry in parsed.get("certifications") or []:
+        if isinstance(entry, dict):
+            text_parts += [entry.get("name"), entry.get("issuer")]
+    text_parts += sorted(skills)
+
+    return {
+        "skills": skills,
+        "positions": positions,
+        "employers": employers,
+        "years_experience": years_of_experience(work),
+        "search_text": "\n".join(part for part in text_parts if isinstance(part, str) and part.strip()),
+    }
+
+
+def index_resume(db: Session, resume: models.Resume):
+    """Set the search columns of a finished resume and replace its terms.
+
+    Safe to call again for a resume that is already indexed; the caller
+    commits. Async sessions call it through ``run_sync``.
+    """
+    fields = search_fields(resume.parsed_data)
+    if resume.id is None:
+        resume.id = uuid4()
+    for term in [obj for obj in db.new if isinstance(obj, models.ResumeTerm)]:
+        if term.resume_id == resume.id:
+            db.expunge(term)
+    db.execute(delete(models.ResumeTerm).where(models.ResumeTerm.resume_id == resume.id))
+    resume.years_experience = fields["years_experience"]
+    resume.search_text = fields["search_text"]
+    for kind, values in (
+        ("skill", fields["skills"]),
+        ("position", fields["positions"]),
+        ("employer", fields["employers"]),
+    ):
+        for value in values:
+            db.add(models.ResumeTerm(resume_id=resume.id, user_id=resume.user_id, kind=kind, value=value))
+
+
+def backfill(db, batch_size: int = 500) -> int:
+    """Index done resumes that predate the search columns."""
+    indexed = 0
+    while True:
+        resumes = db.scalars(
+            select(models.Resume)
+            .where(models.Resume.status == "done", models.Resume.search_text.is_(None))
+            .limit(batch_size)
+        ).all()
+        if not resumes:
+            return indexed
+        for resume in resumes:
+            index_resume(db, resume)
+            # Keeps resumes without any indexable text from being picked again.
+            resume.search_text = resume.search_text or ""
+        db.commit()
+        indexed += len(resumes)
+        print(f"Indexed {indexed} resumes")
+
+
+if __name__ == "__main__":
+    from app.model.database import SessionLocal, engine
+    from app.model.migrations import upgrade_schema
+
+    upgrade_schema(engine)
+    with SessionLocal() as session:
+        print(f"✅ Search index backfilled for {backfill(session)} resumes")
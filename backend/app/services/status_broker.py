@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+from collections import defaultdict
+from typing import Dict, Set
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STATUS_CHANNEL = "resume_status"
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more, failing the commit.
+NOTIFY_MAX_PAYLOAD_BYTES = 7900
+# "local" delivers events only inside the publishing process. "postgres" sends
+# them through NOTIFY so web processes see transitions made by separate workers.
+STATUS_BROKER_BACKEND = os.getenv(
+    "STATUS_BROKER_BACKEND",
+    "postgres" if (os.getenv("DATABASE_URL") or "").startswith("postgres") else "local",
+)
+
+
+class StatusBroker:
+    """In-process pub/sub of resume status transitions, keyed by resume id.
+
+    ``publish`` may be called from worker threads; delivery always happens on
+    the event loop the subscribers live on.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._loop = None
+
+    def subscribe(self, key) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        self._subscribers[str(key)].add(queue)
+        return queue
+
+    def unsubscribe(self, key, queue: asyncio.Queue):
+        queues = self._subscribers.get(str(key))
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[str(key)]
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, key, event: dict):
+        if self._loop is None or str(key) not in self._subscribers:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._deliver(str(key), event)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, str(key), event)
+
+    def _deliver(self, key: str, event: dict):
+        for queue in self._subscribers.get(key, ()):
+            queue.put_nowait(event)
+
+
+status_broker = StatusBroker()
+
+
+def notify_status_sql(db, key, event: dict):
+    """Queue a NOTIFY in the caller's transaction; it is sent on commit."""
+    payload = json.dumps({"key": str(key), "event": event})
+    if len(payload.encode()) > NOTIFY_MAX_PAYLOAD_BYTES:
+        # Subscribers fall back to a generic message; the full text stays on the row.
+        event = {name: value for name, value in event.items() if name != "error"}
+        payload = json.dumps({"key": str(key), "event": event})
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": STATUS_CHANNEL, "payload": payload})
+
+
+async def listen_channel(database_url: str, channel: str, callback):
+    """Call ``callback(payload)`` for every NOTIFY on ``channel`` until cancelled.
+
+    Reconnects after connection errors. Notifications sent while the
+    listener is disconnected are lost.
+    """
+    import asyncpg
+
+    dsn = database_url.replace("postgresql+psycopg2://", "postgresql://").replace(
+        "postgresql+asyncpg://", "postgresql://"
+    )
+
+    def on_notify(connection, pid, channel, payload):
+        callback(payload)
+
+    while True:
+        try:
+            conn = await asyncpg.connect(dsn)
+            try:
+                await conn.add_listener(channel, on_notify)
+                while not conn.is_closed():
+                    await asyncio.sleep(5)
+            finally:
+                await conn.close()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Listener error on {channel}: {e}")
+        await asyncio.sleep(1)
+
+
+async def listen_postgres(database_url: str, broker: StatusBroker = status_broker):
+    """Forward NOTIFY events from Postgres into the local broker until cancelled."""
+
+    def on_payload(payload):
+        message = json.loads(payload)
+        broker.publish(message["key"], message["event"])
+
+    await listen_channel(database_url, STATUS_CHANNEL, on_payload)
@@ -1,37 +1,599 @@
 from pathlib import Path
 from vlmrun.client import VLMRun
 from vlmrun.client.types import PredictionResponse
-import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 from dotenv import load_dotenv
+from PIL import Image
+from app.core import metrics
+import pypdfium2 as pdfium
+import asyncio
 import os
-import tempfile
+import threading
+import time
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    # opencv-python needs system libraries (libGL) that slim images lack;
+    # pages are then sent without background clean-up.
+    cv2 = None
 
 load_dotenv()
 
 
 API_KEY=os.getenv("VLM_API_KEY")
+VLM_MAX_CONCURRENCY = int(os.getenv("VLM_MAX_CONCURRENCY", "8"))
+VLM_JOB_TIMEOUT = float(os.getenv("VLM_JOB_TIMEOUT", "120"))
+VLM_POLL_INITIAL_INTERVAL = float(os.getenv("VLM_POLL_INITIAL_INTERVAL", "1"))
+VLM_POLL_MAX_INTERVAL = float(os.getenv("VLM_POLL_MAX_INTERVAL", "10"))
+# Opt-in: with at least this many predictions due at once (minimum 2), the
+# account's most recent predictions are listed first and due ids found there
+# with a usable payload skip their own status check. The list is not filtered
+# by id, so this only saves requests when this process is the only traffic on
+# the API key. 0 (the default) always checks predictions one by one.
+VLM_POLL_BATCH_MIN = int(os.getenv("VLM_POLL_BATCH_MIN", "0"))
+
+# Local pre-processing before submission: only the first VLM_MAX_PAGES pages
+# are sent, and scanned pages are re-rendered as downscaled JPEGs.
+VLM_PREPROCESS = os.getenv("VLM_PREPROCESS", "true").lower() == "true"
+VLM_MAX_PAGES = int(os.getenv("VLM_MAX_PAGES", "10"))
+VLM_RENDER_DPI = int(os.getenv("VLM_RENDER_DPI", "150"))
+VLM_IMAGE_MAX_DIM = int(os.getenv("VLM_IMAGE_MAX_DIM", "1700"))
+VLM_IMAGE_QUALITY = int(os.getenv("VLM_IMAGE_QUALITY", "70"))
+VLM_IMAGE_GRAYSCALE = os.getenv("VLM_IMAGE_GRAYSCALE", "true").lower() == "true"
+# Whiten the paper tint and scanner speckle of grayscale scans (needs opencv).
+VLM_IMAGE_CLEAN_BACKGROUND = os.getenv("VLM_IMAGE_CLEAN_BACKGROUND", "true").lower() == "true"
+# Fewer extracted characters per page than this means the page is a scan.
+VLM_TEXT_LAYER_MIN_CHARS = int(os.getenv("VLM_TEXT_LAYER_MIN_CHARS", "200"))
+
+# PDFium is not thread-safe; every call into it goes through this lock.
+_pdfium_lock = threading.Lock()
 
-vlm = VLMRun(api_key=API_KEY)
+_vlm = None
 
-def upload_resume_to_vlm(file: bytes, filename: str):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(file)
-        tmp_path = tmp.name
+def get_vlm_client() -> VLMRun:
+    # VLMRun pings the API on construction, so build it on first use rather
+    # than at import time.
+    global _vlm
+    if _vlm is None:
+        _vlm = VLMRun(api_key=API_KEY)
+    return _vlm
 
-    response: PredictionResponse = vlm.document.generate(
-        file=Path(tmp_path),
+def upload_resume_to_vlm(file_path: str, client=None):
+    client = client or get_vlm_client()
+    response: PredictionResponse = client.document.generate(
+        file=Path(file_path),
         domain="document.resume"
     )
 
-    return response.id 
-
-def poll_parsing_result(task_id: str, timeout=120):
-    start = time.time()
-    while time.time() - start < timeout:
-        result = vlm.document.get(task_id)
-        if result.status == "completed":
-            return result.response
-        elif result.status == "failed":
-            raise Exception(f"VLM parsing failed: {result.errors}")
-        time.sleep(5) 
-    raise TimeoutError(f"Task {task_id} timed out after {timeout} seconds")
+    return response.id
+
+
+class PreparedDocument:
+    """What pre-processing made of an upload, and the file to submit instead."""
+
+    def __init__(self, source_path: str):
+        self.source_path = source_path
+        self.path = source_path
+        self.original_bytes = os.path.getsize(source_path)
+        self.page_count = 0
+        self.pages_sent = 0
+        self.has_text_layer = False
+        self.rasterized = False
+        self.preprocess_seconds = 0.0
+
+    @property
+    def sent_bytes(self) -> int:
+        return os.path.getsize(self.path)
+
+    def cleanup(self):
+        if self.path != self.source_path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def _page_texts(pdf, pages: int):
+    for index in range(pages):
+        page = pdf[index]
+        textpage = page.get_textpage()
+        try:
+            yield textpage.get_text_bounded()
+        finally:
+            textpage.close()
+            page.close()
+
+
+def _read_text(pdf, pages: int) -> str:
+    return "\n".join(_page_texts(pdf, pages))
+
+
+def has_text_layer(text: str, pages: int) -> bool:
+    return pages > 0 and len(text.strip()) >= VLM_TEXT_LAYER_MIN_CHARS * pages
+
+
+def _pdf_has_text_layer(pdf, pages: int) -> bool:
+    """has_text_layer without keeping the text, reading only as many pages as it takes."""
+    needed = VLM_TEXT_LAYER_MIN_CHARS * pages
+    found = 0
+    for text in _page_texts(pdf, pages):
+        found += len(text.strip())
+        if found >= needed:
+            return pages > 0
+    return False
+
+
+def extract_text_layer(file_path: str, max_pages: int = VLM_MAX_PAGES):
+    """Return ``(pages_read, text)`` from the PDF's text layer; ``(0, "")`` if unreadable."""
+    try:
+        with _pdfium_lock:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                pages = min(len(pdf), max_pages)
+                return pages, _read_text(pdf, pages)
+            finally:
+                pdf.close()
+    except pdfium.PdfiumError:
+        return 0, ""
+
+
+def clean_background(image: Image.Image) -> Image.Image:
+    """Set the background of a grayscale document page to pure white.
+
+    Pixels lighter than the page's Otsu threshold become white, which JPEG
+    encodes far more compactly than noisy off-white. Pages that are not
+    mostly background (photos, dark designs) are returned unchanged.
+    """
+    if cv2 is None or image.mode != "L":
+        return image
+    pixels = np.array(image)
+    threshold, _ = cv2.threshold(pixels, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    background = pixels > threshold
+    if background.mean() < 0.8:
+        return image
+    pixels[background] = 255
+    return Image.fromarray(pixels)
+
+
+def _render_page(page, dpi: int, max_dim: int) -> Image.Image:
+    width, height = page.get_size()
+    scale = min(dpi / 72, max_dim / max(width, height, 1))
+    image = page.render(scale=scale).to_pil()
+    image = image.convert("L" if VLM_IMAGE_GRAYSCALE else "RGB")
+    return clean_background(image) if VLM_IMAGE_CLEAN_BACKGROUND else image
+
+
+def preprocess_pdf(
+    file_path: str,
+    max_pages: int = VLM_MAX_PAGES,
+    dpi: int = VLM_RENDER_DPI,
+    max_dim: int = VLM_IMAGE_MAX_DIM,
+    quality: int = VLM_IMAGE_QUALITY,
+) -> PreparedDocument:
+    """Inspect a PDF locally and build a smaller one for the VLM where possible.
+
+    Only enough of the text layer is read to tell text PDFs from scans; the
+    local parser extracts the text itself. PDFs with a text layer are only
+    trimmed to ``max_pages``; scans are re-rendered as downscaled JPEG pages,
+    kept only if that actually shrinks the file. Files PDFium cannot open are
+    passed through untouched. Blocking; run it in a thread.
+    """
+    started = time.perf_counter()
+    doc = PreparedDocument(file_path)
+    output_path = f"{file_path}.vlm.pdf"
+    images = []
+    try:
+        with _pdfium_lock:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                doc.page_count = len(pdf)
+                doc.pages_sent = min(doc.page_count, max_pages)
+                if doc.pages_sent < doc.page_count:
+                    print(
+                        f"Sending the first {doc.pages_sent} of {doc.page_count} pages of "
+                        f"{os.path.basename(file_path)} to the VLM"
+                    )
+                doc.has_text_layer = _pdf_has_text_layer(pdf, doc.pages_sent)
+
+                if not doc.has_text_layer:
+                    for index in range(doc.pages_sent):
+                        page = pdf[index]
+                        images.append(_render_page(page, dpi, max_dim))
+                        page.close()
+                elif doc.pages_sent < doc.page_count:
+                    trimmed = pdfium.PdfDocument.new()
+                    trimmed.import_pages(pdf, list(range(doc.pages_sent)))
+                    trimmed.save(output_path)
+                    trimmed.close()
+                    doc.path = output_path
+            finally:
+                pdf.close()
+
+        if images:
+            images[0].save(
+                output_path, "PDF", save_all=True, append_images=images[1:],
+                resolution=dpi, quality=quality,
+            )
+            if os.path.getsize(output_path) < doc.original_bytes:
+                doc.path = output_path
+                doc.rasterized = True
+            else:
+                os.remove(output_path)
+    except pdfium.PdfiumError as e:
+        print(f"PDF pre-processing skipped for {file_path}: {e}")
+    finally:
+        for image in images:
+            image.close()
+    doc.preprocess_seconds = time.perf_counter() - started
+    return doc
+
+
+class PreprocessStats:
+    """Bytes and time per document, as sent to the VLM, for the admin stats."""
+
+    def __init__(self, recent: int = 100):
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.original_bytes = 0
+        self.sent_bytes = 0
+        self.pages_trimmed = 0
+        self.rasterized = 0
+        self.preprocess_seconds = 0.0
+        self.submit_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.recent = deque(maxlen=recent)
+
+    def record(self, doc: PreparedDocument, sent_bytes: int, submit_seconds: float):
+        with self._lock:
+            self.documents += 1
+            self.original_bytes += doc.original_bytes
+            self.sent_bytes += sent_bytes
+            self.pages_trimmed += doc.page_count - doc.pages_sent
+            self.rasterized += int(doc.rasterized)
+            self.preprocess_seconds += doc.preprocess_seconds
+            self.submit_seconds += submit_seconds
+            self.recent.append({
+                "file": os.path.basename(doc.source_path),
+                "original_bytes": doc.original_bytes,
+                "sent_bytes": sent_bytes,
+                "pages": doc.page_count,
+                "pages_sent": doc.pages_sent,
+                "text_layer": doc.has_text_layer,
+                "rasterized": doc.rasterized,
+                "preprocess_ms": round(doc.preprocess_seconds * 1000, 1),
+                "submit_ms": round(submit_seconds * 1000, 1),
+            })
+
+    def record_parse(self, seconds: float):
+        with self._lock:
+            self.parse_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            documents = self.documents or 1
+            return {
+                "documents": self.documents,
+                "original_bytes": self.original_bytes,
+                "sent_bytes": self.sent_bytes,
+                "bytes_saved": self.original_bytes - self.sent_bytes,
+                "pages_trimmed": self.pages_trimmed,
+                "rasterized": self.rasterized,
+                "avg_preprocess_ms": round(self.preprocess_seconds / documents * 1000, 1),
+                "avg_submit_ms": round(self.submit_seconds / documents * 1000, 1),
+                "avg_parse_ms": round(self.parse_seconds / documents * 1000, 1),
+                "recent": list(self.recent),
+            }
+
+
+class _PendingPrediction:
+    def __init__(self, future: asyncio.Future, first_delay: float):
+        now = time.monotonic()
+        self.future = future
+        self.submitted_at = now
+        self.interval = first_delay
+        self.next_poll_at = now + first_delay
+        self.polls = 0
+
+
+class PollScheduler:
+    """Single owner of every outstanding VLM prediction in the process.
+
+    Callers ``await wait(task_id)``; one background task polls whatever is
+    due, backing off exponentially per prediction, and resolves each
+    caller's future when its prediction finishes. The first poll is timed
+    from recent completion times rather than fired immediately. See
+    VLM_POLL_BATCH_MIN for the optional list call.
+    """
+
+    HISTOGRAM_BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120, 300)
+
+    def __init__(
+        self,
+        get_prediction,
+        list_predictions=None,
+        run=None,
+        initial_interval: float = VLM_POLL_INITIAL_INTERVAL,
+        max_interval: float = VLM_POLL_MAX_INTERVAL,
+        backoff: float = 2.0,
+        batch_min: int = VLM_POLL_BATCH_MIN,
+    ):
+        self._get_prediction = get_prediction
+        self._list_predictions = list_predictions
+        self._run = run or asyncio.to_thread
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.batch_min = max(batch_min, 2) if batch_min else 0
+        self._pending = {}
+        self._wakeup = None
+        self._task = None
+        self._recent = deque(maxlen=50)
+        self.requests = 0
+        self.poll_errors = 0
+        self.completed = 0
+        self.failed = 0
+        self.histogram = [0] * (len(self.HISTOGRAM_BUCKETS) + 1)
+
+    def _first_delay(self) -> float:
+        if len(self._recent) < 5:
+            return self.initial_interval
+        median = sorted(self._recent)[len(self._recent) // 2]
+        return min(max(median * 0.8, self.initial_interval), self.max_interval)
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._loop())
+
+    @property
+    def outstanding(self) -> int:
+        """Predictions that callers are still waiting on."""
+        return sum(1 for pending in self._pending.values() if not pending.future.done())
+
+    async def wait(self, task_id: str):
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[task_id] = _PendingPrediction(future, self._first_delay())
+        self._wakeup.set()
+        try:
+            return await future
+        finally:
+            self._pending.pop(task_id, None)
+
+    async def aclose(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _loop(self):
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            due = [
+                (task_id, pending) for task_id, pending in list(self._pending.items())
+                if pending.next_poll_at <= now and not pending.future.done()
+            ]
+            if due:
+                try:
+                    await self._poll(due)
+                except Exception as e:
+                    # Never let one bad poll kill the loop every caller depends on.
+                    self.poll_errors += 1
+                    print(f"VLM status polling failed: {e}")
+                    self._fail(due, e)
+                continue
+
+            waiting = [p.next_poll_at for p in self._pending.values() if not p.future.done()]
+            timeout = max(min(waiting) - now, 0) if waiting else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, due):
+        results = {}
+        if self._list_predictions is not None and self.batch_min and len(due) >= self.batch_min:
+            try:
+                listed = await self._run(self._list_predictions, min(len(self._pending) * 2, 100))
+                if listed is None:
+                    # The client cannot list predictions; stop trying.
+                    self._list_predictions = None
+                else:
+                    self.requests += 1
+                    metrics.VLM_STATUS_REQUESTS.inc(kind="list")
+                    results = {
+                        str(prediction.id): prediction for prediction in listed
+                        if self._usable_listing(prediction)
+                    }
+            except Exception as e:
+                self.poll_errors += 1
+                print(f"VLM prediction listing failed: {e}")
+
+        async def check(task_id):
+            if task_id in results:
+                return results[task_id]
+            self.requests += 1
+            metrics.VLM_STATUS_REQUESTS.inc(kind="get")
+            return await self._run(self._get_prediction, task_id)
+
+        outcomes = await asyncio.gather(*(check(task_id) for task_id, _ in due), return_exceptions=True)
+        for (task_id, pending), result in zip(due, outcomes):
+            pending.polls += 1
+            if pending.future.done():
+                continue
+            status = getattr(result, "status", None)
+            if isinstance(result, Exception):
+                self.poll_errors += 1
+                print(f"VLM status check for {task_id} failed: {result}")
+            elif status is None:
+                self.poll_errors += 1
+                self._fail([(task_id, pending)], Exception(f"Malformed VLM status response: {result!r}"))
+                continue
+            elif status == "completed":
+                self._record(pending)
+                self.completed += 1
+                pending.future.set_result(result.response)
+                continue
+            elif status == "failed":
+                self._record(pending)
+                self.failed += 1
+                pending.future.set_exception(
+                    Exception(f"VLM parsing failed: {getattr(result, 'errors', None)}")
+                )
+                continue
+            pending.interval = min(max(pending.interval, self.initial_interval) * self.backoff, self.max_interval)
+            pending.next_poll_at = time.monotonic() + pending.interval
+
+    @staticmethod
+    def _usable_listing(prediction) -> bool:
+        # Listings may leave out the response; a completed prediction without
+        # one is checked individually rather than resolved to None.
+        status = getattr(prediction, "status", None)
+        return status is not None and (status != "completed" or getattr(prediction, "response", None) is not None)
+
+    def _fail(self, due, error: Exception):
+        for _, pending in due:
+            if not pending.future.done():
+                self.failed += 1
+                pending.future.set_exception(error)
+
+    def _record(self, pending: _PendingPrediction):
+        elapsed = time.monotonic() - pending.submitted_at
+        self._recent.append(elapsed)
+        for index, bound in enumerate(self.HISTOGRAM_BUCKETS):
+            if elapsed <= bound:
+                self.histogram[index] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+
+    def snapshot(self) -> dict:
+        finished = self.completed + self.failed
+        labels = [f"<={bound}s" for bound in self.HISTOGRAM_BUCKETS] + [f">{self.HISTOGRAM_BUCKETS[-1]}s"]
+        return {
+            "outstanding": len(self._pending),
+            "completed": self.completed,
+            "failed": self.failed,
+            "requests": self.requests,
+            "requests_per_prediction": round(self.requests / finished, 2) if finished else 0.0,
+            "poll_errors": self.poll_errors,
+            "median_seconds": round(sorted(self._recent)[len(self._recent) // 2], 3) if self._recent else None,
+            "time_to_completion": dict(zip(labels, self.histogram)),
+        }
+
+
+class ResumeParsingPipeline:
+    """Runs VLM parse jobs on the event loop.
+
+    Uploads are pre-processed locally (see ``preprocess_pdf``) before they are
+    submitted. The VLMRun SDK is synchronous, so each HTTP call is pushed
+    onto a small dedicated executor, and status polling for all jobs is left
+    to a shared PollScheduler. At most ``max_concurrency`` jobs are in flight,
+    and every job is bounded by ``job_timeout`` seconds end to end.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_concurrency: int = VLM_MAX_CONCURRENCY,
+        job_timeout: float = VLM_JOB_TIMEOUT,
+        poll_initial_interval: float = VLM_POLL_INITIAL_INTERVAL,
+        poll_max_interval: float = VLM_POLL_MAX_INTERVAL,
+        poll_backoff: float = 2.0,
+        preprocess: bool = VLM_PREPROCESS,
+    ):
+        self._client = client
+        self.preprocess = preprocess
+        self.stats = PreprocessStats()
+        self.max_concurrency = max_concurrency
+        self.job_timeout = job_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="vlm"
+        )
+        self.scheduler = PollScheduler(
+            self._get_prediction,
+            list_predictions=self._list_predictions,
+            run=self._run,
+            initial_interval=poll_initial_interval,
+            max_interval=poll_max_interval,
+            backoff=poll_backoff,
+        )
+
+    @property
+    def client(self):
+        return self._client or get_vlm_client()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _get_prediction(self, task_id: str) -> PredictionResponse:
+        return self.client.document.get(task_id)
+
+    def _list_predictions(self, limit: int):
+        predictions = getattr(self.client, "predictions", None)
+        if predictions is None or not hasattr(predictions, "list"):
+            return None
+        return predictions.list(limit=limit)
+
+    def _prepare_and_upload(self, file_path: str) -> str:
+        submit_started = time.perf_counter()
+        doc = preprocess_pdf(file_path) if self.preprocess else PreparedDocument(file_path)
+        try:
+            sent_bytes = doc.sent_bytes
+            started = time.perf_counter()
+            task_id = upload_resume_to_vlm(doc.path, self._client)
+            self.stats.record(doc, sent_bytes, time.perf_counter() - started)
+            metrics.VLM_SUBMIT_SECONDS.observe(time.perf_counter() - submit_started)
+            return task_id
+        finally:
+            doc.cleanup()
+
+    async def submit(self, file_path: str) -> str:
+        return await self._run(self._prepare_and_upload, file_path)
+
+    async def poll(self, task_id: str):
+        return await self.scheduler.wait(task_id)
+
+    async def parse(self, file_path: str, filename: str):
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                return await asyncio.wait_for(
+                    self._submit_and_poll(file_path), timeout=self.job_timeout
+                )
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"Parsing {filename} timed out after {self.job_timeout} seconds"
+                )
+            finally:
+                self.in_flight -= 1
+
+    async def _submit_and_poll(self, file_path: str):
+        started = time.perf_counter()
+        task_id = await self.submit(file_path)
+        poll_started = time.perf_counter()
+        outcome = "failed"
+        try:
+            result = await self.poll(task_id)
+            outcome = "completed"
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            metrics.VLM_POLL_SECONDS.observe(time.perf_counter() - poll_started, outcome=outcome)
+        self.stats.record_parse(time.perf_counter() - started)
+        return result
+
+
+pipeline = ResumeParsingPipeline()
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import socket
+from contextlib import suppress
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
+from pydantic import ValidationError
+from sqlalchemy.engine import make_url
+from app.model.database import DATABASE_URL, SessionLocal, engine
+from app.model.migrations import upgrade_schema
+from app.model import models
+from app.routes.metrics import parser_stats, refresh_process_gauges, render_metrics, require_scrape_access, vlm_stats
+from app.services import jobs, parsers, vlm
+from app.services.status_broker import listen_channel
+from app.schemas.parsed_resume import validate_parsed_resume
+
+load_dotenv()
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", str(vlm.VLM_MAX_CONCURRENCY)))
+# New jobs wake the worker straight away (in-process, or through NOTIFY on
+# PostgreSQL); polling only catches retries coming due and missed wakeups.
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "2"))
+# A standalone worker records the VLM and parser metrics, so it serves its
+# own /metrics and /stats on this port (0 = off). Same token as the web app.
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "0"))
+
+
+# Errors that retrying the same file cannot fix.
+PERMANENT_ERRORS = (ValidationError, parsers.LocalParseError)
+
+
+def _with_session(func, *args):
+    db = SessionLocal()
+    try:
+        return func(db, *args)
+    finally:
+        db.close()
+
+
+async def process_job(job: models.ParseJob):
+    try:
+        parsed = await parsers.resume_parser.parse(job.file_path, job.filename)
+        if not parsed:
+            raise Exception("Parser returned an empty result")
+        parsed = await asyncio.to_thread(validate_parsed_resume, parsed)
+        await asyncio.to_thread(_with_session, jobs.complete_job, job.id, parsed)
+    except asyncio.CancelledError:
+        await asyncio.to_thread(_with_session, jobs.release_job, job.id)
+        raise
+    except Exception as e:
+        print(f"Error processing resume {job.resume_id} (attempt {job.attempts}): {e}")
+        will_retry = await asyncio.to_thread(
+            _with_session, jobs.fail_job, job.id, str(e), isinstance(e, PERMANENT_ERRORS)
+        )
+        if will_retry:
+            return
+
+    jobs.remove_upload(job.file_path)
+
+
+async def run_worker(
+    worker_id: str = None,
+    concurrency: int = WORKER_CONCURRENCY,
+    poll_interval: float = WORKER_POLL_INTERVAL,
+):
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    running = set()
+    wakeup = jobs.job_wakeup.event()
+    listener = None
+    if DATABASE_URL and make_url(DATABASE_URL).get_backend_name() == "postgresql":
+        listener = asyncio.create_task(
+            listen_channel(DATABASE_URL, jobs.PARSE_JOB_CHANNEL, lambda payload: wakeup.set())
+        )
+    print(f"Parse worker {worker_id} started (concurrency={concurrency})")
+    try:
+        while True:
+            # Cleared before claiming, so a job committed meanwhile is not missed.
+            wakeup.clear()
+            free = concurrency - len(running)
+            claimed = []
+            if free > 0:
+                try:
+                    claimed = await asyncio.to_thread(
+                        _with_session, jobs.claim_jobs, worker_id, free
+                    )
+                except Exception as e:
+                    print(f"Error claiming parse jobs: {e}")
+
+            for job in claimed:
+                task = asyncio.create_task(process_job(job))
+                running.add(task)
+                task.add_done_callback(running.discard)
+
+            if not claimed:
+                woken = asyncio.create_task(wakeup.wait())
+                try:
+                    await asyncio.wait(
+                        running | {woken}, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    woken.cancel()
+    finally:
+        if listener is not None:
+            listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await listener
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+metrics_app = FastAPI(title="Parse worker metrics", docs_url=None, redoc_url=None, openapi_url=None)
+
+
+@metrics_app.get("/metrics")
+def get_worker_metrics(request: Request):
+    require_scrape_access(request)
+    refresh_process_gauges()
+    return render_metrics()
+
+
+@metrics_app.get("/stats")
+def get_worker_stats(request: Request):
+    require_scrape_access(request)
+    return {"vlm": vlm_stats(), "parsers": parser_stats()}
+
+
+def metrics_server(port: int = WORKER_METRICS_PORT, host: str = "0.0.0.0") -> uvicorn.Server:
+    return uvicorn.Server(uvicorn.Config(metrics_app, host=host, port=port, lifespan="off", log_level="warning"))
+
+
+async def main():
+    if not WORKER_METRICS_PORT:
+        await run_worker()
+        return
+    server = metrics_server()
+    worker = asyncio.create_task(run_worker())
+    serving = asyncio.create_task(server.serve())
+    try:
+        await asyncio.wait({worker, serving}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        server.should_exit = True
+        worker.cancel()
+        with suppress(asyncio.CancelledError):
+            await worker
+        await serving
+
+
+if __name__ == "__main__":
+    upgrade_schema(engine)
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""Auth middleware latency benchmark.
+
+Times a trivial protected route behind the old BaseHTTPMiddleware-based
+AuthMiddleware (decoding the JWT on every request) and behind the current
+pure ASGI AuthMiddleware, and reports p50/p99 per variant.
+
+    cd backend
+    python -m benchmarks.auth_middleware --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="auth-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bench.db"
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+import httpx
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from jose import JWTError, jwt
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.auth import ALGORITHM, SECRET_KEY, create_access_token
+from app.main import UNPROTECTED_PATHS, AuthMiddleware
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """The middleware as it was before the ASGI rewrite."""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method == "OPTIONS":
+            return await call_next(request)
+        if request.url.path in UNPROTECTED_PATHS:
+            return await call_next(request)
+
+        auth_header = request.headers.get("Authorization")
+        if not auth_header:
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Missing authorization token"},
+            )
+        try:
+            scheme, token = auth_header.split()
+            if scheme.lower() != "bearer":
+                raise JWTError("Invalid scheme")
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            request.state.user_id = payload.get("sub")
+            if not request.state.user_id:
+                raise JWTError("Missing sub in payload")
+        except (JWTError, ValueError) as e:
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": f"Invalid token: {str(e)}"},
+            )
+        return await call_next(request)
+
+
+def make_app(middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping(request: Request):
+        return {"user_id": request.state.user_id}
+
+    app.add_middleware(middleware)
+    return app
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_variant(app: FastAPI, headers: dict, requests: int, warmup: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(warmup):
+            await client.get("/ping", headers=headers)
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get("/ping", headers=headers)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return {
+        "requests": requests,
+        "p50_us": round(percentile(samples, 0.50) * 1e6, 1),
+        "p99_us": round(percentile(samples, 0.99) * 1e6, 1),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 1),
+    }
+
+
+async def run(args):
+    token = create_access_token({"sub": "00000000-0000-0000-0000-000000000001"})
+    headers = {"Authorization": f"Bearer {token}"}
+    results = {}
+    for name, middleware in (("base_http_middleware", LegacyAuthMiddleware), ("asgi_middleware", AuthMiddleware)):
+        results[name] = await run_variant(make_app(middleware), headers, args.requests, args.warmup)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+
+    json.dump(asyncio.run(run(args)), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""HTTP stand-ins for the VLM Run and OpenAI APIs.
+
+Serves the subset of both APIs the backend uses, on one port under /v1,
+so the app can be pointed at it with VLMRUN_BASE_URL and OPENAI_BASE_URL
+and run unmodified:
+
+* VLM Run: health check, direct file upload, document generation and
+  prediction status (single and list). Predictions finish ``vlm_latency``
+  seconds after submission and fail with probability ``vlm_failure_rate``.
+* OpenAI: chat completions, plain and streamed (with usage). Requests take
+  ``llm_latency`` seconds and fail with a 503 with probability
+  ``llm_failure_rate``.
+
+Latencies vary uniformly by +/- ``jitter`` of their value.
+
+    cd backend
+    python -m benchmarks.fake_servers --port 9100 --vlm-latency 2 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from datetime import datetime, timezone
+from fastapi import FastAPI, Request, UploadFile, File
+from fastapi.responses import JSONResponse, StreamingResponse
+from benchmarks.fakes import SAMPLE_RESUME
+
+
+class FakeSettings:
+    def __init__(
+        self,
+        vlm_latency: float = 1.0,
+        vlm_failure_rate: float = 0.0,
+        llm_latency: float = 0.5,
+        llm_failure_rate: float = 0.0,
+        jitter: float = 0.5,
+        reply_words: int = 60,
+    ):
+        self.vlm_latency = vlm_latency
+        self.vlm_failure_rate = vlm_failure_rate
+        self.llm_latency = llm_latency
+        self.llm_failure_rate = llm_failure_rate
+        self.jitter = jitter
+        self.reply_words = reply_words
+
+    def vary(self, seconds: float) -> float:
+        return max(0.0, seconds * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def create_app(settings: FakeSettings = None) -> FastAPI:
+    settings = settings or FakeSettings()
+    app = FastAPI()
+    ids = itertools.count()
+    # prediction id -> (ready_at, failed, created_at)
+    predictions = {}
+    counters = {"files": 0, "predictions": 0, "status_checks": 0, "chat_completions": 0, "llm_failures": 0}
+
+    def prediction_body(prediction_id: str) -> dict:
+        ready_at, failed, created_at = predictions[prediction_id]
+        body = {
+            "id": prediction_id,
+            "created_at": created_at,
+            "status": "pending",
+            "response": None,
+            "domain": "document.resume",
+            "usage": {"elements_processed": 1, "element_type": "page", "credits_used": 1},
+        }
+        if time.monotonic() >= ready_at:
+            body["completed_at"] = _now()
+            body["status"] = "failed" if failed else "completed"
+            body["response"] = None if failed else SAMPLE_RESUME
+        return body
+
+    @app.get("/v1/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/v1/files/hash/{file_hash}")
+    async def file_by_hash(file_hash: str):
+        # Never cached, so every document is uploaded like a new one.
+        return {"id": None, "filename": None, "bytes": 0, "purpose": "assistants", "created_at": _now()}
+
+    @app.post("/v1/files", status_code=201)
+    async def upload_file(file: UploadFile = File(...)):
+        size = len(await file.read())
+        counters["files"] += 1
+        return {
+            "id": f"file-{next(ids)}",
+            "filename": file.filename,
+            "bytes": size,
+            "purpose": "assistants",
+            "created_at": _now(),
+        }
+
+    @app.post("/v1/document/generate")
+    async def generate(request: Request):
+        await request.json()
+        prediction_id = f"pred-{next(ids)}"
+        failed = random.random() < settings.vlm_failure_rate
+        predictions[prediction_id] = (time.monotonic() + settings.vary(settings.vlm_latency), failed, _now())
+        counters["predictions"] += 1
+        return prediction_body(prediction_id)
+
+    @app.get("/v1/predictions/{prediction_id}")
+    async def get_prediction(prediction_id: str):
+        counters["status_checks"] += 1
+        if prediction_id not in predictions:
+            return JSONResponse(status_code=404, content={"detail": "Prediction not found"})
+        return prediction_body(prediction_id)
+
+    @app.get("/v1/predictions")
+    async def list_predictions(skip: int = 0, limit: int = 10):
+        counters["status_checks"] += 1
+        newest = list(predictions)[::-1][skip:skip + limit]
+        return [prediction_body(prediction_id) for prediction_id in newest]
+
+    def chunk(completion_id: str, delta: dict = None, finish_reason=None, usage=None) -> str:
+        body = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": "fake",
+            "choices": [] if usage else [{"index": 0, "delta": delta or {}, "finish_reason": finish_reason}],
+        }
+        if usage:
+            body["usage"] = usage
+        return f"data: {json.dumps(body)}\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        counters["chat_completions"] += 1
+        if random.random() < settings.llm_failure_rate:
+            counters["llm_failures"] += 1
+            return JSONResponse(
+                status_code=503,
+                content={"error": {"message": "injected failure", "type": "server_error"}},
+            )
+
+        prompt_tokens = sum(len(str(message.get("content", ""))) // 4 + 4 for message in body.get("messages", []))
+        words = [random.choice(("resume", "skills", "impact", "summary", "role", "clear")) for _ in range(settings.reply_words)]
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(words),
+            "total_tokens": prompt_tokens + len(words),
+        }
+        completion_id = f"chatcmpl-{next(ids)}"
+        latency = settings.vary(settings.llm_latency)
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "fake",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": " ".join(words)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        async def events():
+            # A third of the latency before the first token, the rest spread
+            # over the reply.
+            await asyncio.sleep(latency / 3)
+            yield chunk(completion_id, {"role": "assistant", "content": ""})
+            for index, word in enumerate(words):
+                await asyncio.sleep(latency * 2 / 3 / len(words))
+                yield chunk(completion_id, {"content": word if index == 0 else " " + word})
+            yield chunk(completion_id, finish_reason="stop")
+            if include_usage:
+                yield chunk(completion_id, usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return counters
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--vlm-latency", type=float, default=1.0)
+    parser.add_argument("--vlm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.5)
+    args = parser.parse_args()
+
+    settings = FakeSettings(
+        vlm_latency=args.vlm_latency,
+        vlm_failure_rate=args.vlm_failure_rate,
+        llm_latency=args.llm_latency,
+        llm_failure_rate=args.llm_failure_rate,
+        jitter=args.jitter,
+    )
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import itertools
+import random
+import time
+from types import SimpleNamespace
+
+SAMPLE_RESUME = {
+    "contact_info": {"full_name": "Jane Doe", "email": "jane@example.com"},
+    "summary": "Backend engineer with eight years of experience building APIs.",
+    "work_experience": [
+        {"position": "Senior Engineer", "company": "Acme", "start_date": "2019-01", "end_date": None},
+        {"position": "Engineer", "company": "Globex", "start_date": "2016-03", "end_date": "2018-12"},
+    ],
+    "technical_skills": {
+        "programming_languages": [{"name": "Python"}, {"name": "Go"}, {"name": "SQL"}],
+    },
+}
+
+
+class FakeVLMClient:
+    """In-process stand-in for the VLMRun client used by services.vlm.
+
+    Jobs complete after ``latency`` seconds and fail with probability
+    ``failure_rate``.
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, response: dict = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.response = response or SAMPLE_RESUME
+        self._ids = itertools.count()
+        self._jobs = {}
+        self.document = SimpleNamespace(generate=self.generate, get=self.get)
+
+    def generate(self, file=None, domain=None, **kwargs):
+        job_id = f"fake-{next(self._ids)}"
+        failed = random.random() < self.failure_rate
+        self._jobs[job_id] = (time.monotonic() + self.latency, failed)
+        return SimpleNamespace(id=job_id, status="pending", response=None)
+
+    def get(self, job_id):
+        ready_at, failed = self._jobs[job_id]
+        if time.monotonic() < ready_at:
+            return SimpleNamespace(id=job_id, status="pending", response=None)
+        self._jobs.pop(job_id)
+        if failed:
+            return SimpleNamespace(id=job_id, status="failed", response=None, errors="injected failure")
+        return SimpleNamespace(id=job_id, status="completed", response=self.response)
+
+
+SAMPLE_RESUME_LINES = [
+    "Jane Doe",
+    "jane@example.com | +1 555 010 2030 | Berlin, Germany",
+    "SUMMARY",
+    "Backend engineer with eight years of experience building APIs.",
+    "EXPERIENCE",
+    "Senior Engineer, Acme | Jan 2019 - Present",
+    "- Led the migration of the billing platform to event-driven services.",
+    "- Cut p99 API latency by 40 percent through query and cache work.",
+    "Engineer, Globex | Mar 2016 - Dec 2018",
+    "- Built internal tooling for data pipelines in Python and Go.",
+    "EDUCATION",
+    "BSc Computer Science, Technical University of Berlin | 2012 - 2016",
+    "SKILLS",
+    "Python, Go, SQL, PostgreSQL, Docker, Kubernetes",
+]
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_text_pdf(pages) -> bytes:
+    """A minimal PDF with a real text layer; ``pages`` is a list of line lists."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        stream = "BT /F1 11 Tf 14 TL 56 780 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in lines
+        ) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode("latin-1"))
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>".encode()
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def make_scanned_pdf(pages: int, dpi: int = 300, quality: int = 95) -> bytes:
+    """An image-only PDF resembling a colour scan of the sample resume."""
+    import io
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(7)
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    images = []
+    for _ in range(pages):
+        image = Image.new("RGB", (width, height), (250, 248, 240))
+        draw = ImageDraw.Draw(image)
+        for i, line in enumerate(SAMPLE_RESUME_LINES):
+            draw.text((dpi, dpi + i * dpi // 4), line, fill=(20, 20, 20))
+        # Scanner noise keeps the JPEG from compressing unrealistically well.
+        for _ in range(width * height // 200):
+            shade = rng.randint(200, 255)
+            draw.point((rng.randrange(width), rng.randrange(height)), fill=(shade, shade, shade))
+        images.append(image)
+    buffer = io.BytesIO()
+    images[0].save(buffer, "PDF", save_all=True, append_images=images[1:], resolution=dpi, quality=quality)
+    return buffer.getvalue()
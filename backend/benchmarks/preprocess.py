@@ -0,0 +1,62 @@
+"""VLM pre-processing benchmark.
+
+Runs preprocess_pdf over synthetic scanned and text-layer resumes of
+different lengths and reports bytes before and after, pre-processing time,
+and the upload time saved at a given uplink bandwidth.
+
+    cd backend
+    python -m benchmarks.preprocess --pages 1,3,10,20 --uplink-mbps 20
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.services.vlm import preprocess_pdf
+from benchmarks.fakes import SAMPLE_RESUME_LINES, make_scanned_pdf, make_text_pdf
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", default="1,3,10,20")
+    parser.add_argument("--uplink-mbps", type=float, default=20.0)
+    parser.add_argument("--scan-dpi", type=int, default=300)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="preprocess-bench-")
+    results = []
+    for pages in (int(n) for n in args.pages.split(",")):
+        for kind, data in (
+            ("scan", make_scanned_pdf(pages, dpi=args.scan_dpi)),
+            ("text", make_text_pdf([SAMPLE_RESUME_LINES] * pages)),
+        ):
+            path = os.path.join(workdir, f"{kind}-{pages}.pdf")
+            with open(path, "wb") as f:
+                f.write(data)
+            doc = preprocess_pdf(path)
+            sent = doc.sent_bytes
+            upload_saved_ms = (doc.original_bytes - sent) * 8 / (args.uplink_mbps * 1e6) * 1000
+            results.append({
+                "kind": kind,
+                "pages": doc.page_count,
+                "pages_sent": doc.pages_sent,
+                "original_bytes": doc.original_bytes,
+                "sent_bytes": sent,
+                "text_layer": doc.has_text_layer,
+                "rasterized": doc.rasterized,
+                "preprocess_ms": round(doc.preprocess_seconds * 1000, 1),
+                "upload_ms_saved": round(upload_saved_ms, 1),
+                "net_ms_saved": round(upload_saved_ms - doc.preprocess_seconds * 1000, 1),
+            })
+            doc.cleanup()
+            os.remove(path)
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
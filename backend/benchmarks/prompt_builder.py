@@ -0,0 +1,93 @@
+"""Prompt assembly benchmark.
+
+Compares the old prompt construction (summary rebuilt from parsed_data on
+every turn, fixed 8-message window) with PromptBuilder (summary cached on the
+resume, history filled up to a token budget) across conversation lengths.
+
+    cd backend
+    python -m benchmarks.prompt_builder
+"""
+import argparse
+import json
+import random
+import sys
+import timeit
+
+from app.services.prompt import PromptBuilder, build_resume_summary, count_tokens
+from benchmarks.fakes import SAMPLE_RESUME
+
+
+def legacy_build(parsed_resume, history, user_message):
+    summary = f"""
+Name: {parsed_resume.get('contact_info', {}).get('full_name')}
+Summary: {parsed_resume.get('summary')}
+Experience: {[exp.get('position') for exp in parsed_resume.get('work_experience', [])]}
+Skills: {[skill.get('name') for skill in parsed_resume.get('technical_skills', {}).get('programming_languages', [])]}
+"""
+    messages = [{"role": "system", "content": "You are a helpful resume assistant."}]
+    for msg in history[-8:]:
+        role = "user" if msg["message_type"] == "user" else "assistant"
+        messages.append({"role": role, "content": msg["content"]})
+    messages.append({"role": "user", "content": f"{user_message}\n\nResume Summary:\n{summary}"})
+    return messages
+
+
+def make_history(length: int, rng: random.Random):
+    words = "improve summary skills impact metrics leadership python backend role team".split()
+    history = []
+    for i in range(length):
+        size = rng.choice([8, 30, 200, 1200])  # mix of short questions and long answers
+        history.append({
+            "message_type": "user" if i % 2 == 0 else "assistant",
+            "content": " ".join(rng.choice(words) for _ in range(size)),
+        })
+    return history
+
+
+def prompt_tokens(messages):
+    return sum(count_tokens(m["content"]) for m in messages)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", default="2,10,100,1000")
+    parser.add_argument("--budget", type=int, default=7000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    builder = PromptBuilder(token_budget=args.budget)
+    summary = build_resume_summary(SAMPLE_RESUME)
+    results = []
+
+    for length in (int(n) for n in args.lengths.split(",")):
+        history = make_history(length, rng)
+        legacy = legacy_build(SAMPLE_RESUME, history, "How can I improve my summary?")
+        budgeted = builder.build(summary, history, "How can I improve my summary?")
+        legacy_s = timeit.timeit(
+            lambda: legacy_build(SAMPLE_RESUME, history, "q"), number=args.repeat
+        ) / args.repeat
+        budgeted_s = timeit.timeit(
+            lambda: builder.build(summary, history, "q"), number=args.repeat
+        ) / args.repeat
+        results.append({
+            "history_messages": length,
+            "legacy": {
+                "messages": len(legacy),
+                "prompt_tokens": prompt_tokens(legacy),
+                "build_us": round(legacy_s * 1e6, 1),
+            },
+            "budgeted": {
+                "messages": len(budgeted),
+                "prompt_tokens": prompt_tokens(budgeted),
+                "build_us": round(budgeted_s * 1e6, 1),
+            },
+            "budget": args.budget,
+        })
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Parsed-resume serialization benchmark.
+
+Builds a realistic parsed resume of roughly ``--kb`` kilobytes and times,
+per variant, a chat history response carrying it:
+
+* ``untyped_stdlib``: the previous path, parsed_data as a ``dict`` field of
+  the response model, validated and encoded by FastAPI, rendered with json.
+* ``validated_orjson``: the current path, parsed_data validated once on
+  ingest and sent as stored through the fast JSON response class.
+
+Also reports the one-off ingest validation cost and raw encoder timings.
+
+    cd backend
+    python -m benchmarks.serialization --kb 300 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="serialization-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bench.db"
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+import httpx
+from fastapi import FastAPI
+from pydantic import BaseModel
+from typing import List, Optional
+from uuid import uuid4
+
+from app.core.responses import FastJSONResponse
+from app.schemas.chat import ChatHistoryResponse, ChatMessage
+from app.schemas.parsed_resume import validate_parsed_resume
+from benchmarks.fakes import SAMPLE_RESUME
+
+
+class LegacyChatHistoryResponse(BaseModel):
+    resume_id: str
+    resume_name: str
+    parsed_data: dict
+    messages: List[ChatMessage]
+    next_cursor: Optional[str] = None
+
+
+def make_parsed_resume(kb: int) -> dict:
+    """A parsed resume padded with plausible entries up to about ``kb`` KiB."""
+    parsed = json.loads(json.dumps(SAMPLE_RESUME))
+    parsed["education"] = [{"institution": "Technical University of Berlin", "degree": "BSc", "field_of_study": "Computer Science"}]
+    parsed["technical_skills"]["frameworks_libraries"] = [
+        {"name": name, "level": "Expert", "years_of_experience": 5} for name in ("FastAPI", "Django", "React", "gRPC")
+    ]
+    index = 0
+    while len(json.dumps(parsed)) < kb * 1024:
+        parsed["work_experience"].append({
+            "company": f"Company {index}",
+            "position": "Software Engineer",
+            "start_date": f"{2000 + index % 20}-01",
+            "end_date": f"{2001 + index % 20}-06",
+            "is_current": False,
+            "responsibilities": [
+                f"Designed and operated service {index}-{item} handling millions of requests per day "
+                "with a focus on latency, reliability and cost."
+                for item in range(6)
+            ],
+            "technologies": ["Python", "PostgreSQL", "Kubernetes", "Redis", "Kafka"],
+        })
+        parsed.setdefault("projects", []).append({
+            "name": f"Project {index}",
+            "description": "Internal platform for batch document processing and search. " * 3,
+            "technologies": ["Go", "Elasticsearch"],
+        })
+        index += 1
+    return parsed
+
+
+def make_app(raw: dict, validated: dict, messages: List[ChatMessage]) -> FastAPI:
+    app = FastAPI()
+    resume_id = str(uuid4())
+
+    @app.get("/untyped_stdlib", response_model=LegacyChatHistoryResponse)
+    async def untyped():
+        return LegacyChatHistoryResponse(
+            resume_id=resume_id, resume_name="cv.pdf", parsed_data=raw, messages=messages
+        )
+
+    @app.get("/validated_orjson", response_model=ChatHistoryResponse)
+    async def validated_orjson():
+        history = ChatHistoryResponse(
+            resume_id=resume_id, resume_name="cv.pdf", messages=messages
+        ).model_dump(mode="json")
+        history["parsed_data"] = validated
+        return FastJSONResponse(content=history)
+
+    return app
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def summarize(samples) -> dict:
+    return {
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+
+def time_calls(func, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def run_endpoints(app: FastAPI, requests: int, warmup: int) -> dict:
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ("/untyped_stdlib", "/validated_orjson"):
+            for _ in range(warmup):
+                await client.get(path)
+            samples = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = await client.get(path)
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+            results[path.strip("/")] = {"bytes": len(response.content), **summarize(samples)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kb", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args()
+
+    raw = make_parsed_resume(args.kb)
+    validated = validate_parsed_resume(raw)
+    messages = [ChatMessage(message_type="user", content="How can I improve my resume?")] * 20
+
+    encoders = {
+        "json.dumps": lambda: json.dumps(validated, ensure_ascii=False, separators=(",", ":")).encode(),
+    }
+    try:
+        import orjson
+        encoders["orjson.dumps"] = lambda: orjson.dumps(validated)
+    except ImportError:
+        pass
+
+    results = {
+        "payload_bytes": len(json.dumps(raw)),
+        "response_class": FastJSONResponse.__name__,
+        "ingest_validation": time_calls(lambda: validate_parsed_resume(raw), args.requests),
+        "encoders": {name: time_calls(encode, args.requests) for name, encode in encoders.items()},
+        "endpoints": asyncio.run(run_endpoints(make_app(raw, validated, messages), args.requests, args.warmup)),
+    }
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Upload memory benchmark.
+
+Pushes N distinct PDFs through POST /resume/upload, with the embedded worker
+parsing them against FakeVLMClient, and samples process RSS as it goes. With
+streaming uploads RSS should stay flat and UPLOAD_DIR should end up empty.
+
+    cd backend
+    python -m benchmarks.upload_memory --uploads 1000 --size-kb 512
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="upload-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bench.db"
+os.environ["UPLOAD_DIR"] = os.path.join(WORKDIR, "uploads")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("WORKER_POLL_INTERVAL", "0.05")
+os.environ.setdefault("VLM_POLL_INITIAL_INTERVAL", "0.01")
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=1000)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--sample-every", type=int, default=100)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services import vlm
+    from benchmarks.fakes import FakeVLMClient
+
+    vlm.pipeline._client = FakeVLMClient()
+
+    samples = []
+    with TestClient(app) as client:
+        client.post("/auth/register", json={"email": "bench@example.com", "password": "bench"})
+        token = client.post(
+            "/auth/token", json={"email": "bench@example.com", "password": "bench"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        filler = os.urandom(args.size_kb * 1024)
+
+        start = time.perf_counter()
+        for i in range(args.uploads):
+            body = b"%PDF-1.4\n" + i.to_bytes(8, "big") + filler
+            response = client.post(
+                "/resume/upload",
+                files={"file": (f"cv-{i}.pdf", body, "application/pdf")},
+                headers=headers,
+            )
+            response.raise_for_status()
+            if i % args.sample_every == 0:
+                samples.append({"upload": i, "rss_mb": round(rss_bytes() / 2**20, 1)})
+        elapsed = time.perf_counter() - start
+
+        # Give the worker a moment to drain the queue before counting leftovers.
+        deadline = time.time() + 30
+        while os.listdir(os.environ["UPLOAD_DIR"]) and time.time() < deadline:
+            time.sleep(0.2)
+
+    result = {
+        "uploads": args.uploads,
+        "size_kb": args.size_kb,
+        "seconds": round(elapsed, 2),
+        "rss_samples": samples,
+        "rss_growth_mb": round(samples[-1]["rss_mb"] - samples[0]["rss_mb"], 1),
+        "leftover_files": len(os.listdir(os.environ["UPLOAD_DIR"])),
+    }
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Shared pytest setup: an isolated SQLite database and no network access.
+
+The app reads its configuration from the environment at import time, so
+everything is set here before any ``app`` module is imported.
+
+    cd backend
+    python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+import time
+from uuid import UUID, uuid4
+
+_TMP_DIR = tempfile.mkdtemp(prefix="resume-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}",
+    "UPLOAD_DIR": os.path.join(_TMP_DIR, "uploads"),
+    "SECRET_KEY": "test-secret",
+    "OPENAI_API_KEY": "test",
+    "VLM_API_KEY": "test",
+    "RESUME_PARSER": "local",
+    "LLM_BACKEND": "stub",
+    "STATUS_BROKER_BACKEND": "local",
+    "BCRYPT_ROUNDS": "4",
+    "WORKER_POLL_INTERVAL": "0.05",
+})
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def register_user(client):
+    """Register and log in a new user; returns ``(user_id, auth headers)``."""
+    email = f"{uuid4().hex}@example.com"
+    response = client.post("/auth/register", json={"email": email, "password": "secret"})
+    assert response.status_code == 200, response.text
+    token = client.post("/auth/token", json={"email": email, "password": "secret"}).json()["access_token"]
+    return response.json()["id"], {"Authorization": f"Bearer {token}"}
+
+
+def create_done_resume(user_id: str) -> str:
+    """Store a parsed copy of the sample resume for ``user_id``; returns its id."""
+    from app.model import models
+    from app.model.database import SessionLocal
+    from app.services.prompt import build_resume_summary
+    from app.services.search_index import index_resume
+    from benchmarks.fakes import SAMPLE_RESUME
+
+    with SessionLocal() as db:
+        resume = models.Resume(
+            id=uuid4(),
+            user_id=UUID(user_id),
+            filename="cv.pdf",
+            status="done",
+            parsed_data=SAMPLE_RESUME,
+            summary=build_resume_summary(SAMPLE_RESUME),
+        )
+        db.add(resume)
+        index_resume(db, resume)
+        db.commit()
+        return str(resume.id)
+
+
+def upload_resume(client, headers, data: bytes, filename: str = "resume.pdf") -> str:
+    response = client.post(
+        "/resume/upload", files={"file": (filename, data, "application/pdf")}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["resume_id"]
+
+
+def wait_until_finished(client, headers, resume_id: str, timeout: float = 10) -> dict:
+    """Poll /resume/status until the resume leaves "processing"."""
+    deadline = time.monotonic() + timeout
+    while True:
+        status = client.get(f"/resume/status/{resume_id}", headers=headers).json()
+        if status["status"] != "processing" or time.monotonic() > deadline:
+            return status
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def user(client):
+    return register_user(client)
+
+
+@pytest.fixture
+def done_resume(user):
+    return create_done_resume(user[0])
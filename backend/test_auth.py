@@ -0,0 +1,95 @@
+import asyncio
+from uuid import UUID, uuid4
+import httpx
+import pytest
+from app.core.auth import invalidate_user
+from app.core.throttle import LoginThrottle
+from app.main import app
+from app.model import models
+from app.model.database import SessionLocal
+from app.routes import auth as auth_routes
+from conftest import register_user
+
+
+def make_admin(user_id: str):
+    with SessionLocal() as db:
+        db.get(models.User, UUID(user_id)).is_admin = True
+        db.commit()
+    invalidate_user(user_id)
+
+
+def test_deactivated_user_is_rejected_straight_away(client, user):
+    user_id, headers = user
+    admin_id, admin_headers = register_user(client)
+    make_admin(admin_id)
+
+    # Puts the user in this process's lookup cache.
+    assert client.get("/v1/chat/resume-chats", headers=headers).status_code == 200
+
+    response = client.post(f"/admin/users/{user_id}/deactivate", headers=admin_headers)
+    assert response.status_code == 200 and response.json()["is_active"] is False
+
+    response = client.get("/v1/chat/resume-chats", headers=headers)
+    assert (response.status_code, response.json()["detail"]) == (400, "Inactive user")
+
+
+def test_non_admins_cannot_deactivate_users(client, user):
+    _, headers = user
+    other_id, _ = register_user(client)
+    assert client.post(f"/admin/users/{other_id}/deactivate", headers=headers).status_code == 403
+
+
+@pytest.fixture
+def throttle(monkeypatch):
+    limited = LoginThrottle(window=60, max_account_failures=3, max_ip_failures=100)
+    monkeypatch.setattr(auth_routes, "login_throttle", limited)
+    return limited
+
+
+def login(client, email, password):
+    return client.post("/auth/token", json={"email": email, "password": password})
+
+
+def test_repeated_failures_are_refused_with_retry_after(client, throttle):
+    email = f"{uuid4().hex}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "secret"})
+
+    assert [login(client, email, "wrong").status_code for _ in range(3)] == [401] * 3
+    response = login(client, email, "secret")
+    assert response.status_code == 429
+    assert 0 < int(response.headers["Retry-After"]) <= 60
+
+
+def test_successful_login_resets_the_account_counter(client, throttle):
+    email = f"{uuid4().hex}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "secret"})
+
+    assert [login(client, email, "wrong").status_code for _ in range(2)] == [401] * 2
+    assert login(client, email, "secret").status_code == 200
+    assert [login(client, email, "wrong").status_code for _ in range(3)] == [401] * 3
+    assert login(client, email, "wrong").status_code == 429
+
+
+def test_parallel_attempts_cannot_pass_the_check_together(client, throttle, monkeypatch):
+    email = f"{uuid4().hex}@example.com"
+    checked = 0
+
+    async def slow_authenticate(db, email, password):
+        nonlocal checked
+        checked += 1
+        await asyncio.sleep(0.05)  # every request is past the check before any fails
+        return False
+
+    monkeypatch.setattr(auth_routes, "authenticate_user", slow_authenticate)
+
+    async def attempt(http):
+        return (await http.post("/auth/token", json={"email": email, "password": "wrong"})).status_code
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(attempt(http) for _ in range(10)))
+
+    statuses = client.portal.call(run)
+    assert sorted(statuses) == [401] * 3 + [429] * 7
+    assert checked == 3
@@ -0,0 +1,137 @@
+import io
+import json
+import os
+import zipfile
+from uuid import UUID, uuid4
+import pytest
+from app.model import models
+from app.model.database import SessionLocal
+from app.services import jobs
+from benchmarks.fakes import SAMPLE_RESUME_LINES, make_scanned_pdf, make_text_pdf
+
+
+def resume_pdf() -> bytes:
+    # A unique line keeps each document out of the content-hash cache.
+    return make_text_pdf([SAMPLE_RESUME_LINES + [f"Reference {uuid4().hex}"]])
+
+
+def make_zip(entries: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in entries.items():
+            if data is None:
+                archive.writestr(zipfile.ZipInfo(name), b"")
+            else:
+                archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def post_batch(client, headers, files: list):
+    return client.post(
+        "/resume/batch",
+        files=[("files", (name, data, "application/octet-stream")) for name, data in files],
+        headers=headers,
+    )
+
+
+def stream_batch(client, headers, batch_id: str) -> list:
+    token = headers["Authorization"].split()[1]
+    with client.stream("GET", f"/resume/batch/{batch_id}/stream", params={"token": token}, headers=headers) as response:
+        assert response.status_code == 200
+        return [json.loads(line[len("data: "):]) for line in response.iter_lines() if line.startswith("data: ")]
+
+
+@pytest.fixture
+def spooled_files():
+    """Fails the test if a request leaves new files behind in UPLOAD_DIR."""
+    os.makedirs(jobs.UPLOAD_DIR, exist_ok=True)
+    before = set(os.listdir(jobs.UPLOAD_DIR))
+    yield
+    assert set(os.listdir(jobs.UPLOAD_DIR)) - before == set()
+
+
+def test_pdfs_and_zips_are_parsed_as_one_batch(client, user):
+    _, headers = user
+    archive = make_zip({
+        "cvs/": None,
+        "cvs/b.pdf": resume_pdf(),
+        "cvs/nested/deeper/c.PDF": resume_pdf(),
+        "../../escape.pdf": resume_pdf(),
+        "cvs/notes.txt": b"not a resume",
+        "__MACOSX/cvs/._b.pdf": b"resource fork",
+    })
+
+    response = post_batch(client, headers, [("a.pdf", resume_pdf()), ("bundle.zip", archive)])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["total"] == 4
+    assert sorted(resume["filename"] for resume in body["resumes"]) == ["a.pdf", "b.pdf", "c.PDF", "escape.pdf"]
+
+    events = stream_batch(client, headers, body["batch_id"])
+    assert events[-1]["progress"] == {"total": 4, "processing": 0, "done": 4, "error": 0, "progress": 1.0}
+
+    status = client.get(f"/resume/batch/{body['batch_id']}", headers=headers).json()
+    assert {resume["status"] for resume in status["resumes"]} == {"done"}
+
+
+def test_batch_status_counts_errors(client, user):
+    _, headers = user
+    response = post_batch(client, headers, [("good.pdf", resume_pdf()), ("scan.pdf", make_scanned_pdf(1, dpi=50))])
+    batch_id = response.json()["batch_id"]
+
+    stream_batch(client, headers, batch_id)
+    status = client.get(f"/resume/batch/{batch_id}", headers=headers).json()
+    assert {key: status[key] for key in ("total", "processing", "done", "error", "progress")} == {
+        "total": 2, "processing": 0, "done": 1, "error": 1, "progress": 1.0,
+    }
+    errors = {resume["filename"]: resume["error"] for resume in status["resumes"]}
+    assert errors == {"good.pdf": None, "scan.pdf": "PDF has no usable text layer"}
+
+
+def test_duplicate_files_in_a_batch_share_one_parse(client, user):
+    _, headers = user
+    data = resume_pdf()
+    response = post_batch(client, headers, [("one.pdf", data), ("bundle.zip", make_zip({"two.pdf": data}))])
+    body = response.json()
+    assert body["total"] == 2
+
+    stream_batch(client, headers, body["batch_id"])
+    with SessionLocal() as db:
+        resumes = db.query(models.Resume).filter(models.Resume.batch_id == UUID(body["batch_id"])).all()
+        assert {resume.status for resume in resumes} == {"done"}
+        assert len({resume.content_hash for resume in resumes}) == 1
+        assert db.query(models.ParseJob).filter_by(content_hash=resumes[0].content_hash).count() == 1
+
+
+def test_batches_over_the_file_limit_are_rejected(client, user, spooled_files, monkeypatch):
+    monkeypatch.setattr(jobs, "BATCH_MAX_FILES", 2)
+    _, headers = user
+
+    response = post_batch(client, headers, [(f"{index}.pdf", resume_pdf()) for index in range(3)])
+    assert response.status_code == 400 and "limited to 2 files" in response.json()["detail"]
+
+    archive = make_zip({f"{index}.pdf": resume_pdf() for index in range(3)})
+    response = post_batch(client, headers, [("bundle.zip", archive)])
+    assert response.status_code == 400 and "limited to 2 files" in response.json()["detail"]
+
+
+def test_batches_over_the_size_limit_are_rejected(client, user, spooled_files, monkeypatch):
+    pdf = resume_pdf()
+    monkeypatch.setattr(jobs, "BATCH_MAX_TOTAL_BYTES", int(len(pdf) * 2.5))
+    _, headers = user
+
+    archive = make_zip({f"{index}.pdf": resume_pdf() for index in range(2)})
+    response = post_batch(client, headers, [("a.pdf", pdf), ("bundle.zip", archive)])
+    assert response.status_code == 413
+
+    response = post_batch(client, headers, [(f"{index}.pdf", resume_pdf()) for index in range(3)])
+    assert response.status_code == 413
+
+
+def test_zip_without_pdfs_is_rejected(client, user, spooled_files):
+    _, headers = user
+    response = post_batch(client, headers, [("bundle.zip", make_zip({"notes.txt": b"hello"}))])
+    assert response.status_code == 400 and "No PDF files" in response.json()["detail"]
+
+    response = post_batch(client, headers, [("broken.zip", b"not a zip")])
+    assert response.status_code == 400 and "Invalid zip archive" in response.json()["detail"]
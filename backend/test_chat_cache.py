@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import delete, select
+from app.model import models
+from app.model.database import AsyncSessionLocal
+from app.services import openai_chat
+from app.services.response_cache import DatabaseCacheBackend, MemoryCacheBackend, ResponseCache
+from app.routes import chat
+from conftest import create_done_resume, register_user
+
+
+class CountingChatService(openai_chat.StubChatService):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def complete(self, messages) -> str:
+        self.calls += 1
+        return f"reply {self.calls}"
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    service = CountingChatService()
+    monkeypatch.setattr(openai_chat, "chat_service", service)
+    monkeypatch.setattr(chat, "response_cache", ResponseCache(MemoryCacheBackend(), enabled=True))
+    return service
+
+
+def ask(client, headers, resume_id, message) -> str:
+    response = client.post(
+        "/v1/chat/completions", json={"resume_id": resume_id, "user_message": message}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["messages"][-1]["content"]
+
+
+@pytest.fixture
+def other_resume(client):
+    """Another user's copy of the same document as ``done_resume``."""
+    other = register_user(client)
+    return other, create_done_resume(other[0])
+
+
+def test_opening_questions_are_shared_but_conversations_are_not(client, user, done_resume, other_resume, llm):
+    _, headers = user
+    (_, other_headers), other_resume_id = other_resume
+
+    assert ask(client, headers, done_resume, "What should I improve?") == "reply 1"
+    assert ask(client, other_headers, other_resume_id, "What should I improve?") == "reply 1"
+    assert llm.calls == 1
+
+    # Both users now have history, so follow-ups reach the model every time.
+    assert ask(client, headers, done_resume, "And the summary?") == "reply 2"
+    assert ask(client, other_headers, other_resume_id, "And the summary?") == "reply 3"
+    assert llm.calls == 3
+
+
+def test_database_cache_drops_expired_and_oldest_entries(client):
+    backend = DatabaseCacheBackend(max_entries=3, ttl=60)
+    table = models.LLMResponseCache
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(table))
+            db.add(table(key="expired", response="old", expires_at=datetime.utcnow() - timedelta(seconds=1)))
+            await db.commit()
+        for index in range(5):
+            await backend.set(f"key-{index}", f"reply {index}")
+            await asyncio.sleep(0.01)
+        async with AsyncSessionLocal() as db:
+            keys = set(await db.scalars(select(table.key)))
+        return keys, await backend.get("key-4"), await backend.get("key-0")
+
+    keys, newest, evicted = client.portal.call(run)
+    assert keys == {"key-2", "key-3", "key-4"}
+    assert (newest, evicted) == ("reply 4", None)
+
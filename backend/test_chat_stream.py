@@ -0,0 +1,128 @@
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from openai import AsyncOpenAI
+from app.main import app
+from app.services import openai_chat
+from benchmarks.fake_servers import FakeSettings, create_app
+
+STREAM_PATH = "/v1/chat/completions/stream"
+
+
+def fake_llm_service(**settings) -> openai_chat.OpenAIChatService:
+    """OpenAIChatService talking to benchmarks.fake_servers in-process."""
+    service = openai_chat.OpenAIChatService(max_retries=0)
+    service._http_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=create_app(FakeSettings(**settings)))
+    )
+    service._client = AsyncOpenAI(
+        api_key="test", base_url="http://fake-llm/v1", http_client=service._http_client, max_retries=0
+    )
+    return service
+
+
+def read_events(response) -> list:
+    return [json.loads(line[len("data: "):]) for line in response.iter_lines() if line.startswith("data: ")]
+
+
+def history(client, headers, resume_id) -> list:
+    response = client.get(f"/v1/chat/history/{resume_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["messages"]
+
+
+def test_stream_forwards_deltas_and_saves_the_reply(client, user, done_resume, monkeypatch):
+    service = fake_llm_service(llm_latency=0.05, jitter=0, reply_words=12)
+    monkeypatch.setattr(openai_chat, "chat_service", service)
+    _, headers = user
+    question = "How can I improve my summary?"
+
+    with client.stream("POST", STREAM_PATH, json={"resume_id": done_resume, "user_message": question}, headers=headers) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = read_events(response)
+    assert service.in_flight == 0
+
+    deltas = [event["delta"] for event in events if "delta" in event]
+    assert len(deltas) == 12
+    assert events[-1] == {"done": True, "resume_id": done_resume, "resume_name": "cv.pdf"}
+    assert history(client, headers, done_resume) == [
+        {"message_type": "user", "content": question},
+        {"message_type": "assistant", "content": "".join(deltas)},
+    ]
+
+
+def test_stream_reports_llm_errors(client, user, done_resume, monkeypatch):
+    monkeypatch.setattr(openai_chat, "chat_service", fake_llm_service(llm_latency=0, llm_failure_rate=1.0))
+    _, headers = user
+
+    with client.stream("POST", STREAM_PATH, json={"resume_id": done_resume, "user_message": "Hi"}, headers=headers) as response:
+        body = response.read().decode()
+
+    assert "event: error" in body
+    assert [m["message_type"] for m in history(client, headers, done_resume)] == ["user"]
+
+
+async def stream_until_first_delta(headers: dict, body: dict):
+    """Drive the app over raw ASGI and disconnect once the first delta arrives."""
+    payload = json.dumps(body).encode()
+    disconnected = asyncio.Event()
+    request_sent = False
+    chunks = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append(message["body"])
+            disconnected.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+        "root_path": "",
+        "path": STREAM_PATH,
+        "raw_path": STREAM_PATH.encode(),
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")]
+        + [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+    }
+    await app(scope, receive, send)
+    return chunks
+
+
+def test_stream_saves_the_partial_reply_when_the_client_disconnects(client, user, done_resume, monkeypatch):
+    stub = openai_chat.StubChatService(latency=3.0)
+    monkeypatch.setattr(openai_chat, "chat_service", stub)
+    _, headers = user
+
+    chunks = client.portal.call(
+        stream_until_first_delta, headers, {"resume_id": done_resume, "user_message": "Hi"}
+    )
+    assert chunks
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        messages = history(client, headers, done_resume)
+        if len(messages) == 2:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail("The partial reply was not saved")
+
+    partial = messages[1]["content"]
+    assert messages[1]["message_type"] == "assistant"
+    assert partial and stub.reply.startswith(partial) and partial != stub.reply
@@ -0,0 +1,111 @@
+import os
+from datetime import datetime
+from uuid import UUID, uuid4
+import pytest
+from app.model import models
+from app.model.database import AsyncSessionLocal, SessionLocal
+from app.services import jobs
+from benchmarks.fakes import SAMPLE_RESUME
+
+
+@pytest.fixture
+def spooled(tmp_path):
+    path = tmp_path / "upload.pdf"
+    path.write_bytes(b"%PDF-1.4 spooled")
+    return str(path)
+
+
+def upload(client, user_id: str, file_path: str, content_hash: str) -> models.Resume:
+    async def create():
+        async with AsyncSessionLocal() as db:
+            return await jobs.create_resume_for_upload(db, UUID(user_id), "cv.pdf", file_path, content_hash)
+
+    return client.portal.call(create)
+
+
+def add_resume(user_id: str, content_hash: str, status: str, **fields) -> UUID:
+    with SessionLocal() as db:
+        resume = models.Resume(
+            id=uuid4(), user_id=UUID(user_id), filename="first.pdf", content_hash=content_hash, status=status, **fields
+        )
+        db.add(resume)
+        db.commit()
+        return resume.id
+
+
+def add_running_job(resume_id: UUID, content_hash: str) -> UUID:
+    with SessionLocal() as db:
+        job = models.ParseJob(
+            resume_id=resume_id, content_hash=content_hash, status="running",
+            attempts=1, locked_by="other-worker", locked_at=datetime.utcnow(),
+        )
+        db.add(job)
+        db.commit()
+        return job.id
+
+
+def jobs_for(content_hash: str) -> list:
+    with SessionLocal() as db:
+        return db.query(models.ParseJob).filter_by(content_hash=content_hash).all()
+
+
+def resume_status(resume_id) -> str:
+    with SessionLocal() as db:
+        return db.get(models.Resume, resume_id).status
+
+
+def test_identical_upload_copies_the_finished_parse(client, user, spooled):
+    content_hash = uuid4().hex
+    add_resume(user[0], content_hash, "done", parsed_data=SAMPLE_RESUME, summary="summary")
+
+    resume = upload(client, user[0], spooled, content_hash)
+
+    assert resume.status == "done"
+    with SessionLocal() as db:
+        copy = db.get(models.Resume, resume.id)
+        assert (copy.parsed_data, copy.summary) == (SAMPLE_RESUME, "summary")
+        assert db.query(models.ResumeTerm).filter_by(resume_id=resume.id, kind="skill", value="python").count() == 1
+    assert jobs_for(content_hash) == []
+    assert not os.path.exists(spooled)
+
+
+def test_upload_during_a_parse_attaches_to_the_running_job(client, user, spooled):
+    content_hash = uuid4().hex
+    first_id = add_resume(user[0], content_hash, "processing")
+    job_id = add_running_job(first_id, content_hash)
+
+    second = upload(client, user[0], spooled, content_hash)
+
+    assert second.status == "processing"
+    assert [job.id for job in jobs_for(content_hash)] == [job_id]
+    assert not os.path.exists(spooled)
+
+    with SessionLocal() as db:
+        jobs.complete_job(db, job_id, SAMPLE_RESUME)
+    assert resume_status(first_id) == resume_status(second.id) == "done"
+
+
+def test_losing_the_enqueue_race_attaches_to_the_winner(client, user, spooled, monkeypatch):
+    content_hash = uuid4().hex
+    first_id = add_resume(user[0], content_hash, "processing")
+    job_id = add_running_job(first_id, content_hash)
+
+    # The first lookup misses the other upload's job, as if it committed just after.
+    find_inflight_job = jobs.find_inflight_job
+    lookups = []
+
+    async def racing_find_inflight_job(db, content_hash):
+        lookups.append(content_hash)
+        return None if len(lookups) == 1 else await find_inflight_job(db, content_hash)
+
+    monkeypatch.setattr(jobs, "find_inflight_job", racing_find_inflight_job)
+    inflight_hits = jobs.dedup_stats.inflight_hits
+
+    resume = upload(client, user[0], spooled, content_hash)
+
+    assert len(lookups) == 2
+    assert resume.status == "processing"
+    assert jobs.dedup_stats.inflight_hits == inflight_hits + 1
+    assert [job.id for job in jobs_for(content_hash)] == [job_id]
+    with SessionLocal() as db:
+        assert db.query(models.Resume).filter_by(content_hash=content_hash).count() == 2
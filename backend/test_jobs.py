@@ -0,0 +1,37 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+from app.model import models
+from app.model.database import SessionLocal
+from app.services import jobs
+from app.services.status_broker import NOTIFY_MAX_PAYLOAD_BYTES, notify_status_sql
+
+
+class RecordingSession:
+    def __init__(self):
+        self.params = []
+
+    def execute(self, statement, params):
+        self.params.append(params)
+
+
+def test_long_errors_are_truncated_before_storing_and_notifying(user):
+    with SessionLocal() as db:
+        resume = models.Resume(id=uuid4(), user_id=UUID(user[0]), filename="cv.pdf", status="processing")
+        job = models.ParseJob(
+            resume_id=resume.id, status="running", attempts=1, locked_by="test", locked_at=datetime.utcnow()
+        )
+        db.add_all([resume, job])
+        db.commit()
+        job_id, resume_id = job.id, resume.id
+
+    error = "validation error " * 2500
+    with SessionLocal() as db:
+        assert jobs.fail_job(db, job_id, error, permanent=True) is False
+    with SessionLocal() as db:
+        stored = db.get(models.Resume, resume_id).error_message
+        assert len(stored) == jobs.ERROR_MESSAGE_MAX_LENGTH and stored.startswith("validation error")
+
+    db = RecordingSession()
+    notify_status_sql(db, resume_id, {"status": "error", "error": error})
+    payload = db.params[0]["payload"]
+    assert len(payload.encode()) <= NOTIFY_MAX_PAYLOAD_BYTES and '"status": "error"' in payload
@@ -0,0 +1,79 @@
+from uuid import UUID, uuid4
+import pytest
+from app.model import models
+from app.model.database import SessionLocal
+from app.services import parsers
+from app.services.local_parser import is_confident, parse_resume_text
+from benchmarks.fakes import SAMPLE_RESUME_LINES, make_scanned_pdf, make_text_pdf
+from conftest import upload_resume, wait_until_finished
+
+
+def test_parse_resume_text_extracts_the_resume_schema():
+    parsed = parse_resume_text("\n".join(SAMPLE_RESUME_LINES))
+
+    assert parsed["contact_info"]["full_name"] == "Jane Doe"
+    assert parsed["contact_info"]["email"] == "jane@example.com"
+    assert [job["company"] for job in parsed["work_experience"]] == ["Acme", "Globex"]
+    assert parsed["work_experience"][0]["is_current"] is True
+    languages = {skill["name"].lower() for skill in parsed["technical_skills"]["programming_languages"]}
+    assert {"python", "go", "sql"} <= languages
+    assert is_confident(parsed)
+
+
+def test_resume_parser_is_abstract():
+    with pytest.raises(TypeError):
+        parsers.ResumeParser()
+
+
+def test_text_pdf_is_parsed_end_to_end_without_the_network(client, user, monkeypatch):
+    assert isinstance(parsers.resume_parser, parsers.LocalResumeParser)
+
+    async def no_vlm(*args, **kwargs):
+        raise AssertionError("the VLM must not be called")
+
+    monkeypatch.setattr(parsers.VLMResumeParser, "parse", no_vlm)
+    _, headers = user
+    # A unique line keeps the upload from being served from the content-hash cache.
+    pdf = make_text_pdf([SAMPLE_RESUME_LINES + [f"Reference {uuid4().hex}"]])
+
+    resume_id = upload_resume(client, headers, pdf)
+    assert wait_until_finished(client, headers, resume_id) == {"status": "done", "error": None}
+
+    parsed = client.get(f"/resume/parsed/{resume_id}", headers=headers).json()
+    assert parsed["contact_info"]["full_name"] == "Jane Doe"
+    assert parsed["work_experience"][0]["position"] == "Senior Engineer"
+
+    # The same bytes again are served from the earlier parse and indexed for search.
+    again = upload_resume(client, headers, pdf)
+    assert client.get(f"/resume/status/{again}", headers=headers).json()["status"] == "done"
+    found = client.get("/resume/search", params={"skill": "python"}, headers=headers).json()["results"]
+    assert {result["resume_id"] for result in found} == {resume_id, again}
+
+
+def attempts(resume_id: str) -> int:
+    with SessionLocal() as db:
+        return db.query(models.ParseJob).filter_by(resume_id=UUID(resume_id)).one().attempts
+
+
+def test_scanned_pdf_fails_without_retrying(client, user):
+    _, headers = user
+    resume_id = upload_resume(client, headers, make_scanned_pdf(1, dpi=50))
+
+    status = wait_until_finished(client, headers, resume_id)
+    assert status == {"status": "error", "error": "PDF has no usable text layer"}
+    assert attempts(resume_id) == 1
+
+
+def test_output_that_fails_validation_is_not_retried(client, user, monkeypatch):
+    class MalformedParser(parsers.ResumeParser):
+        async def parse(self, file_path, filename):
+            return {"work_experience": "not a list"}
+
+    monkeypatch.setattr(parsers, "resume_parser", MalformedParser())
+    _, headers = user
+    resume_id = upload_resume(client, headers, make_text_pdf([[uuid4().hex]]))
+
+    status = wait_until_finished(client, headers, resume_id)
+    assert status["status"] == "error" and "work_experience" in status["error"]
+    assert attempts(resume_id) == 1
+
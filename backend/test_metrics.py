@@ -0,0 +1,63 @@
+import asyncio
+import socket
+import httpx
+from app import worker
+from app.routes import metrics
+from app.services import vlm
+from app.services.vlm import ResumeParsingPipeline
+from benchmarks.fakes import FakeVLMClient
+
+
+def test_metrics_are_off_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(metrics, "METRICS_PUBLIC", True)
+    assert client.get("/metrics").status_code == 200
+
+
+def test_metrics_require_the_token(client, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    for queue in ("vlm_in_flight", "vlm_polling", "llm_in_flight", "sse_subscribers"):
+        assert f'queue="{queue}"' in response.text
+
+
+def test_worker_serves_its_own_metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "scrape-secret")
+    pipeline = ResumeParsingPipeline(
+        client=FakeVLMClient(latency=0.05), preprocess=False, poll_initial_interval=0.01, poll_max_interval=0.05
+    )
+    monkeypatch.setattr(vlm, "pipeline", pipeline)
+    pdf_path = tmp_path / "resume.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 fake")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def scrape():
+        server = worker.metrics_server(port, host="127.0.0.1")
+        serving = asyncio.create_task(server.serve())
+        try:
+            await pipeline.parse(str(pdf_path), "resume.pdf")
+            while not server.started:
+                await asyncio.sleep(0.01)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as http:
+                denied = await http.get("/metrics")
+                headers = {"Authorization": "Bearer scrape-secret"}
+                return denied, await http.get("/metrics", headers=headers), await http.get("/stats", headers=headers)
+        finally:
+            await pipeline.scheduler.aclose()
+            server.should_exit = True
+            await serving
+
+    denied, scraped, stats = asyncio.run(scrape())
+    assert denied.status_code == 401
+    assert scraped.status_code == 200
+    assert 'vlm_poll_duration_seconds_count{outcome="completed"}' in scraped.text
+    assert 'queue="vlm_in_flight"' in scraped.text
+    assert stats.json()["vlm"]["polling"]["completed"] == 1
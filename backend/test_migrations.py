@@ -0,0 +1,44 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+from app.model import models
+from app.model.database import create_db_engine
+from app.model.migrations import upgrade_schema
+from app.services.search_index import backfill
+
+# The tables as the first release created them.
+BASELINE_SCHEMA = (
+    "CREATE TABLE users (id CHAR(32) PRIMARY KEY, email VARCHAR UNIQUE, hashed_password VARCHAR, "
+    "is_active BOOLEAN, created_at DATETIME)",
+    "CREATE TABLE resumes (id CHAR(32) PRIMARY KEY, user_id CHAR(32) REFERENCES users (id), "
+    "filename VARCHAR, status VARCHAR, parsed_data JSON, created_at DATETIME)",
+    "CREATE TABLE chats (id CHAR(32) PRIMARY KEY, resume_id CHAR(32) REFERENCES resumes (id), "
+    "user_id CHAR(32) REFERENCES users (id), message_type VARCHAR, content VARCHAR, created_at DATETIME)",
+    "INSERT INTO users VALUES ('0123456789abcdef0123456789abcdef', 'old@example.com', 'x', 1, '2024-01-01 00:00:00')",
+    "INSERT INTO resumes VALUES ('fedcba9876543210fedcba9876543210', '0123456789abcdef0123456789abcdef', "
+    "'cv.pdf', 'done', '{\"technical_skills\": {\"languages\": [{\"name\": \"Python\"}]}}', '2024-01-01 00:00:00')",
+)
+
+
+def test_upgrade_adds_columns_to_existing_tables(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    try:
+        with engine.begin() as conn:
+            for statement in BASELINE_SCHEMA:
+                conn.execute(text(statement))
+
+        added = upgrade_schema(engine)
+        assert {"users.is_admin", "resumes.error_message", "resumes.search_text"} <= set(added)
+        assert upgrade_schema(engine) == []
+
+        indexes = {index["name"] for index in inspect(engine).get_indexes("chats")}
+        assert "ix_chats_resume_user_created" in indexes
+
+        with Session(engine) as db:
+            resume = db.query(models.Resume).one()
+            assert resume.status == "done" and resume.error_message is None
+            assert backfill(db) == 1
+            assert db.query(models.ResumeTerm).filter_by(kind="skill").one().value == "python"
+            with engine.connect() as conn:
+                assert conn.execute(text("SELECT count(*) FROM resume_fts WHERE resume_fts MATCH 'python'")).scalar() == 1
+    finally:
+        engine.dispose()
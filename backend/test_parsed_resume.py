@@ -0,0 +1,27 @@
+from benchmarks.fakes import SAMPLE_RESUME
+from conftest import register_user
+
+
+def test_parsed_resume_is_revalidated_with_its_etag(client, user, done_resume):
+    _, headers = user
+    url = f"/resume/parsed/{done_resume}"
+
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    assert first.json() == SAMPLE_RESUME
+    etag = first.headers["ETag"]
+    assert etag and first.headers["Cache-Control"] == "private, no-cache"
+
+    repeat = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.content == b"" and repeat.headers["ETag"] == etag
+
+    for if_none_match in (f'"other", W/{etag}', "*"):
+        assert client.get(url, headers={**headers, "If-None-Match": if_none_match}).status_code == 304
+    assert client.get(url, headers={**headers, "If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_parsed_resume_of_another_user_is_not_found(client, done_resume):
+    _, other_headers = register_user(client)
+    response = client.get(f"/resume/parsed/{done_resume}", headers=other_headers)
+    assert response.status_code == 404
@@ -0,0 +1,72 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+from app.model import models
+from app.model.database import SessionLocal
+from app.services import jobs
+from app.services.search_index import index_resume
+from benchmarks.fakes import SAMPLE_RESUME
+from conftest import create_done_resume, register_user
+
+
+def search(client, headers, **params) -> list:
+    response = client.get("/resume/search", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return [result["resume_id"] for result in response.json()["results"]]
+
+
+def terms(db, resume_id) -> set:
+    return {(term.kind, term.value) for term in db.query(models.ResumeTerm).filter_by(resume_id=resume_id)}
+
+
+def test_search_filters_and_full_text_on_sqlite(client, user, done_resume):
+    _, headers = user
+    other_id, other_headers = register_user(client)
+    create_done_resume(other_id)
+
+    assert search(client, headers, skill="Python") == [done_resume]
+    assert search(client, headers, skill=["python", "go"], position="engineer", employer="acme") == [done_resume]
+    assert search(client, headers, q="backend APIs") == [done_resume]
+    assert search(client, headers, q='"APIs* NEAR(') == []  # FTS5 syntax is matched literally
+    assert search(client, headers, min_years=5, max_years=20) == [done_resume]
+    assert search(client, headers, skill="rust") == []
+    assert search(client, headers, q="kubernetes") == []
+    assert done_resume not in search(client, other_headers, skill="python")
+
+
+def test_indexing_a_resume_again_replaces_its_terms(done_resume):
+    resume_id = UUID(done_resume)
+    with SessionLocal() as db:
+        resume = db.get(models.Resume, resume_id)
+        before = terms(db, resume_id)
+        index_resume(db, resume)
+        index_resume(db, resume)
+        db.commit()
+        assert terms(db, resume_id) == before and ("skill", "python") in before
+
+        resume.parsed_data = {**SAMPLE_RESUME, "technical_skills": {"languages": [{"name": "Rust"}]}}
+        index_resume(db, resume)
+        db.commit()
+        assert {value for kind, value in terms(db, resume_id) if kind == "skill"} == {"rust"}
+
+
+def test_finishing_a_job_twice_is_a_no_op(user):
+    with SessionLocal() as db:
+        resume = models.Resume(id=uuid4(), user_id=UUID(user[0]), filename="cv.pdf", status="processing")
+        job = models.ParseJob(
+            resume_id=resume.id, status="running", attempts=1, locked_by="test", locked_at=datetime.utcnow()
+        )
+        db.add_all([resume, job])
+        db.commit()
+        job_id, resume_id = job.id, resume.id
+
+    with SessionLocal() as db:
+        jobs.complete_job(db, job_id, SAMPLE_RESUME)
+    with SessionLocal() as db:
+        jobs.complete_job(db, job_id, SAMPLE_RESUME)
+        assert jobs.fail_job(db, job_id, "late failure") is False
+
+    with SessionLocal() as db:
+        resume = db.get(models.Resume, resume_id)
+        assert (resume.status, resume.error_message) == ("done", None)
+        assert db.get(models.ParseJob, job_id).status == "done"
+        assert ("skill", "python") in terms(db, resume_id)
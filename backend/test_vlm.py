@@ -1 +1,219 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from PIL import Image, ImageDraw
+from app.services import vlm
+from app.services.vlm import PollScheduler, ResumeParsingPipeline, clean_background, preprocess_pdf
+from benchmarks.fakes import SAMPLE_RESUME, SAMPLE_RESUME_LINES, FakeVLMClient, make_scanned_pdf, make_text_pdf
 
+
+class CountingVLMClient(FakeVLMClient):
+    """Remembers the most predictions that were outstanding at once."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.peak_outstanding = 0
+
+    def generate(self, file=None, domain=None, **kwargs):
+        response = super().generate(file=file, domain=domain, **kwargs)
+        self.peak_outstanding = max(self.peak_outstanding, len(self._jobs))
+        return response
+
+
+def make_pipeline(client, **kwargs) -> ResumeParsingPipeline:
+    options = {"preprocess": False, "poll_initial_interval": 0.01, "poll_max_interval": 0.05}
+    return ResumeParsingPipeline(client=client, **{**options, **kwargs})
+
+
+async def parse_all(pipeline: ResumeParsingPipeline, path: str, count: int):
+    try:
+        return await asyncio.gather(
+            *(pipeline.parse(path, f"resume-{index}.pdf") for index in range(count)),
+            return_exceptions=True,
+        )
+    finally:
+        await pipeline.scheduler.aclose()
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4 fake")
+    return str(path)
+
+
+def test_parse_returns_the_prediction_response(pdf_path):
+    pipeline = make_pipeline(FakeVLMClient(latency=0.05))
+    [result] = asyncio.run(parse_all(pipeline, pdf_path, 1))
+    assert result == SAMPLE_RESUME
+    assert pipeline.scheduler.completed == 1
+
+
+def test_failed_prediction_raises(pdf_path):
+    pipeline = make_pipeline(FakeVLMClient(failure_rate=1.0))
+    [result] = asyncio.run(parse_all(pipeline, pdf_path, 1))
+    assert isinstance(result, Exception)
+    assert "VLM parsing failed" in str(result)
+
+
+def test_job_timeout(pdf_path):
+    pipeline = make_pipeline(FakeVLMClient(latency=10), job_timeout=0.2)
+    [result] = asyncio.run(parse_all(pipeline, pdf_path, 1))
+    assert isinstance(result, TimeoutError)
+    assert pipeline.scheduler.outstanding == 0
+
+
+def test_concurrency_is_bounded(pdf_path):
+    client = CountingVLMClient(latency=0.05)
+    pipeline = make_pipeline(client, max_concurrency=2)
+    results = asyncio.run(parse_all(pipeline, pdf_path, 6))
+    assert results == [SAMPLE_RESUME] * 6
+    assert client.peak_outstanding == 2
+    assert pipeline.in_flight == 0
+
+
+def test_polling_does_not_block_the_event_loop(pdf_path):
+    pipeline = make_pipeline(FakeVLMClient(latency=0.3))
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        try:
+            await parse_all(pipeline, pdf_path, 3)
+        finally:
+            ticker.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 10
+
+
+def test_preprocess_trims_long_documents(tmp_path):
+    path = tmp_path / "long.pdf"
+    path.write_bytes(make_text_pdf([SAMPLE_RESUME_LINES] * (vlm.VLM_MAX_PAGES + 2)))
+    doc = preprocess_pdf(str(path))
+    try:
+        assert doc.has_text_layer and not doc.rasterized
+        assert (doc.page_count, doc.pages_sent) == (vlm.VLM_MAX_PAGES + 2, vlm.VLM_MAX_PAGES)
+        assert doc.sent_bytes < doc.original_bytes
+    finally:
+        doc.cleanup()
+
+
+@pytest.mark.skipif(vlm.cv2 is None, reason="opencv is not importable")
+def test_clean_background_whitens_paper_but_keeps_text():
+    page = Image.new("L", (400, 200), 235)
+    ImageDraw.Draw(page).rectangle((20, 20, 120, 40), fill=30)
+    page.putpixel((300, 150), 215)  # scanner speckle
+
+    cleaned = clean_background(page)
+    assert cleaned.getpixel((200, 100)) == 255
+    assert cleaned.getpixel((300, 150)) == 255
+    assert cleaned.getpixel((50, 30)) == 30
+
+
+@pytest.mark.skipif(vlm.cv2 is None, reason="opencv is not importable")
+def test_clean_background_leaves_dark_pages_alone():
+    page = Image.new("L", (100, 100), 40)
+    ImageDraw.Draw(page).rectangle((0, 0, 30, 100), fill=240)
+    assert clean_background(page) is page
+
+
+
+def test_bad_status_response_fails_the_caller_but_not_the_scheduler():
+    completed = SimpleNamespace(status="completed", response=SAMPLE_RESUME)
+    responses = {"broken": object(), "ok": completed}
+    scheduler = PollScheduler(responses.get, initial_interval=0.01)
+
+    async def run():
+        try:
+            broken = await asyncio.gather(scheduler.wait("broken"), return_exceptions=True)
+            return broken[0], await scheduler.wait("ok")
+        finally:
+            await scheduler.aclose()
+
+    broken, ok = asyncio.run(run())
+    assert isinstance(broken, Exception) and "Malformed VLM status" in str(broken)
+    assert ok == SAMPLE_RESUME
+    assert scheduler.poll_errors == 1 and scheduler.completed == 1
+
+
+def test_poll_loop_survives_unexpected_errors():
+    class BrokenScheduler(PollScheduler):
+        async def _poll(self, due):
+            raise RuntimeError("boom")
+
+    scheduler = BrokenScheduler(lambda task_id: None, initial_interval=0.01)
+
+    async def run():
+        try:
+            first = await asyncio.gather(scheduler.wait("a"), return_exceptions=True)
+            second = await asyncio.gather(scheduler.wait("b"), return_exceptions=True)
+            return first[0], second[0], scheduler._task.done()
+        finally:
+            await scheduler.aclose()
+
+    first, second, loop_died = asyncio.run(run())
+    assert isinstance(first, RuntimeError) and isinstance(second, RuntimeError)
+    assert not loop_died
+
+
+def test_preprocess_keeps_text_pdfs_and_rasterizes_scans(tmp_path):
+    text_path, scan_path = tmp_path / "text.pdf", tmp_path / "scan.pdf"
+    text_path.write_bytes(make_text_pdf([SAMPLE_RESUME_LINES]))
+    scan_path.write_bytes(make_scanned_pdf(1, dpi=50))
+
+    text_doc, scan_doc = preprocess_pdf(str(text_path)), preprocess_pdf(str(scan_path))
+    try:
+        assert text_doc.has_text_layer and text_doc.path == str(text_path)
+        assert not scan_doc.has_text_layer
+    finally:
+        text_doc.cleanup()
+        scan_doc.cleanup()
+
+
+class ListingClient:
+    """Status calls for a scheduler; the listing leaves out responses."""
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.gets = []
+        self.lists = 0
+
+    def get(self, task_id):
+        self.gets.append(task_id)
+        return SimpleNamespace(id=task_id, status="completed", response={"id": task_id})
+
+    def list(self, limit):
+        self.lists += 1
+        return [SimpleNamespace(id=task_id, status="completed", response=None) for task_id in self.ids]
+
+
+def wait_for_all(scheduler, ids):
+    async def run():
+        try:
+            return await asyncio.gather(*(scheduler.wait(task_id) for task_id in ids))
+        finally:
+            await scheduler.aclose()
+
+    return asyncio.run(run())
+
+
+def test_predictions_are_checked_one_by_one_by_default():
+    client = ListingClient(["a", "b", "c"])
+    scheduler = PollScheduler(client.get, list_predictions=client.list, initial_interval=0.01)
+    assert wait_for_all(scheduler, client.ids) == [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+    assert client.lists == 0 and sorted(client.gets) == ["a", "b", "c"]
+
+
+def test_listings_without_a_response_fall_back_to_get():
+    client = ListingClient(["a", "b", "c"])
+    scheduler = PollScheduler(client.get, list_predictions=client.list, initial_interval=0.01, batch_min=2)
+    assert wait_for_all(scheduler, client.ids) == [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+    assert client.lists >= 1 and sorted(client.gets) == ["a", "b", "c"]
@@ -9,6 +9,9 @@ interface SidebarProps {
   onNewChat: () => void;
   onSelectChat: (resumeId: string) => void;
   isLoading?: boolean;
+  hasMore?: boolean;
+  onLoadMore?: () => void;
+  isLoadingMore?: boolean;
 }
 
 export default function Sidebar({ 
@@ -16,7 +19,10 @@ export default function Sidebar({
   activeChat, 
   onNewChat, 
   onSelectChat,
-  isLoading = false 
+  isLoading = false,
+  hasMore = false,
+  onLoadMore,
+  isLoadingMore = false
 }: SidebarProps) {
   return (
     <div className="w-64 h-full bg-gray-100 border-r border-gray-200 flex flex-col">
@@ -69,6 +75,16 @@ export default function Sidebar({
             ))
           )}
         </div>
+        {hasMore && !isLoading && onLoadMore && (
+          <button
+            type="button"
+            onClick={onLoadMore}
+            disabled={isLoadingMore}
+            className="w-full mt-2 text-sm text-blue-600 hover:underline disabled:text-gray-400"
+          >
+            {isLoadingMore ? "Loading..." : "Load older chats"}
+          </button>
+        )}
       </div>
     </div>
   );
@@ -31,8 +31,13 @@ export default function ChatInterface() {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const [chatHistory, setChatHistory] = useState<ChatHistoryItem[]>([]);
   const [isLoadingHistory, setIsLoadingHistory] = useState(false);
+  const [chatListCursor, setChatListCursor] = useState<string | null>(null);
+  const [isLoadingMoreChats, setIsLoadingMoreChats] = useState(false);
+  const [olderMessagesCursor, setOlderMessagesCursor] = useState<string | null>(null);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
   const fileInputRef = useRef<HTMLInputElement>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const skipAutoScrollRef = useRef(false);
 
   useEffect(() => {
     const token = typeof window !== "undefined" ? localStorage.getItem("access_token") : null;
@@ -45,6 +50,11 @@ export default function ChatInterface() {
   }, [router]);
 
   useEffect(() => {
+    // Older messages are prepended above what the user is reading.
+    if (skipAutoScrollRef.current) {
+      skipAutoScrollRef.current = false;
+      return;
+    }
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   }, [messages, parsedResume]);
 
@@ -68,15 +78,24 @@ export default function ChatInterface() {
     };
   };
 
+  // The list is paged; X-Next-Cursor is set while older conversations remain.
+  const fetchChatListPage = async (before?: string) => {
+    const query = before ? `?before=${encodeURIComponent(before)}` : "";
+    const res = await fetch(`${apiBaseUrl}/v1/chat/resume-chats${query}`, {
+      headers: getAuthHeaders(),
+    });
+    if (!res.ok) return null;
+    const items: ChatHistoryItem[] = await res.json();
+    return { items, nextCursor: res.headers.get("X-Next-Cursor") };
+  };
+
   const fetchChatHistory = async () => {
     setIsLoadingHistory(true);
     try {
-      const res = await fetch(`${apiBaseUrl}/v1/chat/resume-chats`, {
-        headers: getAuthHeaders(),
-      });
-      if (res.ok) {
-        const data = await res.json();
-        setChatHistory(data);
+      const page = await fetchChatListPage();
+      if (page) {
+        setChatHistory(page.items);
+        setChatListCursor(page.nextCursor);
       }
     } catch (err) {
       console.error("Failed to fetch chat history:", err);
@@ -85,23 +104,60 @@ export default function ChatInterface() {
     }
   };
 
+  const loadMoreChats = async () => {
+    if (!chatListCursor || isLoadingMoreChats) return;
+    setIsLoadingMoreChats(true);
+    try {
+      const page = await fetchChatListPage(chatListCursor);
+      if (page) {
+        setChatHistory((prev) => {
+          const seen = new Set(prev.map((chat) => chat.resume_id));
+          return [...prev, ...page.items.filter((chat) => !seen.has(chat.resume_id))];
+        });
+        setChatListCursor(page.nextCursor);
+      }
+    } catch (err) {
+      console.error("Failed to load more chats:", err);
+    } finally {
+      setIsLoadingMoreChats(false);
+    }
+  };
+
+  // Cached by the browser and revalidated with If-None-Match.
+  const fetchParsedResume = async (resumeId: string) => {
+    const res = await fetch(`${apiBaseUrl}/resume/parsed/${resumeId}`, {
+      headers: getAuthHeaders(),
+    });
+    return res.ok ? res.json() : null;
+  };
+
+  // One page of a conversation, newest first; next_cursor points at the page before it.
+  const fetchHistoryPage = async (resumeId: string, before?: string) => {
+    const query = before ? `?before=${encodeURIComponent(before)}` : "";
+    const res = await fetch(`${apiBaseUrl}/v1/chat/history/${resumeId}${query}`, {
+      headers: getAuthHeaders(),
+    });
+    return res.ok ? res.json() : null;
+  };
+
+  const toMessages = (items: any[]): Message[] => {
+    const loadedAt = Date.now();
+    return items.map((m: any, index: number) => ({
+      id: `${m.message_type}-${loadedAt}-${index}`,
+      role: m.message_type as "user" | "assistant",
+      content: m.content,
+    }));
+  };
+
   const loadChatHistory = async (resumeId: string) => {
     setLoading(true);
     try {
-      const res = await fetch(`${apiBaseUrl}/v1/chat/history/${resumeId}`, {
-        headers: getAuthHeaders(),
-      });
-      if (res.ok) {
-        const data = await res.json();
+      const data = await fetchHistoryPage(resumeId);
+      if (data) {
         setResumeId(resumeId);
-        setParsedResume(data.parsed_data);
-        setMessages(
-          data.messages.map((m: any) => ({
-            id: `${m.message_type}-${Date.now()}`,
-            role: m.message_type as "user" | "assistant",
-            content: m.content,
-          }))
-        );
+        setParsedResume(await fetchParsedResume(resumeId));
+        setMessages(toMessages(data.messages));
+        setOlderMessagesCursor(data.next_cursor ?? null);
       }
     } catch (err) {
       console.error("Failed to load chat history:", err);
@@ -110,8 +166,26 @@ export default function ChatInterface() {
     }
   };
 
+  const loadOlderMessages = async () => {
+    if (!resumeId || !olderMessagesCursor || isLoadingOlder) return;
+    setIsLoadingOlder(true);
+    try {
+      const data = await fetchHistoryPage(resumeId, olderMessagesCursor);
+      if (data) {
+        skipAutoScrollRef.current = true;
+        setMessages((prev) => [...toMessages(data.messages), ...prev]);
+        setOlderMessagesCursor(data.next_cursor ?? null);
+      }
+    } catch (err) {
+      console.error("Failed to load older messages:", err);
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
   const handleNewChat = () => {
     setResumeId(null);
+    setOlderMessagesCursor(null);
     setMessages([]);
     setParsedResume(null);
     setFiles([]);
@@ -133,6 +207,7 @@ export default function ChatInterface() {
 
     setFiles([]);
     setResumeId(null);
+    setOlderMessagesCursor(null);
     setParsedResume(null);
 
     const previews = Array.from(selectedFiles).map((file) => ({
@@ -176,10 +251,20 @@ export default function ChatInterface() {
             return;
           }
 
-          const status = await statusRes.json();
+          const status = statusRes.status === 404 ? { status: "not_found" } : await statusRes.json();
 
-          if (status.status === "done") {
-            setParsedResume(status.parsed_data);
+          if (status.status === "error" || status.status === "not_found") {
+            const reason =
+              status.status === "error"
+                ? status.error || "The resume could not be parsed."
+                : "The uploaded resume could not be found.";
+            setMessages((prev) => [
+              ...prev.filter((msg) => !msg.id.startsWith("upload-")),
+              { id: `err-${Date.now()}`, role: "assistant", content: `❌ ${reason}` },
+            ]);
+            setLoading(false);
+          } else if (status.status === "done") {
+            setParsedResume(await fetchParsedResume(data.resume_id));
             setMessages((prev) => [
               ...prev.filter((msg) => !msg.id.startsWith("upload-")), 
               {
@@ -281,6 +366,9 @@ export default function ChatInterface() {
         activeChat={resumeId}
         onNewChat={handleNewChat}
         onSelectChat={handleSelectChat}
+        hasMore={chatListCursor !== null}
+        onLoadMore={loadMoreChats}
+        isLoadingMore={isLoadingMoreChats}
       />
 
       <div className="flex-1 flex flex-col">
@@ -308,6 +396,19 @@ export default function ChatInterface() {
           <div className="max-w-4xl mx-auto">
             {parsedResume && <ResumeDisplay resume={parsedResume} />}
 
+            {olderMessagesCursor && (
+              <div className="flex justify-center mb-4">
+                <button
+                  type="button"
+                  onClick={loadOlderMessages}
+                  disabled={isLoadingOlder}
+                  className="text-sm text-blue-600 hover:underline disabled:text-gray-400"
+                >
+                  {isLoadingOlder ? "Loading..." : "Load earlier messages"}
+                </button>
+              </div>
+            )}
+
             {messages.map((msg) => (
               <div key={msg.id} className={`flex ${msg.role === "user" ? "justify-end" : "justify-start"} mb-4`}>
                 <div